@@ -0,0 +1,194 @@
+"""
+공유 캐시 계층
+- REDIS_URL이 있으면 Redis, 없으면 단일 호스트용 파일 캐시(settings.CACHES)를 그대로 사용한다.
+- 원자적 증가(incr), 슬라이딩 윈도우 카운터, 히트/미스 지표를 백엔드와 무관하게 제공한다.
+"""
+import os
+import time
+import uuid
+import zlib
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+
+try:
+    import fcntl
+except ImportError:  # 비 POSIX 환경: 프로세스 내부 잠금만 사용
+    fcntl = None
+
+LOCK_BUCKETS = 64
+METRICS_PREFIX = 'cache_metrics'
+METRICS_NAMES_KEY = f'{METRICS_PREFIX}:names'
+METRICS_FLUSH_INTERVAL = 10     # 초: 워커 메모리의 히트/미스 집계를 공유 캐시에 반영하는 주기
+
+_MISSING = object()
+_thread_lock = threading.Lock()
+
+
+def is_redis():
+    return isinstance(caches['default'], RedisCache)
+
+
+def _redis_client_and_key(key):
+    """Django RedisCache와 같은 키 규칙(KEY_PREFIX/버전)으로 redis 클라이언트 반환"""
+    backend = caches['default']
+    full_key = backend.make_and_validate_key(key)
+    return backend._cache.get_client(full_key, write=True), full_key
+
+
+@contextmanager
+def _locked(key):
+    """
+    Redis가 아닐 때 키 단위 읽기-수정-쓰기를 직렬화한다.
+    파일 캐시는 여러 워커가 공유하므로 flock으로 프로세스 간에도 잠근다.
+    """
+    if fcntl is None:
+        with _thread_lock:
+            yield
+        return
+
+    lock_dir = getattr(settings, 'CACHE_LOCK_DIR', os.path.join(settings.BASE_DIR, 'var', 'cache_locks'))
+    os.makedirs(lock_dir, exist_ok=True)
+    bucket = zlib.crc32(key.encode('utf-8')) % LOCK_BUCKETS
+    with open(os.path.join(lock_dir, f'{bucket}.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def incr(key, delta=1, timeout=None):
+    """
+    원자적 증가 후 새 값 반환 (키가 없으면 0에서 시작)
+    timeout을 주면 증가할 때마다 만료 시간을 다시 설정한다.
+    """
+    if is_redis():
+        client, full_key = _redis_client_and_key(key)
+        pipe = client.pipeline()
+        pipe.incrby(full_key, delta)
+        if timeout:
+            pipe.expire(full_key, int(timeout))
+        return pipe.execute()[0]
+
+    with _locked(key):
+        value = (cache.get(key) or 0) + delta
+        cache.set(key, value, timeout)
+        return value
+
+
+def sliding_window_hit(key, window, now=None):
+    """
+    현재 시각을 기록하고 최근 window초 동안의 기록 수를 반환한다.
+    (고정 구간 카운터와 달리 구간 경계에서 한도가 두 배로 풀리지 않음)
+    """
+    now = time.time() if now is None else now
+
+    if is_redis():
+        client, full_key = _redis_client_and_key(key)
+        pipe = client.pipeline()
+        pipe.zremrangebyscore(full_key, '-inf', now - window)
+        pipe.zadd(full_key, {f'{now}:{uuid.uuid4().hex[:8]}': now})
+        pipe.zcard(full_key)
+        pipe.expire(full_key, int(window) + 1)
+        return pipe.execute()[2]
+
+    with _locked(key):
+        stamps = [t for t in (cache.get(key) or []) if t > now - window]
+        stamps.append(now)
+        cache.set(key, stamps, int(window) + 1)
+        return len(stamps)
+
+
+def sliding_window_count(key, window, now=None):
+    """기록 없이 최근 window초 동안의 기록 수만 조회"""
+    now = time.time() if now is None else now
+
+    if is_redis():
+        client, full_key = _redis_client_and_key(key)
+        return client.zcount(full_key, f'({now - window}', '+inf')
+
+    return sum(1 for t in (cache.get(key) or []) if t > now - window)
+
+
+def try_lock(key, timeout):
+    """
+    timeout초 동안 유지되는 잠금 획득 시도 (여러 워커 중 한 곳만 True)
+    Redis는 SET NX, 파일 캐시는 add가 원자적이지 않아 flock 안에서 수행한다.
+    """
+    if is_redis():
+        return cache.add(key, os.getpid(), timeout)
+
+    with _locked(key):
+        return cache.add(key, os.getpid(), timeout)
+
+
+# --- [히트/미스 지표] ---
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+_metrics_flushed_at = time.monotonic()
+
+
+def record(name, hit):
+    """캐시 조회 결과 집계 (워커 메모리에 모았다가 주기적으로 공유 캐시에 반영)"""
+    global _metrics_flushed_at
+    with _metrics_lock:
+        _metrics[(name, 'hit' if hit else 'miss')] += 1
+        due = time.monotonic() - _metrics_flushed_at >= METRICS_FLUSH_INTERVAL
+    if due:
+        flush_metrics()
+
+
+def flush_metrics():
+    global _metrics_flushed_at
+    with _metrics_lock:
+        pending = dict(_metrics)
+        _metrics.clear()
+        _metrics_flushed_at = time.monotonic()
+    if not pending:
+        return
+
+    try:
+        names = {name for name, _ in pending}
+        with _locked(METRICS_NAMES_KEY):
+            known = cache.get(METRICS_NAMES_KEY) or set()
+            if not names <= known:
+                cache.set(METRICS_NAMES_KEY, known | names, None)
+        for (name, kind), count in pending.items():
+            incr(f'{METRICS_PREFIX}:{name}:{kind}', count)
+    except Exception:
+        pass    # 지표 반영 실패가 요청 처리에 영향을 주지 않도록 한다.
+
+
+def get_or_set(name, key, default_fn, timeout):
+    """cache.get_or_set과 같지만 name 단위로 히트/미스를 집계"""
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        record(name, True)
+        return value
+
+    record(name, False)
+    value = default_fn()
+    cache.set(key, value, timeout)
+    return value
+
+
+def metrics_snapshot():
+    """{name: {'hit': n, 'miss': n}} (공유 캐시에 반영된 값 기준)"""
+    names = sorted(cache.get(METRICS_NAMES_KEY) or [])
+    snapshot = {}
+    for name in names:
+        snapshot[name] = {
+            kind: cache.get(f'{METRICS_PREFIX}:{name}:{kind}') or 0
+            for kind in ('hit', 'miss')
+        }
+    return snapshot
+
+
+def reset_metrics():
+    names = cache.get(METRICS_NAMES_KEY) or set()
+    cache.delete_many([f'{METRICS_PREFIX}:{name}:{kind}' for name in names for kind in ('hit', 'miss')])
+    cache.delete(METRICS_NAMES_KEY)
@@ -0,0 +1,44 @@
+"""
+대용량 테이블용 관리자 목록 페이지네이터
+- 조건 없는 전체 목록: MySQL 통계(information_schema.TABLES.TABLE_ROWS) 추정치를 사용해 COUNT(*) 전체 스캔을 피한다.
+- 검색/필터가 걸린 목록: COUNT_LIMIT건까지만 센다. (그 이상은 페이지 수가 COUNT_LIMIT 기준으로 잘림)
+"""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+ESTIMATE_THRESHOLD = 100_000    # 추정치가 이보다 작으면 정확히 센다 (작은 테이블은 COUNT가 싸다)
+COUNT_LIMIT = 10_000
+
+
+def estimated_row_count(model, using='default'):
+    """테이블 행 수 추정치 (MySQL이 아니거나 통계가 없으면 None)"""
+    connection = connections[using]
+    if connection.vendor != 'mysql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+            return super().count
+
+        # SELECT COUNT(*) FROM (SELECT ... LIMIT n): 조건에 맞는 행을 n건까지만 읽는다.
+        return queryset.order_by()[:COUNT_LIMIT].count()
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.humanize',
     "storages",
     'chatbot',
     'payments',
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'users.middleware.UserContextMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -120,6 +122,31 @@ USE_TZ = True
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache (gunicorn 워커 간 공유: 로그인 잠금, 챗봇 규칙 버전, 회원 컨텍스트 등)
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "bais",
+        }
+    }
+else:
+    # 단일 호스트용: 같은 서버의 워커들이 공유하는 파일 캐시
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / "var" / "cache",
+            "OPTIONS": {"MAX_ENTRIES": 20000},
+        }
+    }
+CACHE_LOCK_DIR = BASE_DIR / "var" / "cache_locks"
+
+# Session: 캐시에서 먼저 읽고 저장 시 DB에도 기록 (캐시 유실 시 DB에서 복구)
+# 가입 중 임시 비밀번호 해시 등이 들어가므로 클라이언트가 읽을 수 있는 signed_cookies는 사용하지 않는다.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
 # Email
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
@@ -143,6 +170,8 @@ STORAGES = {
             "region_name": os.getenv("AWS_REGION", "ap-northeast-2"),
             "default_acl": "public-read",
             "querystring_auth": False,
+            # 같은 날 같은 이름으로 올린 다른 회원의 원본을 덮어쓰지 않도록 키에 임의 문자열을 붙인다.
+            "file_overwrite": False,
         },
     },
     "staticfiles": {
@@ -177,9 +206,16 @@ MEDIA_ROOT = BASE_DIR / 'media'
 RUNPOD_API_URL = os.getenv('RUNPOD_API_URL')
 
 
+# Chatbot
+CHATBOT_INDEX_DIR = BASE_DIR / "var" / "chatbot"
+CHATBOT_SEMANTIC_THRESHOLD = float(os.getenv("CHATBOT_SEMANTIC_THRESHOLD", "0.35"))
+
+
 # Kakaopay
 KAKAO_ADMIN_KEY = os.getenv("KAKAO_ADMIN_KEY", "")
-KAKAO_API_BASE_URL = "https://kapi.kakao.com"
+KAKAO_API_BASE_URL = os.getenv("KAKAO_API_BASE_URL", "https://kapi.kakao.com")  # 로컬: manage.py kakaopay_standin
+KAKAO_CONNECT_TIMEOUT = float(os.getenv("KAKAO_CONNECT_TIMEOUT", "3"))
+KAKAO_READ_TIMEOUT = float(os.getenv("KAKAO_READ_TIMEOUT", "10"))
 
 
 # Logging
@@ -0,0 +1,103 @@
+import os
+import re
+import atexit
+import logging
+import threading
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = 200        # 이만큼 쌓이면 즉시 저장
+FLUSH_INTERVAL = 10     # 초: 최대 저장 지연
+MAX_BUFFER = 5000       # DB 장애 시 메모리 보호용 상한 (초과분은 버림)
+
+SPACE_RE = re.compile(r'\s+')
+TRAILING_PUNCT_RE = re.compile(r'[\s?!.~,]+$')
+
+
+def normalize_question(text):
+    """집계용 질문 정규화: 소문자, 공백 정리, 끝 문장부호 제거"""
+    text = SPACE_RE.sub(' ', str(text).lower()).strip()
+    return TRAILING_PUNCT_RE.sub('', text)[:500]
+
+
+def _to_int(value):
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ChatEventBuffer:
+    """
+    워커별 챗봇 이벤트 버퍼
+    요청 처리 중에는 메모리에 추가만 하고, 백그라운드 스레드가 모아서 bulk_create 한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def record(self, question, match_type, latency_ms, chatbot_id=None, video_id=None, subtitle_id=None):
+        from .models import ChatLog
+
+        event = ChatLog(
+            question=normalize_question(question),
+            chatbot_id=chatbot_id,
+            match_type=match_type,
+            latency_ms=round(latency_ms, 3),
+            video_id=_to_int(video_id),
+            subtitle_id=_to_int(subtitle_id),
+            created_dt=timezone.now(),
+        )
+        with self._lock:
+            if len(self._events) >= MAX_BUFFER:
+                return
+            self._events.append(event)
+            size = len(self._events)
+
+        self._ensure_thread()
+        if size >= FLUSH_SIZE:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        # gunicorn fork 이후 워커마다 자기 스레드를 가져야 하므로 pid 기준으로 확인
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='chat-event-flusher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        from .models import ChatLog
+
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return 0
+
+        try:
+            ChatLog.objects.bulk_create(events, batch_size=FLUSH_SIZE)
+            return len(events)
+        except Exception as e:
+            logger.error(f"챗봇 로그 저장 실패 ({len(events)}건 유실): {e}")
+            return 0
+        finally:
+            # 이 스레드 전용 DB 연결 정리
+            connections.close_all()
+
+
+chat_events = ChatEventBuffer()
+atexit.register(chat_events.flush)
@@ -0,0 +1,55 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from chatbot.matcher import RuleMatcher
+
+SYLLABLES = '가나다라마바사아자차카타파하홈런타자투수포수삼진볼넷도루안타병살'
+
+
+def _random_text(rng, min_len, max_len):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(min_len, max_len)))
+
+
+def _linear_match(sorted_rules, msg):
+    """기존 방식: 길이순 정렬된 규칙을 순서대로 `in` 검사"""
+    for chatbot_id, rule, response in sorted_rules:
+        if rule in msg:
+            return chatbot_id, response
+    return None
+
+
+class Command(BaseCommand):
+    help = '챗봇 규칙 매처(Aho-Corasick)와 기존 순차 검사 방식의 성능을 비교합니다. (DB 사용 안 함)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000,100000', help='규칙 개수 목록 (쉼표 구분)')
+        parser.add_argument('--messages', type=int, default=1000, help='규칙 개수별 측정 메시지 수')
+        parser.add_argument('--seed', type=int, default=17)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        messages = [_random_text(rng, 8, 40) for _ in range(options['messages'])]
+
+        self.stdout.write(f"{'rules':>8} | {'build(ms)':>10} | {'AC(us/msg)':>11} | {'linear(us/msg)':>15} | {'speedup':>8}")
+        for size in [int(s) for s in options['sizes'].split(',') if s.strip()]:
+            rules = [(i + 1, _random_text(rng, 2, 8), f'answer {i}') for i in range(size)]
+
+            started = time.perf_counter()
+            matcher = RuleMatcher(rules)
+            build_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            ac_results = [matcher.response_for(m) for m in messages]
+            ac_us = (time.perf_counter() - started) * 1e6 / len(messages)
+
+            sorted_rules = sorted(rules, key=lambda r: len(r[1]), reverse=True)
+            started = time.perf_counter()
+            linear_results = [_linear_match(sorted_rules, m) for m in messages]
+            linear_us = (time.perf_counter() - started) * 1e6 / len(messages)
+
+            if ac_results != linear_results:
+                self.stdout.write(self.style.ERROR(f'{size}개 규칙에서 결과 불일치'))
+
+            self.stdout.write(
+                f"{size:>8} | {build_ms:>10.1f} | {ac_us:>11.1f} | {linear_us:>15.1f} | {linear_us / ac_us:>7.1f}x"
+            )
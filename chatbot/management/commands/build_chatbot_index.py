@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from chatbot.semantic import is_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = '챗봇 규칙의 의미 검색(FAISS) 인덱스를 생성합니다. (--if-stale로 cron 등에서 주기 실행하면 규칙이 바뀐 경우만 생성)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-stale', action='store_true', help='마지막 생성 이후 규칙이 바뀐 경우에만 생성합니다.')
+
+    def handle(self, *args, **options):
+        if not is_available():
+            self.stdout.write(self.style.ERROR('faiss-cpu가 설치되어 있지 않습니다.'))
+            return
+
+        started = time.perf_counter()
+        count = rebuild_index(if_stale=options['if_stale'])
+        elapsed = time.perf_counter() - started
+        if count is None:
+            self.stdout.write('규칙 변경이 없거나 다른 프로세스가 인덱스를 생성 중입니다.')
+            return
+        self.stdout.write(self.style.SUCCESS(f'총 {count}개의 규칙으로 인덱스를 생성했습니다. ({elapsed:.2f}초)'))
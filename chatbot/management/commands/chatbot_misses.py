@@ -0,0 +1,34 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max
+from django.utils import timezone
+from chatbot.models import ChatLog
+
+
+class Command(BaseCommand):
+    help = '챗봇이 답변하지 못한 질문을 빈도순으로 보여줍니다. (규칙 추가 대상 파악용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='집계 기간 (일)')
+        parser.add_argument('--top', type=int, default=30, help='출력할 질문 수')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        logs = ChatLog.objects.filter(created_dt__gte=since)
+
+        summary = {row['match_type']: row['cnt'] for row in logs.values('match_type').annotate(cnt=Count('log_id'))}
+        total = sum(summary.values())
+        if not total:
+            self.stdout.write('집계할 질문 로그가 없습니다.')
+            return
+
+        misses = summary.get(ChatLog.MATCH_MISS, 0)
+        self.stdout.write(f"최근 {options['days']}일 질문 {total}건 / 응답률 {(total - misses) / total * 100:.1f}% "
+                          f"({', '.join(f'{k} {v}' for k, v in sorted(summary.items()))})")
+
+        top_misses = logs.filter(match_type=ChatLog.MATCH_MISS).values('question').annotate(
+            cnt=Count('log_id'), last_dt=Max('created_dt')
+        ).order_by('-cnt', '-last_dt')[:options['top']]
+
+        for rank, row in enumerate(top_misses, start=1):
+            self.stdout.write(f"{rank:>3}. [{row['cnt']:>4}회] {row['question']}  (최근 {timezone.localtime(row['last_dt']):%Y-%m-%d %H:%M})")
@@ -1,35 +1,122 @@
 import os
-import pandas as pd
+import csv
+import json
+import time
 from django.core.management.base import BaseCommand
-from chatbot.models import Chatbot
+from django.db import transaction
+from chatbot.models import Chatbot, ChatLog
+from chatbot.matcher import bump_rules_version
+from chatbot.semantic import is_available, rebuild_index
 from django.conf import settings
 
+
+def _iter_xlsx(file_path):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else '' for h in next(rows, ())]
+        rule_col, response_col = header.index('rule'), header.index('response')
+        for row in rows:
+            yield row[rule_col], row[response_col]
+    finally:
+        wb.close()
+
+
+def _iter_csv(file_path):
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            yield row.get('rule'), row.get('response')
+
+
+def _iter_jsonl(file_path):
+    with open(file_path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                yield row.get('rule'), row.get('response')
+
+
+READERS = {'.xlsx': _iter_xlsx, '.csv': _iter_csv, '.jsonl': _iter_jsonl}
+
+
 class Command(BaseCommand):
-    help = '엑셀 파일에서 챗봇 규칙을 가져와 DB에 저장합니다.'
+    help = '엑셀/CSV/JSONL 파일에서 챗봇 규칙을 가져와 DB와 동기화합니다.'
 
-    def handle(self, *args, **kwargs):
-        file_path = os.path.join(settings.BASE_DIR, 'static', 'data', 'word_rag.xlsx')
+    def add_arguments(self, parser):
+        parser.add_argument('--file', dest='file_path', default=os.path.join(settings.BASE_DIR, 'static', 'data', 'word_rag.xlsx'))
+        parser.add_argument('--prune', action='store_true', help='파일에 없는 기존 규칙을 삭제합니다.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='변경 내역만 계산하고 저장하지 않습니다.')
+
+    def handle(self, *args, **options):
+        file_path = options['file_path']
+        batch_size = options['batch_size']
 
         if not os.path.exists(file_path):
             self.stdout.write(self.style.ERROR(f'파일을 찾을 수 없습니다: {file_path}'))
             return
 
+        reader = READERS.get(os.path.splitext(file_path)[1].lower())
+        if not reader:
+            self.stdout.write(self.style.ERROR(f'지원하지 않는 파일 형식입니다: {file_path}'))
+            return
+
+        timings = {}
         try:
-            df = pd.read_excel(file_path)
-            
-            count = 0
-            for _, row in df.iterrows():
-                rule = str(row['rule']).strip()
-                response = str(row['response']).strip()
-
-                obj, created = Chatbot.objects.get_or_create(
-                    rule=rule,
-                    defaults={'response': response}
-                )
-                if created:
-                    count += 1
-            
-            self.stdout.write(self.style.SUCCESS(f'총 {count}개의 새로운 규칙이 등록되었습니다!'))
+            started = time.perf_counter()
+            incoming = {}
+            for rule, response in reader(file_path):
+                rule = str(rule).strip() if rule is not None else ''
+                if not rule:
+                    continue
+                incoming[rule] = str(response).strip() if response is not None else ''
+            timings['read'] = time.perf_counter() - started
+
+            # 기존 규칙은 한 번의 쿼리로 읽어 비교
+            started = time.perf_counter()
+            existing = {rule: (pk, response) for pk, rule, response in Chatbot.objects.values_list('chatbot_id', 'rule', 'response')}
+
+            to_create = [Chatbot(rule=rule, response=response) for rule, response in incoming.items() if rule not in existing]
+            to_update = [
+                Chatbot(chatbot_id=existing[rule][0], rule=rule, response=response)
+                for rule, response in incoming.items()
+                if rule in existing and existing[rule][1] != response
+            ]
+            to_delete = [pk for rule, (pk, _) in existing.items() if rule not in incoming] if options['prune'] else []
+            timings['diff'] = time.perf_counter() - started
+
+            if options['dry_run']:
+                self.stdout.write(f'[dry-run] 추가 {len(to_create)}개, 수정 {len(to_update)}개, 삭제 {len(to_delete)}개')
+                return
+
+            started = time.perf_counter()
+            with transaction.atomic():
+                Chatbot.objects.bulk_create(to_create, batch_size=batch_size)
+                Chatbot.objects.bulk_update(to_update, ['response'], batch_size=batch_size)
+                for i in range(0, len(to_delete), batch_size):
+                    # delete()는 행마다 post_delete 시그널(규칙 버전 갱신)을 보내므로 직접 삭제하고, 아래에서 한 번만 알린다.
+                    # 시그널과 함께 건너뛰는 질문 로그의 SET_NULL은 먼저 처리
+                    ids = to_delete[i:i + batch_size]
+                    ChatLog.objects.filter(chatbot_id__in=ids).update(chatbot=None)
+                    rows = Chatbot.objects.filter(chatbot_id__in=ids)
+                    rows._raw_delete(rows.db)
+            timings['write'] = time.perf_counter() - started
+
+            # bulk 작업은 시그널이 발생하지 않으므로 직접 워커들에게 매처 재생성을 알린다.
+            if to_create or to_update or to_delete:
+                bump_rules_version()
+                if is_available():
+                    started = time.perf_counter()
+                    if rebuild_index() is None:
+                        self.stdout.write('다른 프로세스가 인덱스를 생성 중이라 다음 build_chatbot_index --if-stale 실행에서 반영됩니다.')
+                    timings['index'] = time.perf_counter() - started
+
+            self.stdout.write(self.style.SUCCESS(
+                f'추가 {len(to_create)}개, 수정 {len(to_update)}개, 삭제 {len(to_delete)}개 (파일 {len(incoming)}개 규칙)'
+            ))
+            self.stdout.write(' / '.join(f'{k} {v:.2f}s' for k, v in timings.items()))
 
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'에러 발생: {str(e)}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'에러 발생: {str(e)}'))
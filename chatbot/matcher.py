@@ -0,0 +1,148 @@
+import time
+import threading
+from collections import deque
+from django.core.cache import cache
+
+RULES_VERSION_KEY = 'chatbot:rules_version'
+VERSION_CHECK_INTERVAL = 5      # 초: 다른 워커의 규칙 변경 여부 확인 주기
+MATCHER_MAX_AGE = 10 * 60       # 초: 버전 신호를 놓쳐도 이 주기로는 재생성
+
+
+class RuleMatcher:
+    """
+    챗봇 규칙 Aho-Corasick 매처
+    메시지를 한 번만 훑어서 포함된 규칙 중 '가장 긴 규칙(동일 길이면 먼저 등록된 규칙)'을 찾는다.
+    (기존: 규칙 전체를 길이순 정렬 후 `rule in msg` 순차 검사와 동일한 결과)
+    """
+
+    def __init__(self, rules):
+        # rules: (chatbot_id, rule, response) 목록, chatbot_id 오름차순
+        self.rule_ids = []
+        self.responses = []
+        self.lengths = []
+        self.empty_rule = None
+
+        self.goto = [{}]
+        self.fail = [0]
+        self.best = [-1]    # 노드에서 끝나는(실패 링크 포함) 규칙 중 최우선 규칙 번호
+
+        for chatbot_id, rule, response in rules:
+            idx = len(self.rule_ids)
+            self.rule_ids.append(chatbot_id)
+            self.responses.append(response)
+            self.lengths.append(len(rule))
+
+            if not rule:
+                if self.empty_rule is None:
+                    self.empty_rule = idx
+                continue
+
+            node = 0
+            for ch in rule:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(-1)
+                    self.goto[node][ch] = nxt
+                node = nxt
+            self.best[node] = self._prefer(self.best[node], idx)
+
+        self._build_fail_links()
+        self.response_by_id = dict(zip(self.rule_ids, self.responses))
+
+    def __len__(self):
+        return len(self.rule_ids)
+
+    def _prefer(self, a, b):
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        # 길이가 길수록, 같으면 먼저 등록된(번호가 작은) 규칙 우선
+        return a if (self.lengths[a], -a) >= (self.lengths[b], -b) else b
+
+    def _build_fail_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.best[child] = self._prefer(self.best[child], self.best[self.fail[child]])
+
+    def match(self, text):
+        """가장 우선순위가 높은 규칙 번호 반환 (없으면 None)"""
+        goto, fail, best = self.goto, self.fail, self.best
+        found = -1
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if best[node] >= 0:
+                found = self._prefer(found, best[node])
+
+        if found < 0 and self.empty_rule is not None:
+            found = self.empty_rule
+        return found if found >= 0 else None
+
+    def response_for(self, text):
+        """(chatbot_id, response) 반환, 매칭 규칙이 없으면 None"""
+        idx = self.match(text)
+        if idx is None:
+            return None
+        return self.rule_ids[idx], self.responses[idx]
+
+
+_lock = threading.Lock()
+_matcher = None
+_matcher_version = None
+_built_at = 0.0
+_checked_at = 0.0
+
+
+def load_rules():
+    from .models import Chatbot
+    return list(Chatbot.objects.order_by('chatbot_id').values_list('chatbot_id', 'rule', 'response'))
+
+
+def get_matcher():
+    """
+    워커 메모리에 캐시된 매처 반환
+    규칙이 바뀌면(버전 키 변경) VERSION_CHECK_INTERVAL 안에 새로 만든다.
+    """
+    global _matcher, _matcher_version, _built_at, _checked_at
+
+    now = time.monotonic()
+    if _matcher is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return _matcher
+
+    version = cache.get(RULES_VERSION_KEY)
+    _checked_at = now
+    if _matcher is not None and version == _matcher_version and now - _built_at < MATCHER_MAX_AGE:
+        return _matcher
+
+    with _lock:
+        if _matcher is None or version != _matcher_version or now - _built_at >= MATCHER_MAX_AGE:
+            _matcher = RuleMatcher(load_rules())
+            _matcher_version = version
+            _built_at = time.monotonic()
+    return _matcher
+
+
+def warm_matcher():
+    """gunicorn 마스터에서 fork 전에 미리 생성 (워커들이 copy-on-write로 공유)"""
+    return get_matcher()
+
+
+def bump_rules_version():
+    """규칙 변경 알림: 모든 워커가 다음 확인 주기에 매처를 다시 만든다."""
+    global _matcher
+    cache.set(RULES_VERSION_KEY, time.time_ns(), None)
+    _matcher = None
@@ -13,4 +13,31 @@ class Chatbot(models.Model):
 
     class Meta:
         db_table = 'CHATBOT'
-        verbose_name = '챗봇'
\ No newline at end of file
+        verbose_name = '챗봇'
+
+class ChatLog(models.Model):
+    """
+    14) 챗봇 질문 로그
+    챗봇 질문별 매칭 결과를 기록해 답변하지 못한 질문(규칙 공백)을 파악한다.
+    """
+    MATCH_RULE = 'rule'
+    MATCH_SEMANTIC = 'semantic'
+    MATCH_MOMENT = 'moment'
+    MATCH_MISS = 'miss'
+
+    log_id = models.BigAutoField(primary_key=True, db_column='LOG_ID')
+    question = models.CharField(max_length=500, db_column='QUESTION', help_text="정규화된 질문")
+    chatbot = models.ForeignKey(Chatbot, on_delete=models.SET_NULL, null=True, blank=True, db_column='CHATBOT_ID')
+    match_type = models.CharField(max_length=10, db_column='MATCH_TYPE')
+    latency_ms = models.FloatField(db_column='LATENCY_MS')
+    video_id = models.BigIntegerField(null=True, blank=True, db_column='VIDEO_ID')
+    subtitle_id = models.BigIntegerField(null=True, blank=True, db_column='SUBTITLE_ID')
+    created_dt = models.DateTimeField(db_column='CREATED_DT')
+
+    class Meta:
+        db_table = 'CHATBOT_LOG'
+        verbose_name = '챗봇 질문 로그'
+        verbose_name_plural = '챗봇 질문 로그 목록'
+        indexes = [
+            models.Index(fields=['match_type', 'created_dt'], name='IDX_CHATBOT_LOG_MATCH'),
+        ]
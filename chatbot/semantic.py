@@ -0,0 +1,210 @@
+import os
+import re
+import math
+import time
+import zlib
+import logging
+import threading
+from django.conf import settings
+from django.core.cache import cache
+from SKN17_FINAL_3TEAM.cache import try_lock
+
+logger = logging.getLogger(__name__)
+
+try:
+    import faiss
+    import numpy as np
+except ImportError:  # faiss-cpu 미설치 환경에서는 의미 검색 없이 동작
+    faiss = None
+    np = None
+
+EMBEDDING_DIM = 1024        # 차원을 줄이면 해싱 충돌로 무관한 질문의 유사도가 올라가 임계값 의미가 바뀐다.
+NGRAM_RANGE = (2, 3)
+# 벡터가 이보다 많으면 IVF(군집별 검색) + 8비트 양자화로 전체 비교를 피한다. 적으면 전체 비교가 더 빠르고 정확하다.
+# 규칙 10만 개(벡터 20만 개) 기준: 약 210MB(float32 전체 비교 820MB), 1건 검색 p99 약 3ms, 전체 비교 대비 top-1 일치율 99.6%
+IVF_MIN_VECTORS = 20000
+IVF_TRAIN_PER_LIST = 40     # 군집 학습 표본 수 = 군집 수 x 이 값 (전체를 학습하면 재생성이 수 분 걸림)
+IVF_NPROBE = 32             # 검색할 군집 수
+REBUILD_LOCK_KEY = 'chatbot:semantic_rebuild'
+REBUILD_LOCK_TIMEOUT = 600
+INDEX_FILENAME = 'rules.faiss'
+IDS_FILENAME = 'rules_ids.npy'
+VERSION_FILENAME = 'rules_version'     # 인덱스를 만들 때 읽은 규칙 버전 (matcher.RULES_VERSION_KEY 값)
+RELOAD_CHECK_INTERVAL = 5   # 초: 인덱스 파일 교체 여부 확인 주기
+
+SPACE_RE = re.compile(r'\s+')
+
+
+def is_available():
+    return faiss is not None
+
+
+def _index_dir():
+    return getattr(settings, 'CHATBOT_INDEX_DIR', os.path.join(settings.BASE_DIR, 'var', 'chatbot'))
+
+
+def embed_text(text):
+    """
+    오프라인 임베딩: 문자 n-gram 해싱 벡터 (L2 정규화)
+    형태소 분석기 없이도 한글 조사/어미 변화에 어느 정도 강하다.
+    """
+    vec = np.zeros(EMBEDDING_DIM, dtype='float32')
+    text = SPACE_RE.sub('', str(text).lower())
+    for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+        for i in range(len(text) - n + 1):
+            h = zlib.crc32(text[i:i + n].encode('utf-8'))
+            vec[h % EMBEDDING_DIM] += 1.0 if (h >> 16) & 1 else -1.0
+
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def build_index(rows, version=None):
+    """
+    (chatbot_id, rule, response) 목록으로 인덱스를 만들어 디스크에 저장한다.
+    규칙 하나당 규칙 벡터와 답변 벡터 두 개를 넣고, 둘 다 같은 chatbot_id로 연결한다.
+    임시 파일에 쓴 뒤 교체하므로 실행 중인 워커는 다음 확인 주기에 새 파일을 읽는다.
+    version이 있으면 인덱스를 교체한 뒤 기록해 rebuild_index(if_stale=True)가 비교에 사용한다.
+    """
+    if not is_available():
+        raise RuntimeError('faiss-cpu가 설치되어 있지 않습니다.')
+
+    index_dir = _index_dir()
+    os.makedirs(index_dir, exist_ok=True)
+
+    ids = np.array([r[0] for r in rows for _ in range(2)], dtype='int64')
+    vectors = np.zeros((len(ids), EMBEDDING_DIM), dtype='float32')
+    for i, (_, rule, response) in enumerate(rows):
+        vectors[2 * i] = embed_text(rule)
+        vectors[2 * i + 1] = embed_text(response)
+
+    index = _make_index(vectors)
+
+    # 관리 명령이 동시에 실행되어도 서로의 임시 파일을 덮어쓰지 않도록 프로세스별 임시 파일 사용
+    index_path = os.path.join(index_dir, INDEX_FILENAME)
+    ids_path = os.path.join(index_dir, IDS_FILENAME)
+    suffix = f".{os.getpid()}.tmp"
+    faiss.write_index(index, index_path + suffix)
+    with open(ids_path + suffix, 'wb') as f:
+        np.save(f, ids)
+    os.replace(ids_path + suffix, ids_path)
+    os.replace(index_path + suffix, index_path)
+    if version is not None:
+        version_path = os.path.join(index_dir, VERSION_FILENAME)
+        with open(version_path + suffix, 'w') as f:
+            f.write(str(version))
+        os.replace(version_path + suffix, version_path)
+    return len(rows)
+
+
+def _make_index(vectors):
+    """벡터 수에 따라 전체 비교(Flat) 또는 IVF + 8비트 양자화 인덱스 생성 (내적 = 코사인 유사도)"""
+    if len(vectors) < IVF_MIN_VECTORS:
+        index = faiss.IndexFlatIP(EMBEDDING_DIM)
+    else:
+        nlist = int(2 * math.sqrt(len(vectors)))
+        quantizer = faiss.IndexFlatIP(EMBEDDING_DIM)
+        index = faiss.IndexIVFScalarQuantizer(
+            quantizer, EMBEDDING_DIM, nlist, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        sample_size = min(len(vectors), nlist * IVF_TRAIN_PER_LIST)
+        sample = np.random.default_rng(0).choice(len(vectors), sample_size, replace=False)
+        index.train(vectors[sample])
+        index.nprobe = IVF_NPROBE
+    index.add(vectors)
+    return index
+
+
+def built_version():
+    """현재 인덱스를 만들 때의 규칙 버전 (기록이 없으면 None)"""
+    try:
+        with open(os.path.join(_index_dir(), VERSION_FILENAME)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def rebuild_index(if_stale=False):
+    """
+    현재 규칙으로 인덱스를 다시 만든다. (규칙 10만 개 기준 1분 이상 걸리므로 웹 워커가 아닌 관리 명령/cron에서 실행)
+    규칙 버전을 먼저 읽고 기록하므로 만드는 중에 바뀐 규칙은 다음 실행에서 반영된다.
+    if_stale이면 기록된 버전이 현재 규칙 버전과 같을 때 건너뛴다.
+    Returns: 규칙 수, 건너뛰었거나 다른 프로세스가 만드는 중이면 None
+    """
+    from .matcher import RULES_VERSION_KEY, bump_rules_version, load_rules
+
+    if not try_lock(REBUILD_LOCK_KEY, REBUILD_LOCK_TIMEOUT):
+        return None
+    try:
+        version = cache.get(RULES_VERSION_KEY)
+        if version is None:
+            # 캐시가 비워져 버전을 알 수 없음: 기준 버전을 새로 정하고 한 번 다시 만든다.
+            bump_rules_version()
+            version = cache.get(RULES_VERSION_KEY)
+        elif if_stale and str(version) == built_version():
+            return None
+        return build_index(load_rules(), version)
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+
+
+_lock = threading.Lock()
+_index = None
+_ids = None
+_loaded_mtime = None
+_checked_at = 0.0
+
+
+def _load_if_changed():
+    """인덱스 파일이 바뀌었을 때만 다시 연다 (메모리 매핑이라 워커 간 페이지 캐시 공유)"""
+    global _index, _ids, _loaded_mtime, _checked_at
+
+    now = time.monotonic()
+    if now - _checked_at < RELOAD_CHECK_INTERVAL:
+        return _index, _ids
+    _checked_at = now
+
+    index_path = os.path.join(_index_dir(), INDEX_FILENAME)
+    try:
+        mtime = os.stat(index_path).st_mtime_ns
+    except FileNotFoundError:
+        _index, _ids, _loaded_mtime = None, None, None
+        return None, None
+
+    if mtime != _loaded_mtime:
+        with _lock:
+            if mtime != _loaded_mtime:
+                flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+                try:
+                    _index = faiss.read_index(index_path, flags)
+                except RuntimeError:
+                    _index = faiss.read_index(index_path)
+                if hasattr(_index, 'nprobe'):
+                    _index.nprobe = IVF_NPROBE
+                _ids = np.load(os.path.join(_index_dir(), IDS_FILENAME), mmap_mode='r')
+                _loaded_mtime = mtime
+    return _index, _ids
+
+
+def semantic_lookup(user_msg, threshold=None):
+    """가장 유사한 규칙의 (chatbot_id, 유사도) 반환, 임계값 미만이면 None"""
+    if not is_available():
+        return None
+
+    try:
+        index, ids = _load_if_changed()
+    except Exception as e:
+        logger.warning(f"챗봇 의미 검색 인덱스 로드 실패: {e}")
+        return None
+
+    if index is None or index.ntotal == 0:
+        return None
+
+    if threshold is None:
+        threshold = getattr(settings, 'CHATBOT_SEMANTIC_THRESHOLD', 0.35)
+
+    scores, positions = index.search(embed_text(user_msg).reshape(1, -1), 1)
+    score, pos = float(scores[0][0]), int(positions[0][0])
+    if pos < 0 or score < threshold:
+        return None
+    return int(ids[pos]), score
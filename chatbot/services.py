@@ -1,17 +1,35 @@
-from .models import Chatbot
+from .matcher import get_matcher
+from .models import ChatLog
+from .semantic import semantic_lookup
+
+MOMENT_KEYWORDS = ('언제', '몇 분', '몇분', '장면', '순간', '어디서')
+
+
+DEFAULT_RESPONSE = "죄송합니다. 제가 답변할 수 없는 내용입니다. 다른 질문을 해주세요."
 
-def get_chatbot_response(user_msg: str) -> str:
-    default_response = "죄송합니다. 제가 답변할 수 없는 내용입니다. 다른 질문을 해주세요."
 
-    exact_match = Chatbot.objects.filter(rule=user_msg).first()
-    if exact_match:
-        return exact_match.response
+def match_chatbot(user_msg: str):
+    """
+    Returns: (답변, 매칭된 chatbot_id 또는 None, 매칭 유형)
+    """
+    # 완전 일치 규칙은 메시지 전체 길이의 규칙이므로 '가장 긴 규칙 우선' 매칭에 포함된다.
+    matcher = get_matcher()
+    matched = matcher.response_for(user_msg)
+    if matched:
+        return matched[1], matched[0], ChatLog.MATCH_RULE
 
-    rules = Chatbot.objects.all()
-    sorted_rules = sorted(rules, key=lambda x: len(x.rule), reverse=True)
+    # 포함된 규칙이 없으면 의미가 가장 가까운 규칙으로 답변 (유사도 임계값 이상일 때만)
+    similar = semantic_lookup(user_msg)
+    if similar and similar[0] in matcher.response_by_id:
+        return matcher.response_by_id[similar[0]], similar[0], ChatLog.MATCH_SEMANTIC
+
+    return DEFAULT_RESPONSE, None, ChatLog.MATCH_MISS
+
+
+def get_chatbot_response(user_msg: str) -> str:
+    return match_chatbot(user_msg)[0]
 
-    for r in sorted_rules:
-        if r.rule in user_msg:
-            return r.response
 
-    return default_response
\ No newline at end of file
+def is_moment_question(user_msg: str) -> bool:
+    """'홈런 언제 나왔어?' 처럼 영상 속 시점을 묻는 질문인지 여부"""
+    return any(k in user_msg for k in MOMENT_KEYWORDS)
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .matcher import bump_rules_version
+from .models import Chatbot
+
+
+@receiver(post_save, sender=Chatbot)
+@receiver(post_delete, sender=Chatbot)
+def invalidate_rule_matcher(sender, **kwargs):
+    """
+    규칙이 추가/수정/삭제되면 규칙 버전을 올려 워커들의 매처를 다시 만들도록 알린다.
+    의미 검색 인덱스는 cron의 build_chatbot_index --if-stale이 바뀐 버전을 보고 다시 만든다.
+    """
+    bump_rules_version()
@@ -1,7 +1,21 @@
 import json
+import time
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
+from videos.search import search_subtitles
 from . import services  
+from .events import chat_events
+from .models import ChatLog
+
+
+def _optional_id(value):
+    """클라이언트가 보낸 선택 ID: 없으면 None, 양의 정수가 아니면 ValueError"""
+    if value in (None, ''):
+        return None
+    if isinstance(value, bool) or not str(value).isdigit():
+        raise ValueError(value)
+    return int(value)
+
 
 @require_POST  
 def chat_api(request):
@@ -12,7 +26,23 @@ def chat_api(request):
         if not user_msg:
             return JsonResponse({'response': '질문 내용을 입력해주세요.'})
 
-        best_response = services.get_chatbot_response(user_msg)
+        started = time.perf_counter()
+        try:
+            subtitle_id = _optional_id(data.get('subtitle_id'))
+            video_id = _optional_id(data.get('video_id'))
+        except ValueError:
+            return JsonResponse({'response': '잘못된 데이터 형식입니다.'}, status=400)
+        user_id = request.session.get('user_id')
+        if subtitle_id and user_id and services.is_moment_question(user_msg):
+            moments = search_subtitles(user_id, user_msg, subtitle_id=subtitle_id, limit=3)
+            if moments:
+                chat_events.record(user_msg, ChatLog.MATCH_MOMENT, (time.perf_counter() - started) * 1000,
+                                   video_id=video_id, subtitle_id=subtitle_id)
+                return JsonResponse({'response': '해당 장면을 찾았습니다. 시간을 누르면 그 장면으로 이동합니다.', 'moments': moments})
+
+        best_response, chatbot_id, match_type = services.match_chatbot(user_msg)
+        chat_events.record(user_msg, match_type, (time.perf_counter() - started) * 1000,
+                           chatbot_id=chatbot_id, video_id=video_id, subtitle_id=subtitle_id)
         return JsonResponse({'response': best_response})
 
     except json.JSONDecodeError:
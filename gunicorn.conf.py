@@ -1,2 +1,33 @@
 bind = "0.0.0.0:8000"
-workers = 3
\ No newline at end of file
+workers = 3
+
+# 앱을 fork 전에 로드해서 챗봇 규칙 매처 같은 읽기 전용 데이터를 워커들이 공유하도록 한다.
+preload_app = True
+
+
+def when_ready(server):
+    from django.db import connections
+    from chatbot.matcher import warm_matcher
+
+    try:
+        matcher = warm_matcher()
+        server.log.info(f"챗봇 규칙 매처 준비 완료 ({len(matcher)}개 규칙)")
+    except Exception as e:
+        server.log.warning(f"챗봇 규칙 매처 사전 생성 실패: {e}")
+    finally:
+        # 마스터의 DB 연결이 워커로 복제되지 않도록 닫는다.
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    # 재시작 전에 모니터링하던 RunPod 작업 복구 (잠금을 얻은 워커 하나만 실행, 이후 주기적으로 반복)
+    from videos.reconcile import start_reconciler
+    start_reconciler()
+
+
+def worker_exit(server, worker):
+    # 워커 종료 시 메모리에 남은 챗봇 로그와 캐시 지표 저장
+    from chatbot.events import chat_events
+    from SKN17_FINAL_3TEAM.cache import flush_metrics
+    chat_events.flush()
+    flush_metrics()
@@ -0,0 +1,257 @@
+import logging
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from .gateway import CircuitOpenError, KakaoPayClient
+from .models import UserInfo, SubscribeHistory, InvoiceInfo, PaymentHistory, SubscriptionState
+from .services import CYCLE_DAYS, refresh_subscription_state
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+CONCURRENCY = 16
+MAX_ATTEMPTS = 3        # 같은 주기 청구의 결제 시도 횟수 상한, 모두 실패하면 주기 종료일에 구독 종료
+
+
+def renewal_order_key(subscription_id, cycle_end_dt):
+    """구독 + 결제 주기 단위 청구 키 (같은 주기를 다시 처리해도 같은 청구서를 가리킴)"""
+    return f"renew-{subscription_id}-{int(cycle_end_dt.timestamp())}"
+
+
+def next_cycle_end(cycle_end_dt, paid_at):
+    """
+    갱신 결제 후 다음 주기 종료일 = 이전 주기 종료일 + 30일 (미리/늦게 결제해도 주기가 밀리지 않음)
+    한 주기 이상 결제가 밀려 그래도 지난 시점이면 밀린 주기를 연달아 청구하지 않도록 결제 시점부터 새 주기 시작
+    """
+    cycle_end_dt += timedelta(days=CYCLE_DAYS)
+    return cycle_end_dt if cycle_end_dt > paid_at else paid_at + timedelta(days=CYCLE_DAYS)
+
+
+def stale_state_users(now):
+    """
+    결제 대상 조회 전에 상태 행을 다시 계산해야 하는 회원 ID
+    - 구독 중인데 상태 행이 없는 회원 (상태 행 도입 전 구독 등)
+    - 전환 시점(refresh_dt)이 지난 회원 (예약 구독 시작/구독 종료가 아직 행에 반영되지 않음)
+    """
+    missing = SubscribeHistory.objects.filter(
+        Q(subscribe_end_dt__isnull=True) | Q(subscribe_end_dt__gte=now)
+    ).exclude(user_id__in=SubscriptionState.objects.values('user_id')).values_list('user_id', flat=True).distinct()
+    stale = SubscriptionState.objects.filter(refresh_dt__lte=now).values_list('user_id', flat=True)
+    return set(missing) | set(stale)
+
+
+def prepare_subscription_states(now=None, dry_run=False):
+    """
+    정기 결제 대상은 상태 행으로만 찾으므로 결제 전에 없는 행을 만들고 지난 행을 재계산한다.
+    (요금제를 바꾼 회원은 재계산 전까지 예약 구독이 남아 있어 갱신 대상에서 빠짐) 대상 회원 수 반환
+    """
+    now = now or timezone.now()
+    user_ids = sorted(stale_state_users(now))
+    if dry_run:
+        return len(user_ids)
+    for user_id in user_ids:
+        with transaction.atomic():
+            # 승인/해지/갱신과 같은 회원 행 잠금
+            UserInfo.objects.select_for_update().filter(user_id=user_id).first()
+            refresh_subscription_state(user_id, now)
+    if user_ids:
+        logger.warning(f"구독 상태 행 {len(user_ids)}명을 결제 전에 재계산했습니다.")
+    return len(user_ids)
+
+
+def due_states(until):
+    """
+    until 시점까지 주기가 끝나는 자동 갱신 대상
+    (해지 예정이거나 다음 주기 예약 구독이 있으면 이미 결제/종료가 정해져 있으므로 제외)
+    """
+    return SubscriptionState.objects.filter(
+        subscription__isnull=False,
+        expire_dt__isnull=True,
+        reserved_subscription__isnull=True,
+        cycle_end_dt__lte=until,
+    ).order_by('cycle_end_dt', 'user_id')
+
+
+def _charge(client, invoice, sid):
+    """
+    정기 결제 요청 (스레드에서 실행되므로 DB에 접근하지 않는다.)
+    Returns: (invoice, 성공 여부, 거래 ID 또는 실패 사유), 차단기로 요청하지 않았으면 성공 여부가 None
+    """
+    if not sid:
+        return invoice, False, 'SID 없음'
+    try:
+        res = client.subscription({
+            "sid": sid,
+            "partner_order_id": invoice['order_key'],
+            "partner_user_id": invoice['user_id'],
+            "item_name": "BAIS 정기결제",
+            "quantity": "1",
+            "total_amount": str(invoice['invoice_amount']),
+            "tax_free_amount": "0",
+        })
+        result = res.json()
+    except CircuitOpenError as e:
+        return invoice, None, str(e)
+    except (ConnectionError, ValueError) as e:
+        return invoice, False, str(e)[:255]
+
+    if res.status_code != 200:
+        return invoice, False, f"[{result.get('code')}] {result.get('msg')}"[:255]
+    return invoice, True, result.get('sid') or sid
+
+
+class BillingRun:
+    """
+    정기 결제 배치
+    0) 상태 행이 없거나 전환 시점이 지난 회원의 구독 상태 재계산 (dry_run이면 건수만 확인)
+    1) 대상 구독을 주기 종료일/회원 ID 키셋으로 batch_size개씩 조회
+    2) 청구서를 order_key 기준 bulk_create(ignore_conflicts)로 생성 -> 재실행해도 같은 청구서
+    3) 아직 성공 결제가 없는 청구서만 동시 concurrency개로 결제 요청
+    4) 결제 이력 bulk_create + 구독 상태의 주기 종료일 반영
+    2~4)는 배치 회원 행을 잠근 한 트랜잭션에서 처리해 결제 중 해지/요금제 변경이 끼어들지 않게 하고,
+    잠근 뒤 구독 상태를 다시 읽어 조회 이후 바뀐 회원은 청구하지 않는다.
+    중간에 멈춰도 다시 실행하면 남은 청구서부터 이어서 처리한다.
+    """
+
+    def __init__(self, client=None, batch_size=BATCH_SIZE, concurrency=CONCURRENCY, dry_run=False, log=None):
+        self.client = client or KakaoPayClient(pool_maxsize=concurrency)
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.dry_run = dry_run
+        self.log = log or logger.info
+        self.totals = {'due': 0, 'paid': 0, 'failed': 0, 'skipped': 0, 'changed': 0, 'ended': 0}
+
+    def run(self, until=None, limit=None):
+        until = until or timezone.now()
+        cursor = None
+        prepared = prepare_subscription_states(dry_run=self.dry_run)
+        if prepared:
+            self.log(f"구독 상태 재계산{' 필요' if self.dry_run else ''}: {prepared}명")
+        self.log(f"정기 결제 대상: {due_states(until).count()}건 (주기 종료 ~ {until:%Y-%m-%d %H:%M})")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while limit is None or self.totals['due'] < limit:
+                qs = due_states(until)
+                if cursor:
+                    qs = qs.filter(Q(cycle_end_dt__gt=cursor[0]) | Q(cycle_end_dt=cursor[0], user_id__gt=cursor[1]))
+                size = self.batch_size if limit is None else min(self.batch_size, limit - self.totals['due'])
+                rows = list(qs.values('user_id', 'subscription_id', 'cycle_end_dt', 'plan__price')[:size])
+                if not rows:
+                    break
+
+                cursor = (rows[-1]['cycle_end_dt'], rows[-1]['user_id'])
+                self.totals['due'] += len(rows)
+                if not self.dry_run:
+                    self._process_batch(pool, rows)
+                self.log(f"대상 {self.totals['due']}건 처리 (성공 {self.totals['paid']}, 실패 {self.totals['failed']}, "
+                         f"건너뜀 {self.totals['skipped']}, 상태 변경 {self.totals['changed']}, 구독 종료 {self.totals['ended']})")
+        return self.totals
+
+    def _lock_due(self, rows):
+        """배치 회원 행을 잠근 뒤 조회 때와 구독 상태가 같은(열린 구독, 같은 주기 종료일) 대상만 반환"""
+        user_ids = sorted(r['user_id'] for r in rows)
+        list(UserInfo.objects.select_for_update().filter(user_id__in=user_ids).order_by('user_id').values_list('user_id', flat=True))
+        current = {
+            s['user_id']: s for s in SubscriptionState.objects.filter(user_id__in=user_ids).values(
+                'user_id', 'subscription_id', 'cycle_end_dt', 'expire_dt', 'reserved_subscription_id'
+            )
+        }
+        locked = []
+        for r in rows:
+            state = current.get(r['user_id'])
+            if (state and state['subscription_id'] == r['subscription_id'] and state['cycle_end_dt'] == r['cycle_end_dt']
+                    and state['expire_dt'] is None and state['reserved_subscription_id'] is None):
+                locked.append(r)
+        self.totals['changed'] += len(rows) - len(locked)
+        return locked
+
+    def _process_batch(self, pool, rows):
+        with transaction.atomic():
+            rows = self._lock_due(rows)
+            blocked = self._charge_batch(pool, rows) if rows else 0
+        if blocked:
+            # 결제 서버 장애: 요청하지 않은 청구서는 다음 실행에서 그대로 이어서 처리
+            raise CircuitOpenError(f"결제 서버 차단으로 {blocked}건 미처리, 잠시 후 다시 실행하세요.")
+
+    def _charge_batch(self, pool, rows):
+        """청구서 생성 -> 결제 요청 -> 결과 저장, 차단기로 요청하지 못한 건수 반환"""
+        now = timezone.now()
+        by_key = {renewal_order_key(r['subscription_id'], r['cycle_end_dt']): r for r in rows}
+
+        InvoiceInfo.objects.bulk_create([
+            InvoiceInfo(subscription_id=r['subscription_id'], invoice_amount=r['plan__price'],
+                        issue_date=now.date(), order_key=key)
+            for key, r in by_key.items()
+        ], ignore_conflicts=True)
+        # MySQL은 ignore_conflicts 시 PK를 돌려주지 않으므로 키로 다시 조회
+        invoices = list(InvoiceInfo.objects.filter(order_key__in=by_key).values(
+            'invoice_id', 'order_key', 'subscription_id', 'invoice_amount'
+        ))
+
+        attempts = {
+            row['invoice_id']: row
+            for row in PaymentHistory.objects.filter(invoice_id__in=[i['invoice_id'] for i in invoices])
+            .values('invoice_id').annotate(tries=Count('pk'), paid=Count('pk', filter=Q(fail_reason__isnull=True)))
+        }
+
+        to_charge, exhausted = [], []
+        for invoice in invoices:
+            invoice['user_id'] = by_key[invoice['order_key']]['user_id']
+            stat = attempts.get(invoice['invoice_id'], {'tries': 0, 'paid': 0})
+            if stat['paid']:
+                self.totals['skipped'] += 1     # 이전 실행에서 결제됨 (상태 반영도 같은 트랜잭션에서 끝남)
+            elif stat['tries'] >= MAX_ATTEMPTS:
+                exhausted.append(invoice)
+            else:
+                invoice['tries'] = stat['tries']
+                to_charge.append(invoice)
+
+        sids = {}
+        for sub_id, sid in PaymentHistory.objects.filter(
+            invoice__subscription_id__in=[i['subscription_id'] for i in to_charge], fail_reason__isnull=True,
+        ).order_by('-payment_id').values_list('invoice__subscription_id', 'transaction_id'):
+            sids.setdefault(sub_id, sid)
+
+        results = list(pool.map(lambda inv: _charge(self.client, inv, sids.get(inv['subscription_id'])), to_charge))
+        self._save_results([r for r in results if r[1] is not None], exhausted, by_key)
+        return sum(1 for r in results if r[1] is None)
+
+    def _save_results(self, results, exhausted, by_key):
+        paid_at = timezone.now()
+        payments, paid = [], []
+
+        for invoice, ok, detail in results:
+            payments.append(PaymentHistory(
+                invoice_id=invoice['invoice_id'],
+                transaction_id=detail if ok else '',
+                payment_amount=invoice['invoice_amount'],
+                payment_date=paid_at,
+                fail_reason=None if ok else detail,
+            ))
+            if ok:
+                paid.append(invoice)
+            elif invoice['tries'] + 1 >= MAX_ATTEMPTS:
+                exhausted.append(invoice)
+
+        with transaction.atomic():
+            PaymentHistory.objects.bulk_create(payments)
+            # 회원 행을 잠근 채 다시 확인한 주기이므로 그 주기 종료일인 행만 다음 주기로 넘긴다.
+            for invoice in paid:
+                cycle_end_dt = by_key[invoice['order_key']]['cycle_end_dt']
+                SubscriptionState.objects.filter(
+                    user_id=invoice['user_id'], subscription_id=invoice['subscription_id'], cycle_end_dt=cycle_end_dt
+                ).update(cycle_end_dt=next_cycle_end(cycle_end_dt, paid_at), updated_dt=paid_at)
+            for invoice in exhausted:
+                cycle_end_dt = by_key[invoice['order_key']]['cycle_end_dt']
+                SubscribeHistory.objects.filter(
+                    subscription_id=invoice['subscription_id'], subscribe_end_dt__isnull=True
+                ).update(subscribe_end_dt=cycle_end_dt, cancel_dt=paid_at)
+                refresh_subscription_state(invoice['user_id'], paid_at)
+
+        self.totals['paid'] += len(paid)
+        self.totals['failed'] += len(results) - len(paid)
+        self.totals['ended'] += len(exhausted)
+        if exhausted:
+            logger.warning(f"결제 {MAX_ATTEMPTS}회 실패로 구독 종료: {len(exhausted)}건")
@@ -0,0 +1,141 @@
+import time
+import logging
+import threading
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CID_SUBSCRIPTION = "TCSUBSCRIP"
+
+
+class CircuitOpenError(ConnectionError):
+    """연속 실패로 차단기가 열려 있어 요청을 보내지 않고 바로 실패"""
+
+
+class CircuitBreaker:
+    """
+    연속 failure_threshold회 실패하면 reset_timeout초 동안 요청을 막고(open),
+    이후 한 건만 시험 삼아 보내(half-open) 성공하면 다시 닫는다. (워커 프로세스 단위)
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == 'open' or (state == 'half-open' and self.trial_in_flight):
+                raise CircuitOpenError("결제 서버 응답 지연으로 잠시 후 다시 시도해주세요.")
+            if state == 'half-open':
+                self.trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                logger.warning(f"카카오페이 차단기 열림 (연속 실패 {self.failures}회)")
+
+
+class KakaoPayClient:
+    """
+    카카오페이 API 클라이언트
+    - 세션 keep-alive 연결 풀 재사용 (매 요청 TLS 핸드셰이크 제거)
+    - 연결/응답 제한 시간: 느린 응답이 gunicorn 워커를 무한정 붙잡지 않도록
+    - 재시도는 요청이 전송되지 않은 연결 실패만 (승인 요청 중복 방지), ready는 5xx도 1회 재시도
+    - 차단기: 연속 실패 시 일정 시간 바로 실패
+    """
+
+    def __init__(self, base_url=None, admin_key=None, connect_timeout=None, read_timeout=None,
+                 connect_retries=2, pool_maxsize=20, breaker=None):
+        self._base_url = base_url
+        self._admin_key = admin_key
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        retry = Retry(total=connect_retries, connect=connect_retries, read=0, status=0, other=0,
+                      allowed_methods=None, backoff_factor=0.2, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def base_url(self):
+        return (self._base_url or settings.KAKAO_API_BASE_URL).rstrip('/')
+
+    @property
+    def timeout(self):
+        return (
+            self.connect_timeout or getattr(settings, 'KAKAO_CONNECT_TIMEOUT', 3),
+            self.read_timeout or getattr(settings, 'KAKAO_READ_TIMEOUT', 10),
+        )
+
+    def _headers(self):
+        admin_key = self._admin_key or getattr(settings, 'KAKAO_ADMIN_KEY', None)
+        if not admin_key:
+            raise EnvironmentError("Kakao Admin Key가 설정되지 않았습니다.")
+        return {
+            "Authorization": f"KakaoAK {admin_key}",
+            "Content-type": "application/x-www-form-urlencoded;charset=utf-8",
+        }
+
+    def _post(self, path, data, retry_on_5xx=False):
+        headers = self._headers()
+        self.breaker.before_call()
+
+        attempts = 2 if retry_on_5xx else 1
+        for attempt in range(attempts):
+            try:
+                res = self.session.post(f"{self.base_url}{path}", headers=headers, data=data, timeout=self.timeout)
+            except requests.RequestException as e:
+                self.breaker.record_failure()
+                raise ConnectionError(f"Kakao API 연결 실패: {e}") from e
+
+            if res.status_code < 500:
+                self.breaker.record_success()
+                return res
+            if attempt + 1 < attempts:
+                time.sleep(0.2)
+
+        self.breaker.record_failure()
+        return res
+
+    def ready(self, data):
+        """결제 준비 (새 tid가 발급될 뿐이므로 5xx 재시도 허용)"""
+        return self._post("/v1/payment/ready", {"cid": CID_SUBSCRIPTION, **data}, retry_on_5xx=True)
+
+    def approve(self, data):
+        """결제 승인 (재시도 시 이중 승인 위험이 있어 연결 실패만 재시도)"""
+        return self._post("/v1/payment/approve", {"cid": CID_SUBSCRIPTION, **data})
+
+    def subscription(self, data):
+        """정기 결제 (SID로 2회차 이후 결제)"""
+        return self._post("/v1/payment/subscription", {"cid": CID_SUBSCRIPTION, **data})
+
+
+kakaopay_client = KakaoPayClient()
@@ -0,0 +1,93 @@
+import time
+import uuid
+import statistics
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from payments.gateway import CID_SUBSCRIPTION, CircuitBreaker, CircuitOpenError, KakaoPayClient
+
+
+def _ready_data(i):
+    return {
+        "partner_order_id": str(uuid.uuid4()),
+        "partner_user_id": f"bench{i}",
+        "item_name": "BAIS 벤치마크",
+        "quantity": "1",
+        "total_amount": "9900",
+        "tax_free_amount": "0",
+        "approval_url": "http://127.0.0.1:8000/payments/approve/",
+        "cancel_url": "http://127.0.0.1:8000/payments/cancel/",
+        "fail_url": "http://127.0.0.1:8000/payments/fail/",
+    }
+
+
+class Command(BaseCommand):
+    help = '결제 준비(ready) 호출 지연을 측정합니다. (기존: 매번 새 연결/제한 시간 없음 vs 연결 풀 클라이언트)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='API 주소 (기본: settings.KAKAO_API_BASE_URL, 예: kakaopay_standin 주소)')
+        parser.add_argument('--count', type=int, default=300)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--skip-legacy', action='store_true', help='기존 방식 측정을 생략합니다.')
+
+    def _report(self, label, latencies, errors, fast_fails, elapsed):
+        if latencies:
+            ordered = sorted(latencies)
+            p = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+            summary = (f"p50 {statistics.median(ordered) * 1000:.1f}ms, p95 {p(0.95):.1f}ms, "
+                       f"p99 {p(0.99):.1f}ms, max {ordered[-1] * 1000:.1f}ms")
+        else:
+            summary = '성공 없음'
+        total = len(latencies) + errors + fast_fails
+        self.stdout.write(
+            f"[{label}] {total}건 {elapsed:.2f}s -> {total / elapsed:.1f}건/s | {summary} | "
+            f"실패 {errors}건, 차단기 즉시 실패 {fast_fails}건"
+        )
+
+    def _run(self, label, call, count, concurrency):
+        latencies, errors, fast_fails = [], 0, 0
+
+        def one(i):
+            started = time.perf_counter()
+            try:
+                res = call(_ready_data(i))
+                return ('ok' if res.status_code == 200 else 'error'), time.perf_counter() - started
+            except CircuitOpenError:
+                return 'open', 0
+            except Exception:
+                return 'error', 0
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for kind, latency in pool.map(one, range(count)):
+                if kind == 'ok':
+                    latencies.append(latency)
+                elif kind == 'open':
+                    fast_fails += 1
+                else:
+                    errors += 1
+        self._report(label, latencies, errors, fast_fails, time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        base_url = (options['url'] or settings.KAKAO_API_BASE_URL).rstrip('/')
+        admin_key = settings.KAKAO_ADMIN_KEY or 'bench'
+        count, concurrency = options['count'], options['concurrency']
+        self.stdout.write(f'대상: {base_url} ({count}건, 동시 {concurrency})')
+
+        if not options['skip_legacy']:
+            headers = {
+                "Authorization": f"KakaoAK {admin_key}",
+                "Content-type": "application/x-www-form-urlencoded;charset=utf-8",
+            }
+            legacy = lambda data: requests.post(f"{base_url}/v1/payment/ready", headers=headers,
+                                                data={"cid": CID_SUBSCRIPTION, **data})
+            self._run('기존 requests.post', legacy, count, concurrency)
+
+        client = KakaoPayClient(base_url=base_url, admin_key=admin_key, pool_maxsize=concurrency,
+                                breaker=CircuitBreaker())
+        try:
+            self._run('연결 풀 클라이언트', client.ready, count, concurrency)
+        finally:
+            client.session.close()
+        self.stdout.write(self.style.SUCCESS(f'차단기 상태: {client.breaker.state}'))
@@ -0,0 +1,164 @@
+import sys
+import json
+import time
+import uuid
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency, fail_rate, stall_rate, stall_seconds, quiet):
+        super().__init__(address, StandinHandler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.quiet = quiet
+        self.lock = threading.Lock()
+        self.payments = {}      # tid -> ready 요청 내용 (approval_url, partner 정보, 금액)
+        self.counts = {'ready': 0, 'approve': 0, 'subscription': 0, 'error': 0, 'stall': 0}
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 제한 시간으로 먼저 끊은 경우는 정상 상황
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """
+    카카오페이 결제 API 대역 서버 (로컬 개발/부하 테스트용, 실제 결제 없음)
+    POST /v1/payment/ready, /v1/payment/approve, /v1/payment/subscription
+    GET  /standin/pay?tid=...  -> 결제창 대신 approval_url로 pg_token을 붙여 바로 이동
+    """
+    protocol_version = 'HTTP/1.1'   # keep-alive (연결 재사용 효과를 측정할 수 있도록)
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 지연 ACK로 40ms씩 밀리지 않도록
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _json(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _count(self, name):
+        with self.server.lock:
+            self.server.counts[name] += 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/standin/pay':
+            return self._json(404, {'code': -404, 'msg': 'not found'})
+
+        tid = parse_qs(url.query).get('tid', [''])[0]
+        payment = self.server.payments.get(tid)
+        if not payment:
+            return self._json(400, {'code': -702, 'msg': 'invalid tid'})
+
+        self.send_response(302)
+        self.send_header('Location', f"{payment['approval_url']}?{urlencode({'pg_token': uuid.uuid4().hex[:20]})}")
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        server = self.server
+
+        if not (self.headers.get('Authorization') or '').startswith('KakaoAK '):
+            return self._json(401, {'code': -401, 'msg': 'invalid admin key'})
+
+        if server.stall_rate and random.random() < server.stall_rate:
+            self._count('stall')
+            time.sleep(server.stall_seconds)
+        elif server.latency:
+            time.sleep(server.latency)
+
+        if server.fail_rate and random.random() < server.fail_rate:
+            self._count('error')
+            return self._json(500, {'code': -780, 'msg': 'standin internal error'})
+
+        now = timezone.now().isoformat(timespec='seconds')
+        path = urlparse(self.path).path
+
+        if path == '/v1/payment/ready':
+            self._count('ready')
+            tid = f"T{uuid.uuid4().hex[:19]}"
+            with server.lock:
+                server.payments[tid] = form
+            host = self.headers.get('Host') or f'{server.server_address[0]}:{server.server_address[1]}'
+            next_url = f"http://{host}/standin/pay?tid={tid}"
+            return self._json(200, {
+                'tid': tid,
+                'next_redirect_pc_url': next_url,
+                'next_redirect_mobile_url': next_url,
+                'created_at': now,
+            })
+
+        if path in ('/v1/payment/approve', '/v1/payment/subscription'):
+            if path.endswith('approve'):
+                self._count('approve')
+                with server.lock:
+                    ready = server.payments.pop(form.get('tid'), None)
+                if ready is None:
+                    return self._json(400, {'code': -702, 'msg': 'payment already approved or invalid tid'})
+                amount = int(ready.get('total_amount') or 0)
+            else:
+                self._count('subscription')
+                if not form.get('sid'):
+                    return self._json(400, {'code': -797, 'msg': 'sid is required'})
+                amount = int(form.get('total_amount') or 0)
+
+            return self._json(200, {
+                'aid': f"A{uuid.uuid4().hex[:19]}",
+                'tid': form.get('tid') or f"T{uuid.uuid4().hex[:19]}",
+                'cid': form.get('cid'),
+                'sid': form.get('sid') or f"S{uuid.uuid4().hex[:19]}",
+                'partner_order_id': form.get('partner_order_id'),
+                'partner_user_id': form.get('partner_user_id'),
+                'payment_method_type': 'MONEY',
+                'amount': {'total': amount, 'tax_free': 0, 'vat': amount // 11},
+                'approved_at': now,
+                'created_at': now,
+            })
+
+        return self._json(404, {'code': -404, 'msg': 'not found'})
+
+
+class Command(BaseCommand):
+    help = '로컬 개발/부하 테스트용 카카오페이 API 대역 서버를 실행합니다. (KAKAO_API_BASE_URL=http://127.0.0.1:8090)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8090)
+        parser.add_argument('--latency', type=float, default=0.0, help='요청당 응답 지연(초)')
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='500 응답 비율 0~1')
+        parser.add_argument('--stall-rate', type=float, default=0.0, help='응답을 --stall-seconds 동안 멈추는 비율 0~1')
+        parser.add_argument('--stall-seconds', type=float, default=30.0)
+        parser.add_argument('--quiet', action='store_true')
+
+    def handle(self, *args, **options):
+        server = StandinServer(
+            (options['host'], options['port']), options['latency'], options['fail_rate'],
+            options['stall_rate'], options['stall_seconds'], options['quiet'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"카카오페이 대역 서버 실행 중: http://{options['host']}:{options['port']}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(', '.join(f'{k} {v}건' for k, v in server.counts.items()))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from payments.models import SubscribeHistory, SubscriptionState
+from payments.services import refresh_subscription_state
+
+
+class Command(BaseCommand):
+    help = '구독 이력/결제 이력으로 회원별 구독 상태(SUBSCRIPTION_STATE)를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='user_id', help='특정 회원만 재계산합니다.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+
+        if options['user_id']:
+            user_ids = [options['user_id']]
+        else:
+            user_ids = list(SubscribeHistory.objects.values_list('user_id', flat=True).distinct())
+
+        for user_id in user_ids:
+            with transaction.atomic():
+                refresh_subscription_state(user_id, now)
+
+        # 구독 이력이 모두 사라진 회원의 상태 행 정리
+        removed = 0
+        if not options['user_id']:
+            removed, _ = SubscriptionState.objects.exclude(user_id__in=SubscribeHistory.objects.values('user_id')).delete()
+
+        self.stdout.write(self.style.SUCCESS(f'총 {len(user_ids)}명의 구독 상태를 갱신했습니다. (정리 {removed}건)'))
@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from payments.billing import BATCH_SIZE, CONCURRENCY, BillingRun
+from payments.gateway import CircuitOpenError, KakaoPayClient
+
+
+class Command(BaseCommand):
+    help = '결제 주기가 끝난 구독을 정기 결제합니다. (중단 후 다시 실행하면 이어서 처리, 같은 주기는 중복 청구하지 않음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead-hours', type=float, default=0, help='지금부터 N시간 안에 주기가 끝나는 구독까지 포함')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help='동시 결제 요청 수')
+        parser.add_argument('--limit', type=int, help='이번 실행에서 처리할 최대 건수')
+        parser.add_argument('--gateway-url', help='결제 API 주소 (예: kakaopay_standin 주소, 기본: settings.KAKAO_API_BASE_URL)')
+        parser.add_argument('--dry-run', action='store_true', help='대상 건수만 확인합니다. (구독 상태 재계산도 하지 않음)')
+
+    def handle(self, *args, **options):
+        until = timezone.now() + timedelta(hours=options['ahead_hours'])
+
+        client = KakaoPayClient(base_url=options['gateway_url'], pool_maxsize=options['concurrency'])
+        billing = BillingRun(
+            client=client, batch_size=options['batch_size'], concurrency=options['concurrency'],
+            dry_run=options['dry_run'], log=self.stdout.write,
+        )
+
+        started = time.perf_counter()
+        try:
+            totals = billing.run(until=until, limit=options['limit'])
+        except CircuitOpenError as e:
+            raise CommandError(str(e))
+        finally:
+            client.session.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"완료: 대상 {totals['due']}건, 성공 {totals['paid']}건, 실패 {totals['failed']}건, "
+            f"이미 결제 {totals['skipped']}건, 상태 변경 {totals['changed']}건, 구독 종료 {totals['ended']}건 ({elapsed:.1f}s)"
+        ))
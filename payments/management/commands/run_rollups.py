@@ -0,0 +1,15 @@
+import time
+from django.core.management.base import BaseCommand
+from payments.rollups import run_rollups
+
+
+class Command(BaseCommand):
+    help = '결제/해지/구단별 구독 회원 일별 집계를 갱신합니다. (지난 실행 이후 새로 생긴 행만 반영, cron 등으로 주기 실행)'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = run_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"집계 완료: 결제 {result['payments']}건, 해지 {result['cancels']}건 반영, "
+            f"구독 회원 {result['active_users']}명 ({time.perf_counter() - started:.1f}s)"
+        ))
@@ -27,9 +27,13 @@ class SubscribeHistory(models.Model):
     plan = models.ForeignKey(PlanInfo, on_delete=models.CASCADE, db_column='PLAN_ID')
     subscribe_start_dt = models.DateTimeField(db_column='SUBSCRIBE_START_DT')
     subscribe_end_dt = models.DateTimeField(null=True, blank=True, db_column='SUBSCRIBE_END_DT')
+    cancel_dt = models.DateTimeField(null=True, blank=True, db_column='CANCEL_DT', help_text="해지 요청/결제 실패 종료 시각 (갱신 시 초기화)")
 
     class Meta:
         db_table = 'SUBSCRIBE_HISTORY'
+        indexes = [
+            models.Index(fields=['cancel_dt'], name='IDX_SUBSCRIBE_HISTORY_CANCEL'),
+        ]
         verbose_name = '구독 이력'
         verbose_name_plural = '구독 이력 목록'
 
@@ -43,6 +47,7 @@ class InvoiceInfo(models.Model):
     subscription = models.ForeignKey(SubscribeHistory, on_delete=models.CASCADE, db_column='SUBSCRIPTION_ID')
     invoice_amount = models.BigIntegerField(db_column='INVOICE_AMOUNT')
     issue_date = models.DateField(db_column='ISSUE_DATE')
+    order_key = models.CharField(max_length=64, unique=True, null=True, blank=True, db_column='ORDER_KEY', help_text="중복 청구 방지 키 (결제 요청의 partner_order_id)")
 
     class Meta:
         db_table = 'INVOICE_INFO'
@@ -64,5 +69,96 @@ class PaymentHistory(models.Model):
 
     class Meta:
         db_table = 'PAYMENT_HISTORY'
+        indexes = [
+            models.Index(fields=['transaction_id'], name='IDX_PAYMENT_TRANSACTION'),
+        ]
         verbose_name = '결제 이력'
-        verbose_name_plural = '결제 이력 목록'
\ No newline at end of file
+        verbose_name_plural = '결제 이력 목록'
+
+class SubscriptionState(models.Model):
+    """
+    15) 구독 상태
+    회원별 현재 구독/예약 구독/주기 종료일/저장 용량을 한 행으로 유지한다.
+    결제 승인, 해지, 갱신 시 같은 트랜잭션 안에서 갱신되며 rebuild_subscription_state로 재생성할 수 있다.
+    """
+    user = models.OneToOneField(UserInfo, on_delete=models.CASCADE, primary_key=True, db_column='USER_ID', related_name='subscription_state')
+    subscription = models.ForeignKey(SubscribeHistory, on_delete=models.SET_NULL, null=True, blank=True, db_column='SUBSCRIPTION_ID', related_name='+', help_text="현재 이용 중인 구독")
+    plan = models.ForeignKey(PlanInfo, on_delete=models.SET_NULL, null=True, blank=True, db_column='PLAN_ID', related_name='+')
+    cycle_end_dt = models.DateTimeField(null=True, blank=True, db_column='CYCLE_END_DT', help_text="현재 결제 주기 종료일 (첫 주기는 구독 시작일 + 30일, 갱신 결제마다 + 30일)")
+    expire_dt = models.DateTimeField(null=True, blank=True, db_column='EXPIRE_DT', help_text="현재 구독의 해지 예정일")
+    reserved_subscription = models.ForeignKey(SubscribeHistory, on_delete=models.SET_NULL, null=True, blank=True, db_column='RESERVED_SUBSCRIPTION_ID', related_name='+', help_text="다음 주기에 시작되는 예약 구독")
+    reserved_plan = models.ForeignKey(PlanInfo, on_delete=models.SET_NULL, null=True, blank=True, db_column='RESERVED_PLAN_ID', related_name='+')
+    reserved_start_dt = models.DateTimeField(null=True, blank=True, db_column='RESERVED_START_DT')
+    reserved_expire_dt = models.DateTimeField(null=True, blank=True, db_column='RESERVED_EXPIRE_DT')
+    cancel_yn = models.BooleanField(default=False, db_column='CANCEL_YN', help_text="마지막 구독(예약 포함)의 해지 여부")
+    storage_limit = models.IntegerField(default=0, db_column='STORAGE_LIMIT', help_text="단위: KB")
+    refresh_dt = models.DateTimeField(null=True, blank=True, db_column='REFRESH_DT', help_text="예약 시작/해지 시점, 이후 조회 시 재계산")
+    updated_dt = models.DateTimeField(auto_now=True, db_column='UPDATED_DT')
+
+    class Meta:
+        db_table = 'SUBSCRIPTION_STATE'
+        indexes = [
+            # 정기 결제 대상 조회 (run_billing: 주기 종료일 순 + PK 키셋)
+            models.Index(fields=['cycle_end_dt'], name='IDX_SUBSCRIPTION_STATE_CYCLE'),
+        ]
+        verbose_name = '구독 상태'
+        verbose_name_plural = '구독 상태 목록'
+
+
+class DailyPlanStat(models.Model):
+    """
+    18) 일별 플랜 통계
+    결제/신규/갱신/해지 건수와 매출을 일자·플랜별로 누적한다. (run_rollups가 새 행만 반영)
+    """
+    stat_id = models.BigAutoField(primary_key=True, db_column='STAT_ID')
+    stat_date = models.DateField(db_column='STAT_DATE')
+    plan = models.ForeignKey(PlanInfo, on_delete=models.CASCADE, db_column='PLAN_ID')
+    revenue = models.BigIntegerField(default=0, db_column='REVENUE', help_text="성공 결제 금액 합계")
+    payment_count = models.IntegerField(default=0, db_column='PAYMENT_COUNT')
+    fail_count = models.IntegerField(default=0, db_column='FAIL_COUNT')
+    new_count = models.IntegerField(default=0, db_column='NEW_COUNT', help_text="신규/플랜 변경 결제")
+    renew_count = models.IntegerField(default=0, db_column='RENEW_COUNT', help_text="정기 결제")
+    cancel_count = models.IntegerField(default=0, db_column='CANCEL_COUNT')
+
+    class Meta:
+        db_table = 'DAILY_PLAN_STAT'
+        constraints = [
+            models.UniqueConstraint(fields=['stat_date', 'plan'], name='UQ_DAILY_PLAN_STAT'),
+        ]
+        verbose_name = '일별 플랜 통계'
+        verbose_name_plural = '일별 플랜 통계 목록'
+
+
+class DailyTeamStat(models.Model):
+    """
+    19) 일별 구단 통계
+    집계 시점의 응원 구단별 구독 중 회원 수 (하루 한 행, 같은 날 다시 집계하면 덮어씀)
+    """
+    stat_id = models.BigAutoField(primary_key=True, db_column='STAT_ID')
+    stat_date = models.DateField(db_column='STAT_DATE')
+    team_code = models.CharField(max_length=30, db_column='TEAM_CODE', help_text="미선택은 NONE")
+    active_users = models.IntegerField(default=0, db_column='ACTIVE_USERS')
+
+    class Meta:
+        db_table = 'DAILY_TEAM_STAT'
+        constraints = [
+            models.UniqueConstraint(fields=['stat_date', 'team_code'], name='UQ_DAILY_TEAM_STAT'),
+        ]
+        verbose_name = '일별 구단 통계'
+        verbose_name_plural = '일별 구단 통계 목록'
+
+
+class RollupWatermark(models.Model):
+    """
+    20) 집계 기준점
+    원본 테이블별로 어디까지 집계했는지(마지막 PK 또는 시각)를 저장한다.
+    """
+    name = models.CharField(max_length=50, primary_key=True, db_column='NAME')
+    last_id = models.BigIntegerField(default=0, db_column='LAST_ID')
+    last_dt = models.DateTimeField(null=True, blank=True, db_column='LAST_DT')
+    updated_dt = models.DateTimeField(auto_now=True, db_column='UPDATED_DT')
+
+    class Meta:
+        db_table = 'ROLLUP_WATERMARK'
+        verbose_name = '집계 기준점'
+        verbose_name_plural = '집계 기준점 목록'
@@ -0,0 +1,170 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.utils import timezone
+from users.context import team_code_from_value
+from .models import PaymentHistory, SubscribeHistory, SubscriptionState, DailyPlanStat, DailyTeamStat, RollupWatermark
+
+CHUNK_SIZE = 5000
+# 늦게 커밋되는 트랜잭션의 행을 건너뛰지 않도록 이 시간보다 오래된 행까지만 집계
+ROLLUP_LAG_SECONDS = 120
+
+
+def _lock_watermark(name):
+    RollupWatermark.objects.get_or_create(name=name)
+    return RollupWatermark.objects.select_for_update().get(name=name)
+
+
+def _merge_plan_stats(deltas):
+    """{(일자, 플랜 ID): Counter} 를 일별 플랜 통계에 더한다. (없는 행은 bulk_create)"""
+    if not deltas:
+        return
+    existing = {
+        (row['stat_date'], row['plan_id']): row['stat_id']
+        for row in DailyPlanStat.objects.filter(
+            stat_date__in={d for d, _ in deltas}, plan_id__in={p for _, p in deltas}
+        ).values('stat_id', 'stat_date', 'plan_id')
+    }
+
+    new_rows = []
+    for (stat_date, plan_id), counts in deltas.items():
+        if (stat_date, plan_id) in existing:
+            DailyPlanStat.objects.filter(stat_id=existing[(stat_date, plan_id)]).update(
+                **{field: F(field) + value for field, value in counts.items()}
+            )
+        else:
+            new_rows.append(DailyPlanStat(stat_date=stat_date, plan_id=plan_id, **counts))
+    DailyPlanStat.objects.bulk_create(new_rows)
+
+
+def rollup_payments(now=None):
+    """결제 이력: 마지막으로 집계한 PK 이후 행만 CHUNK_SIZE개씩 반영 (청크마다 커밋, 중단 후 이어서 실행 가능)"""
+    now = now or timezone.now()
+    processed = 0
+
+    while True:
+        with transaction.atomic():
+            mark = _lock_watermark('payment')
+            upper = PaymentHistory.objects.filter(
+                pk__gt=mark.last_id, payment_date__lte=now - timedelta(seconds=ROLLUP_LAG_SECONDS)
+            ).aggregate(upper=Max('pk'))['upper']
+            if upper is None:
+                return processed
+
+            rows = list(PaymentHistory.objects.filter(pk__gt=mark.last_id, pk__lte=upper).order_by('pk').values(
+                'pk', 'payment_date', 'payment_amount', 'fail_reason',
+                'invoice__order_key', 'invoice__subscription__plan_id',
+            )[:CHUNK_SIZE])
+
+            deltas = defaultdict(Counter)
+            for row in rows:
+                counts = deltas[(timezone.localdate(row['payment_date']), row['invoice__subscription__plan_id'])]
+                if row['fail_reason'] is not None:
+                    counts['fail_count'] += 1
+                    continue
+                counts['payment_count'] += 1
+                counts['revenue'] += row['payment_amount']
+                # run_billing 청구서는 'renew-' 키, 그 외(결제 승인)는 신규/플랜 변경
+                if (row['invoice__order_key'] or '').startswith('renew-'):
+                    counts['renew_count'] += 1
+                else:
+                    counts['new_count'] += 1
+
+            _merge_plan_stats(deltas)
+            mark.last_id = rows[-1]['pk']
+            mark.save()
+            processed += len(rows)
+
+
+def rollup_cancels(now=None):
+    """해지: 마지막 집계 시각 이후 cancel_dt가 기록된 구독 반영"""
+    now = now or timezone.now()
+    upper = now - timedelta(seconds=ROLLUP_LAG_SECONDS)
+
+    with transaction.atomic():
+        mark = _lock_watermark('cancel')
+        qs = SubscribeHistory.objects.filter(cancel_dt__lte=upper)
+        if mark.last_dt:
+            qs = qs.filter(cancel_dt__gt=mark.last_dt)
+
+        deltas = defaultdict(Counter)
+        processed = 0
+        for cancel_dt, plan_id in qs.values_list('cancel_dt', 'plan_id').iterator(chunk_size=CHUNK_SIZE):
+            deltas[(timezone.localdate(cancel_dt), plan_id)]['cancel_count'] += 1
+            processed += 1
+
+        _merge_plan_stats(deltas)
+        mark.last_dt = upper
+        mark.save()
+    return processed
+
+
+def snapshot_team_stats(now=None):
+    """오늘 기준 응원 구단별 구독 중 회원 수 (구독 상태 행을 구단별로 한 번 집계)"""
+    now = now or timezone.now()
+    stat_date = timezone.localdate(now)
+
+    totals = Counter()
+    for raw_code, count in SubscriptionState.objects.filter(
+        subscription__isnull=False, user__closed_yn=False,
+    ).filter(
+        Q(expire_dt__isnull=True) | Q(expire_dt__gt=now)
+    ).values_list('user__favorite_code__common_code_value').annotate(count=Count('pk')):
+        totals[team_code_from_value(raw_code) if raw_code else 'NONE'] += count
+
+    with transaction.atomic():
+        DailyTeamStat.objects.filter(stat_date=stat_date).delete()
+        DailyTeamStat.objects.bulk_create([
+            DailyTeamStat(stat_date=stat_date, team_code=team_code, active_users=count)
+            for team_code, count in totals.items()
+        ])
+    return sum(totals.values())
+
+
+def run_rollups(now=None):
+    now = now or timezone.now()
+    return {
+        'payments': rollup_payments(now),
+        'cancels': rollup_cancels(now),
+        'active_users': snapshot_team_stats(now),
+    }
+
+
+def dashboard_data(days=30):
+    """관리자 대시보드: 최근 days일 집계 테이블만 조회 (원본 이력 테이블은 읽지 않음)"""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    plan_stats = DailyPlanStat.objects.filter(stat_date__gte=start)
+    sums = dict(revenue=Sum('revenue'), payments=Sum('payment_count'), fails=Sum('fail_count'),
+                new=Sum('new_count'), renew=Sum('renew_count'), cancel=Sum('cancel_count'))
+
+    by_plan = list(plan_stats.values('plan__plan_name').annotate(**sums).order_by('-revenue'))
+    total_revenue = sum(row['revenue'] or 0 for row in by_plan)
+    for row in by_plan:
+        row['share'] = round((row['revenue'] or 0) * 100 / total_revenue, 1) if total_revenue else 0
+
+    daily = list(plan_stats.values('stat_date').annotate(**sums).order_by('-stat_date'))
+
+    latest_team_date = DailyTeamStat.objects.aggregate(latest=Max('stat_date'))['latest']
+    teams = list(DailyTeamStat.objects.filter(stat_date=latest_team_date).order_by('-active_users')) if latest_team_date else []
+    active_now = sum(t.active_users for t in teams)
+
+    # 해지율: 기간 시작일 구독 회원 수 대비 기간 내 해지 건수 (시작일 스냅샷이 없으면 가장 가까운 이후 스냅샷)
+    base_date = DailyTeamStat.objects.filter(stat_date__gte=start).aggregate(base=Min('stat_date'))['base']
+    base_active = DailyTeamStat.objects.filter(stat_date=base_date).aggregate(n=Sum('active_users'))['n'] if base_date else None
+    cancels = sum(row['cancel'] or 0 for row in by_plan)
+
+    return {
+        'days': days,
+        'start': start,
+        'by_plan': by_plan,
+        'daily': daily,
+        'teams': teams,
+        'team_date': latest_team_date,
+        'total_revenue': total_revenue,
+        'active_now': active_now,
+        'churn_rate': round(cancels * 100 / base_active, 1) if base_active else None,
+        'cancels': cancels,
+        'watermarks': list(RollupWatermark.objects.order_by('name')),
+    }
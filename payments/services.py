@@ -1,10 +1,80 @@
-import requests
+import csv
 import uuid
-from datetime import timedelta
-from django.conf import settings
+import base64
+from datetime import datetime, timedelta
 from django.utils import timezone
+from django.db import IntegrityError, transaction
 from django.db.models import Q
-from .models import UserInfo, PlanInfo, SubscribeHistory, InvoiceInfo, PaymentHistory
+from .models import UserInfo, PlanInfo, SubscribeHistory, InvoiceInfo, PaymentHistory, SubscriptionState
+from .gateway import kakaopay_client
+
+CYCLE_DAYS = 30
+
+
+def _build_subscription_state(user_id, now):
+    """구독 이력/결제 이력으로 회원의 현재 구독 상태를 계산 (저장하지 않음)"""
+    current_sub = SubscribeHistory.objects.select_related('plan').filter(
+        user_id=user_id,
+        subscribe_start_dt__lte=now
+    ).filter(
+        Q(subscribe_end_dt__gte=now) | Q(subscribe_end_dt__isnull=True)
+    ).order_by('-subscribe_start_dt').first()
+
+    future_sub = SubscribeHistory.objects.select_related('plan').filter(
+        user_id=user_id, subscribe_start_dt__gt=now
+    ).order_by('subscribe_start_dt').first()
+
+    state = SubscriptionState(user_id=user_id)
+
+    if current_sub:
+        last_pay = PaymentHistory.objects.filter(
+            invoice__subscription=current_sub, fail_reason__isnull=True
+        ).order_by('-payment_date').first()
+        # 첫 주기: 구독 시작일 기준 (예약 구독은 시작 전에 결제되므로 결제일이 시작일보다 앞설 수 있음)
+        base_date = max(current_sub.subscribe_start_dt, last_pay.payment_date) if last_pay else current_sub.subscribe_start_dt
+        state.subscription = current_sub
+        state.plan = current_sub.plan
+        state.cycle_end_dt = base_date + timedelta(days=CYCLE_DAYS)
+        state.expire_dt = current_sub.subscribe_end_dt
+
+    if future_sub:
+        state.reserved_subscription = future_sub
+        state.reserved_plan = future_sub.plan
+        state.reserved_start_dt = future_sub.subscribe_start_dt
+        state.reserved_expire_dt = future_sub.subscribe_end_dt
+
+    # 예약 구독이 있으면 예약 구독 기준 (기존 설정 화면/보관함 용량 계산과 동일)
+    target_sub = future_sub or current_sub
+    state.cancel_yn = bool(target_sub and target_sub.subscribe_end_dt)
+    state.storage_limit = target_sub.plan.storage_limit if target_sub else 0
+
+    # 예약 구독 시작 또는 현재 구독 종료 시점이 지나면 상태가 바뀌므로 그때 재계산
+    transitions = [dt for dt in (state.reserved_start_dt, state.expire_dt) if dt]
+    state.refresh_dt = min(transitions) if transitions else None
+    return state
+
+
+def refresh_subscription_state(user_id, now=None):
+    """구독 상태 행 재계산 후 저장 (결제/구독 변경 트랜잭션 안에서 호출)"""
+    state = _build_subscription_state(user_id, now or timezone.now())
+    if state.subscription_id:
+        # 같은 구독이면 정기 결제가 이어 둔 주기 종료일(이전 주기 종료일 + 30일)을 그대로 사용
+        stored_cycle_end = SubscriptionState.objects.filter(
+            user_id=user_id, subscription_id=state.subscription_id
+        ).values_list('cycle_end_dt', flat=True).first()
+        state.cycle_end_dt = stored_cycle_end or state.cycle_end_dt
+    state.save()
+    return state
+
+
+def get_subscription_state(user_id):
+    """구독 상태 조회 (행이 없거나 전환 시점이 지났으면 재계산)"""
+    now = timezone.now()
+    state = SubscriptionState.objects.select_related('plan', 'reserved_plan').filter(user_id=user_id).first()
+    if state is None or (state.refresh_dt and state.refresh_dt <= now):
+        state = refresh_subscription_state(user_id, now)
+    return state
+
 
 def prepare_kakao_payment(user_id, plan_code):
     """
@@ -21,18 +91,7 @@ def prepare_kakao_payment(user_id, plan_code):
     total_amount = plan_obj.price
     partner_order_id = str(uuid.uuid4())
 
-    admin_key = getattr(settings, 'KAKAO_ADMIN_KEY', None)
-    if not admin_key:
-        raise EnvironmentError("Kakao Admin Key가 설정되지 않았습니다.")
-
-    url = f"{settings.KAKAO_API_BASE_URL}/v1/payment/ready"
-    headers = {
-        "Authorization": f"KakaoAK {admin_key}",
-        "Content-type": "application/x-www-form-urlencoded;charset=utf-8",
-    }
-
     data = {
-        "cid": "TCSUBSCRIP",
         "partner_order_id": partner_order_id,
         "partner_user_id": user_id,
         "item_name": item_name,
@@ -44,7 +103,7 @@ def prepare_kakao_payment(user_id, plan_code):
         "fail_url": "http://54.116.12.113:8080/payments/fail/",
     }
 
-    res = requests.post(url, headers=headers, data=data)
+    res = kakaopay_client.ready(data)
     result = res.json()
 
     if 'next_redirect_pc_url' not in result:
@@ -61,9 +120,33 @@ def prepare_kakao_payment(user_id, plan_code):
     return result.get('next_redirect_pc_url'), session_data
 
 
+def _approval_result(invoice_id):
+    """저장된 승인 결과 (결제 완료 화면 데이터) 조회, 없으면 None"""
+    payment = PaymentHistory.objects.select_related('invoice__subscription__user', 'invoice__subscription__plan').filter(
+        invoice_id=invoice_id, fail_reason__isnull=True
+    ).order_by('payment_id').first()
+    if payment is None:
+        return None
+
+    subscription = payment.invoice.subscription
+    plan_name_display = "프리미엄" if subscription.plan.plan_name == "PREMIUM" else "베이직"
+    return {
+        'user': subscription.user,
+        'plan_name': f"{plan_name_display} 플랜",
+        'payment_date': payment.payment_date.strftime('%Y.%m.%d'),
+        'payment_amount': f"{int(payment.payment_amount):,}원"
+    }
+
+
+def _find_approval(partner_order_id):
+    invoice_id = InvoiceInfo.objects.filter(order_key=partner_order_id).values_list('invoice_id', flat=True).first()
+    return _approval_result(invoice_id) if invoice_id else None
+
+
 def approve_kakao_payment(pg_token, session_data):
     """
     2. 결제 승인 (Approve) 및 DB 업데이트 로직
+    partner_order_id를 청구서 order_key로 저장해 같은 주문의 재요청(새로고침/재시도)은 조회만 하고 저장된 결과를 반환한다.
     """
     tid = session_data.get('tid')
     partner_order_id = session_data.get('partner_order_id')
@@ -71,76 +154,91 @@ def approve_kakao_payment(pg_token, session_data):
     plan_id = session_data.get('plan_id')
     amount = session_data.get('total_amount')
 
-    url = f"{settings.KAKAO_API_BASE_URL}/v1/payment/approve"
-    headers = {
-        "Authorization": f"KakaoAK {settings.KAKAO_ADMIN_KEY}",
-        "Content-type": "application/x-www-form-urlencoded;charset=utf-8",
-    }
+    stored = _find_approval(partner_order_id)
+    if stored:
+        return True, stored, None
+
     data = {
-        "cid": "TCSUBSCRIP",
         "tid": tid,
         "partner_order_id": partner_order_id,
         "partner_user_id": partner_user_id,
         "pg_token": pg_token,
     }
 
-    res = requests.post(url, headers=headers, data=data)
-    result = res.json()
+    try:
+        res = kakaopay_client.approve(data)
+        result = res.json()
+    except (ConnectionError, ValueError) as e:
+        return False, None, str(e)
 
     now = timezone.now()
     is_success = (res.status_code == 200)
-    
+
     if not is_success:
-        return False, f"[{result.get('code')}] {result.get('msg')}", None
+        # 동시에 들어온 같은 주문의 다른 요청이 먼저 승인/저장한 경우
+        stored = _find_approval(partner_order_id)
+        if stored:
+            return True, stored, None
+        return False, None, f"[{result.get('code')}] {result.get('msg')}"
 
     try:
-        user = UserInfo.objects.get(user_id=partner_user_id)
-        target_plan = PlanInfo.objects.get(plan_id=plan_id)
-        
-        current_sub = SubscribeHistory.objects.filter(
-            user=user
-        ).filter(
-            Q(subscribe_end_dt__isnull=True) | Q(subscribe_end_dt__gte=now)
-        ).order_by('-subscribe_start_dt').first()
+        with transaction.atomic():
+            # 회원 행 잠금으로 같은 회원의 승인/해지/갱신을 직렬화한 뒤 다시 확인
+            user = UserInfo.objects.select_for_update().get(user_id=partner_user_id)
+            invoice_id = InvoiceInfo.objects.filter(order_key=partner_order_id).values_list('invoice_id', flat=True).first()
+            if invoice_id:
+                return True, _approval_result(invoice_id), None
+
+            list(SubscribeHistory.objects.select_for_update().filter(user_id=partner_user_id).filter(
+                Q(subscribe_end_dt__isnull=True) | Q(subscribe_end_dt__gte=now)
+            ).values_list('subscription_id', flat=True))
+            target_plan = PlanInfo.objects.get(plan_id=plan_id)
+            state = get_subscription_state(partner_user_id)
 
-        new_start_dt = now
+            new_start_dt = now
 
-        if current_sub:
-            if current_sub.subscribe_end_dt:
-                cycle_end_date = current_sub.subscribe_end_dt
+            # 가장 마지막 구독(예약 구독 우선)이 끝나는 시점 다음부터 새 구독 시작
+            if state.reserved_subscription_id:
+                last_sub_id, last_end_dt = state.reserved_subscription_id, state.reserved_expire_dt
+                cycle_end_date = state.reserved_start_dt + timedelta(days=CYCLE_DAYS)
             else:
-                last_pay = PaymentHistory.objects.filter(invoice__subscription=current_sub).order_by('-payment_date').first()
-                base_date = last_pay.payment_date if last_pay else current_sub.subscribe_start_dt
-                cycle_end_date = base_date + timedelta(days=30)
-                
-                if cycle_end_date < now:
-                    cycle_end_date = now
-
-                current_sub.subscribe_end_dt = cycle_end_date
-                current_sub.save()
-
-            new_start_dt = cycle_end_date + timedelta(seconds=1)
-
-        new_sub = SubscribeHistory.objects.create(
-            user=user,
-            plan=target_plan,
-            subscribe_start_dt=new_start_dt,
-            subscribe_end_dt=None
-        )
-        
-        new_invoice = InvoiceInfo.objects.create(
-            subscription=new_sub,
-            invoice_amount=amount,
-            issue_date=now.date()
-        )
-
-        PaymentHistory.objects.create(
-            invoice=new_invoice,
-            transaction_id=result.get('sid'),
-            payment_amount=amount,
-            payment_date=now,
-            fail_reason=None 
-        )
+                last_sub_id, last_end_dt = state.subscription_id, state.expire_dt
+                cycle_end_date = state.cycle_end_dt
+
+            if last_sub_id:
+                if last_end_dt:
+                    cycle_end_date = last_end_dt
+                else:
+                    if cycle_end_date < now:
+                        cycle_end_date = now
+
+                    SubscribeHistory.objects.filter(subscription_id=last_sub_id).update(subscribe_end_dt=cycle_end_date)
+
+                new_start_dt = cycle_end_date + timedelta(seconds=1)
+
+            new_sub = SubscribeHistory.objects.create(
+                user=user,
+                plan=target_plan,
+                subscribe_start_dt=new_start_dt,
+                subscribe_end_dt=None
+            )
+
+            new_invoice = InvoiceInfo.objects.create(
+                subscription=new_sub,
+                invoice_amount=amount,
+                issue_date=now.date(),
+                order_key=partner_order_id,
+            )
+
+            PaymentHistory.objects.create(
+                invoice=new_invoice,
+                transaction_id=result.get('sid'),
+                payment_amount=amount,
+                payment_date=now,
+                fail_reason=None 
+            )
+
+            refresh_subscription_state(partner_user_id, now)
 
         plan_name_display = "프리미엄" if target_plan.plan_name == "PREMIUM" else "베이직"
         
@@ -151,49 +249,149 @@ def approve_kakao_payment(pg_token, session_data):
             'payment_amount': f"{int(amount):,}원"
         }, None
 
+    except IntegrityError:
+        # order_key 중복: 다른 요청이 같은 주문을 먼저 저장함
+        stored = _find_approval(partner_order_id)
+        if stored:
+            return True, stored, None
+        return False, None, '이미 처리 중인 결제입니다.'
     except Exception as e:
         return False, None, str(e)
 
 
 def cancel_subscription_logic(user_id):
     """ 구독 해지 로직 """
-    user = UserInfo.objects.get(user_id=user_id)
-    target_sub = SubscribeHistory.objects.filter(
-        user=user, 
-        subscribe_end_dt__isnull=True
-    ).order_by('-subscribe_start_dt').first()
-    
-    if not target_sub:
-        raise ValueError('해지할 구독 정보가 없습니다.')
-
     now = timezone.now()
-    
-    if target_sub.subscribe_start_dt > now:
-        expiration_date = target_sub.subscribe_start_dt + timedelta(days=30)
-    else:
-        last_payment = PaymentHistory.objects.filter(invoice__subscription=target_sub).order_by('-payment_date').first()
-        base_date = last_payment.payment_date if last_payment else target_sub.subscribe_start_dt
-        expiration_date = base_date + timedelta(days=30)
-    
-    target_sub.subscribe_end_dt = expiration_date
-    target_sub.save()
+
+    with transaction.atomic():
+        # 승인/갱신과 같은 회원 행 잠금을 트랜잭션 첫 쿼리로 잡아 최신 구독 상태를 읽는다.
+        UserInfo.objects.select_for_update().filter(user_id=user_id).first()
+        state = get_subscription_state(user_id)
+
+        # 해지되지 않은 가장 마지막 구독 (예약 구독 우선)
+        if state.reserved_subscription_id and not state.reserved_expire_dt:
+            target_sub_id = state.reserved_subscription_id
+            expiration_date = state.reserved_start_dt + timedelta(days=CYCLE_DAYS)
+        elif state.subscription_id and not state.expire_dt:
+            target_sub_id = state.subscription_id
+            expiration_date = state.cycle_end_dt
+        else:
+            raise ValueError('해지할 구독 정보가 없습니다.')
+
+        target_sub = SubscribeHistory.objects.get(subscription_id=target_sub_id)
+        target_sub.subscribe_end_dt = expiration_date
+        target_sub.cancel_dt = now
+        target_sub.save()
+
+        refresh_subscription_state(user_id, now)
     
     return expiration_date.strftime('%Y.%m.%d')
 
 
 def renew_subscription_logic(user_id):
     """ 구독 갱신 로직 """
-    user = UserInfo.objects.get(user_id=user_id)
     now = timezone.now()
 
-    target_sub = SubscribeHistory.objects.filter(
-        user=user, 
-        subscribe_end_dt__isnull=False, 
-        subscribe_end_dt__gt=now
-    ).last()
-    
-    if not target_sub:
-        raise ValueError('갱신할 구독 정보가 없습니다.')
+    with transaction.atomic():
+        # 승인/해지와 같은 회원 행 잠금을 트랜잭션 첫 쿼리로 잡아 최신 구독 상태를 읽는다.
+        UserInfo.objects.select_for_update().filter(user_id=user_id).first()
+        state = get_subscription_state(user_id)
+
+        # 해지 예정인 가장 마지막 구독 (예약 구독 우선)
+        if state.reserved_expire_dt and state.reserved_expire_dt > now:
+            target_sub_id = state.reserved_subscription_id
+        elif state.expire_dt and state.expire_dt > now:
+            target_sub_id = state.subscription_id
+        else:
+            raise ValueError('갱신할 구독 정보가 없습니다.')
+
+        target_sub = SubscribeHistory.objects.get(subscription_id=target_sub_id)
+        target_sub.subscribe_end_dt = None
+        target_sub.cancel_dt = None
+        target_sub.save()
+
+        refresh_subscription_state(user_id, now)
+
+
+# --- [결제 내역 조회/내보내기] ---
+PAYMENT_PAGE_SIZE = 5
+PAYMENT_PAGE_MAX = 50
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _payment_queryset(user_id):
+    return PaymentHistory.objects.filter(invoice__subscription__user_id=user_id)
+
+
+def encode_payment_cursor(payment_date, payment_id):
+    raw = f"{payment_date.isoformat()}|{payment_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_payment_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        date_str, payment_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(date_str), int(payment_id)
+    except (ValueError, UnicodeError):
+        raise ValueError('잘못된 페이지 정보입니다.')
+
+
+def get_payment_history_page(user_id, cursor=None, limit=PAYMENT_PAGE_SIZE):
+    """
+    결제 내역 한 페이지 (결제일시, 결제 ID 역순 키셋 페이지네이션)
+    OFFSET을 쓰지 않으므로 내역이 많아도 뒤쪽 페이지 비용이 같다.
+    Returns: (결제 목록, 다음 페이지 cursor 또는 None)
+    """
+    limit = max(1, min(int(limit), PAYMENT_PAGE_MAX))
+    qs = _payment_queryset(user_id).filter(fail_reason__isnull=True)
+    if cursor:
+        payment_date, payment_id = decode_payment_cursor(cursor)
+        qs = qs.filter(Q(payment_date__lt=payment_date) | Q(payment_date=payment_date, payment_id__lt=payment_id))
+
+    rows = list(qs.order_by('-payment_date', '-payment_id').only('payment_id', 'payment_date', 'payment_amount')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    for pay in rows:
+        pay.amount_str = f"{int(pay.payment_amount):,}"
+
+    next_cursor = encode_payment_cursor(rows[-1].payment_date, rows[-1].payment_id) if has_more else None
+    return rows, next_cursor
+
+
+class _Echo:
+    """csv.writer가 쓴 한 줄을 그대로 돌려주는 버퍼 (StreamingHttpResponse용)"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    """헤더 + 행 iterable을 CSV 줄 단위로 생성 (엑셀 한글 깨짐 방지 BOM 포함)"""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_payment_history_rows(queryset):
+    """결제 내역 CSV 행 (iterator(chunk_size)로 읽어 행 수와 무관하게 메모리 일정)"""
+    rows = queryset.order_by('-payment_date', '-payment_id').values_list(
+        'payment_date', 'payment_amount', 'invoice__subscription__plan__plan_name', 'fail_reason',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for payment_date, amount, plan_name, fail_reason in rows:
+        yield [
+            timezone.localtime(payment_date).strftime('%Y-%m-%d %H:%M:%S'),
+            amount,
+            plan_name,
+            '결제 실패' if fail_reason is not None else '결제 완료',
+            fail_reason or '',
+        ]
+
+
+PAYMENT_CSV_HEADER = ['결제일시', '결제 금액', '플랜', '상태', '실패 사유']
+
+
+def export_payment_history_csv(user_id):
+    return iter_csv(PAYMENT_CSV_HEADER, iter_payment_history_rows(_payment_queryset(user_id)))
 
-    target_sub.subscribe_end_dt = None
-    target_sub.save()
\ No newline at end of file
@@ -7,5 +7,7 @@ urlpatterns = [
     path('ready/', views.subscription_ready, name='sub_ready'),
     path('approve/', views.subscription_approve, name='sub_approve'),
     path("cancel_subscription", views.cancel_subscription, name="cancel_subscription"),
-    path("renew_subscription", views.renew_subscription, name="renew_subscription")
+    path("renew_subscription", views.renew_subscription, name="renew_subscription"),
+    path("history", views.payment_history, name="payment_history"),
+    path("history.csv", views.payment_history_csv, name="payment_history_csv"),
 ]
\ No newline at end of file
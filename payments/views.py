@@ -1,5 +1,6 @@
 from django.shortcuts import redirect, render
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from . import services
 
 def subscription_ready(request):
@@ -36,8 +37,11 @@ def subscription_approve(request):
 
     is_success, success_data, error_msg = services.approve_kakao_payment(pg_token, session_data)
 
-    for k in required_keys:
-        if k in request.session: del request.session[k]
+    # 성공 시에는 주문 정보를 남겨 새로고침/재시도가 저장된 승인 결과를 그대로 보여주도록 한다.
+    # (다음 결제 준비 시 덮어씀)
+    if not is_success:
+        for k in required_keys:
+            if k in request.session: del request.session[k]
 
     if is_success:
         context = {
@@ -94,3 +98,36 @@ def renew_subscription(request):
     return JsonResponse({'success': False, 'message': '잘못된 요청'})
 
 
+def payment_history(request):
+    """ [GET] 결제 내역 더보기 (cursor 기반) """
+    user_id = request.session.get('user_id')
+    if not user_id:
+        return JsonResponse({'success': False, 'message': '로그인이 필요합니다.'}, status=401)
+
+    try:
+        payments, next_cursor = services.get_payment_history_page(
+            user_id, request.GET.get('cursor'), request.GET.get('limit', services.PAYMENT_PAGE_SIZE)
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'payments': [
+            {'payment_date': timezone.localtime(pay.payment_date).strftime('%Y.%m.%d'), 'amount': pay.amount_str}
+            for pay in payments
+        ],
+        'next_cursor': next_cursor,
+    })
+
+
+def payment_history_csv(request):
+    """ [GET] 결제 내역 전체 CSV 다운로드 (스트리밍) """
+    user_id = request.session.get('user_id')
+    if not user_id:
+        return redirect('/')
+
+    response = StreamingHttpResponse(services.export_payment_history_csv(user_id), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="payments_{timezone.localdate():%Y%m%d}.csv"'
+    return response
+
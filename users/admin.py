@@ -1,88 +1,359 @@
-import json
-from django.contrib import admin
-from videos.forms import SubtitleAdminForm
-from users.models import CommonCode, UserInfo
-from videos.models import FileInfo, UserUploadVideo, HighlightVideo, SubtitleInfo
-from payments.models import PlanInfo, SubscribeHistory, PaymentHistory, InvoiceInfo
+import io
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.utils import timezone
+from django.urls import path, reverse
+from videos.forms import SubtitleAdminForm, SubtitleZipImportForm
+from users.models import CommonCode, UserInfo, AccountErasureJob
+from videos.models import FileInfo, UserUploadVideo, HighlightVideo, SubtitleInfo, PipelineSpan
+from videos.subtitles import apply_subtitle_data, iter_json_array, timeline_to_cues
+from videos.search import index_subtitle
+from videos.services import import_subtitle_zip_logic
+from videos.reprocess import STATUS_FAILED, start_reprocess
+from videos.timing import stage_stats
+from payments.models import PlanInfo, SubscribeHistory, PaymentHistory, InvoiceInfo, DailyPlanStat, DailyTeamStat
+from payments.rollups import dashboard_data
+from payments.services import iter_csv, EXPORT_CHUNK_SIZE
+from SKN17_FINAL_3TEAM.paginator import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    행이 많은 테이블 공통 설정
+    - 전체 건수 COUNT(*) 생략, 목록 건수는 통계 추정치/상한 카운트 사용
+    - 외래키는 전체 선택 목록 대신 ID 입력(raw_id_fields)으로 편집
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class PaymentResultFilter(admin.SimpleListFilter):
+    title = '결제 결과'
+    parameter_name = 'result'
+
+    def lookups(self, request, model_admin):
+        return (('success', '결제 완료'), ('fail', '결제 실패'))
+
+    def queryset(self, request, queryset):
+        if self.value() == 'success':
+            return queryset.filter(fail_reason__isnull=True)
+        if self.value() == 'fail':
+            return queryset.filter(fail_reason__isnull=False)
+        return queryset
+
+
+class CommonCodeGroupFilter(admin.SimpleListFilter):
+    """공통코드 외래키 필터 (선택지를 해당 그룹 코드로만 제한, 큰 테이블을 DISTINCT 조회하지 않음)"""
+    group = None
+
+    def lookups(self, request, model_admin):
+        return [(str(c.common_code), c.common_code_value) for c in CommonCode.objects.filter(common_code_grp=self.group)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class UploadStatusFilter(CommonCodeGroupFilter):
+    title = '업로드 상태'
+    parameter_name = 'upload_status_code'
+    group = 'STATUS'
+
+
+class ReprocessActionForm(ActionForm):
+    commentator = forms.ModelChoiceField(
+        label='해설위원',
+        queryset=CommonCode.objects.filter(common_code_grp='COMMENTATOR'),
+        required=False,
+        empty_label='기존 해설위원',
+    )
+
 
 # [1] 파일 정보 관리 (개별 업로드용)
 @admin.register(FileInfo)
-class FileInfoAdmin(admin.ModelAdmin):
+class FileInfoAdmin(LargeTableAdmin):
     list_display = ('file_id', 'file_path') 
-    search_fields = ('file_path',)
+    search_fields = ('^file_path',)     # 경로 앞부분 일치 (예: videos/2025/11) -> 인덱스 사용
+    ordering = ('-file_id',)
 
 
 # [2] 하이라이트 영상 관리 
 @admin.register(HighlightVideo)
-class HighlightVideoAdmin(admin.ModelAdmin):
+class HighlightVideoAdmin(LargeTableAdmin):
     list_display = ('highlight_title', 'match_date', 'video_category')
-    search_fields = ('highlight_title',)
-    autocomplete_fields = [] 
+    list_select_related = ('video_category',)
+    search_fields = ('^highlight_title',)
+    ordering = ('-match_date',)
+    raw_id_fields = ('video_file',)
+    actions = ['import_subtitle_zip']
+
+    @admin.action(description="선택한 하이라이트에 자막 ZIP 일괄 등록")
+    def import_subtitle_zip(self, request, queryset):
+        ids = ','.join(str(pk) for pk in queryset.values_list('pk', flat=True))
+        return redirect(f"{reverse('admin:videos_subtitleinfo_import_zip')}?ids={ids}")
 
 
 # [3] 자막정보 관리
 @admin.register(SubtitleInfo)
-class SubtitleInfoAdmin(admin.ModelAdmin):
+class SubtitleInfoAdmin(LargeTableAdmin):
     form = SubtitleAdminForm
-    list_display = ('subtitle_id', 'video_file', 'commentator_code', 'preview_subtitle')
+    list_display = ('subtitle_id', 'video_file', 'commentator_code', 'cue_count', 'preview_subtitle')
+    list_select_related = ('video_file', 'commentator_code')
+    raw_id_fields = ('upload_file', 'video_file')
+    ordering = ('-subtitle_id',)
+    change_list_template = 'admin/videos/subtitleinfo/change_list.html'
+
+    def get_queryset(self, request):
+        # 목록에서 자막 본문(blob)은 읽지 않는다
+        return super().get_queryset(request).defer('subtitle')
+
+    def get_urls(self):
+        custom_urls = [
+            path('import-zip/', self.admin_site.admin_view(self.import_zip_view), name='videos_subtitleinfo_import_zip'),
+        ]
+        return custom_urls + super().get_urls()
+
+    def import_zip_view(self, request):
+        ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk.isdigit()]
+
+        if request.method == 'POST':
+            form = SubtitleZipImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                try:
+                    result = import_subtitle_zip_logic(
+                        form.cleaned_data['zip_file'],
+                        commentator_code=form.cleaned_data.get('commentator_code'),
+                        highlight_ids=ids or None,
+                    )
+                    self.message_user(request, f"자막 {result['created']}건 등록, {result['updated']}건 갱신")
+                    if result['unmatched']:
+                        self.message_user(request, f"매칭되지 않은 파일: {', '.join(result['unmatched'])}", messages.WARNING)
+                    return redirect('admin:videos_subtitleinfo_changelist')
+                except Exception as e:
+                    self.message_user(request, f"ZIP 처리 중 오류 발생: {e}", messages.ERROR)
+        else:
+            form = SubtitleZipImportForm()
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': '자막 ZIP 일괄 등록',
+            'form': form,
+            'highlight_count': len(ids),
+        }
+        return render(request, 'admin/videos/subtitleinfo/import_zip.html', context)
 
     def save_model(self, request, obj, form, change):
         uploaded_file = form.cleaned_data.get('json_file')
+        processed_data = None
         
         if uploaded_file:
             try:
-                file_content = uploaded_file.read().decode('utf-8')
-                raw_data = json.loads(file_content)
-                
-                processed_data = []
-
-                for item in raw_data:
-                    start = round(float(item.get('set_start_sec', 0)), 2)
-                    end = round(float(item.get('set_end_sec', 0)), 2)
-                    
-                    text_parts = []
-                    if item.get('caster_text'):
-                        text_parts.append(f"{item['caster_text']}")
-                    
-                    if item.get('analyst_text'):
-                        text_parts.append(f"{item['analyst_text']}")
-                    
-                    full_text = " ".join(text_parts)
-
-                    if full_text.strip():
-                        processed_data.append({
-                            "start": start,
-                            "end": end,
-                            "text": full_text
-                        })
-
-                json_string = json.dumps(processed_data, ensure_ascii=False)
-                binary_data = json_string.encode('utf-8')
-
-                obj.subtitle = binary_data
+                text_stream = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig')
+                processed_data = timeline_to_cues(iter_json_array(text_stream))
+                apply_subtitle_data(obj, processed_data)
 
             except Exception as e:
                 print(f"JSON 변환 중 에러 발생: {e}")
+                processed_data = None
 
         super().save_model(request, obj, form, change)
 
+        if processed_data is not None:
+            index_subtitle(obj, processed_data)
+
     def preview_subtitle(self, obj):
-        if not obj.subtitle:
+        if obj.cue_count is None:
             return "데이터 없음"
-        try:
-            text_data = obj.subtitle.decode('utf-8')
-            json_data = json.loads(text_data)
-            if json_data:
-                return f"{json_data[0]['text'][:30]}..." 
+        if obj.cue_count == 0:
             return "빈 데이터"
-        except:
-            return "디코딩 오류"
+        return f"{obj.preview_text}..."
     
     preview_subtitle.short_description = "자막 내용 미리보기"
 
 
-# [4] 나머지 모델들은 반복문으로 등록
-models_to_register = [UserUploadVideo, UserInfo, CommonCode, PlanInfo, SubscribeHistory, InvoiceInfo, PaymentHistory]
+# [4] 매출/구독 대시보드 (run_rollups 집계 테이블만 조회)
+@admin.register(DailyPlanStat)
+class DailyPlanStatAdmin(admin.ModelAdmin):
+    list_display = ('stat_date', 'plan', 'revenue', 'payment_count', 'fail_count', 'new_count', 'renew_count', 'cancel_count')
+    list_filter = ('plan',)
+    list_select_related = ('plan',)
+    date_hierarchy = 'stat_date'
+    ordering = ('-stat_date', 'plan')
+    change_list_template = 'admin/payments/dailyplanstat/change_list.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        custom_urls = [
+            path('dashboard/', self.admin_site.admin_view(self.dashboard_view), name='payments_dailyplanstat_dashboard'),
+        ]
+        return custom_urls + super().get_urls()
+
+    def dashboard_view(self, request):
+        # admin_view는 스태프 여부만 확인하므로 집계 조회 권한을 직접 확인
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        days = request.GET.get('days', '30')
+        days = int(days) if days.isdigit() and 0 < int(days) <= 366 else 30
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': '매출/구독 대시보드',
+            **dashboard_data(days),
+        }
+        return render(request, 'admin/payments/dailyplanstat/dashboard.html', context)
+
+
+# [5] 결제 이력 (CSV 내보내기는 스트리밍: 행 수와 무관하게 메모리 일정)
+@admin.register(PaymentHistory)
+class PaymentHistoryAdmin(LargeTableAdmin):
+    list_display = ('payment_id', 'invoice_id', 'payment_amount', 'payment_date', 'fail_reason')
+    list_filter = (PaymentResultFilter,)
+    search_fields = ('=transaction_id',)
+    ordering = ('-payment_id',)
+    raw_id_fields = ('invoice',)
+    change_list_template = 'admin/payments/paymenthistory/change_list.html'
+
+    def get_urls(self):
+        custom_urls = [
+            path('export-csv/', self.admin_site.admin_view(self.export_csv_view), name='payments_paymenthistory_export_csv'),
+        ]
+        return custom_urls + super().get_urls()
+
+    def export_csv_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        # 목록 화면의 검색/필터 조건을 그대로 적용
+        queryset = self.get_changelist_instance(request).get_queryset(request)
+        rows = queryset.order_by('-payment_id').values_list(
+            'payment_id', 'invoice__subscription__user_id', 'payment_date', 'payment_amount',
+            'invoice__subscription__plan__plan_name', 'transaction_id', 'fail_reason',
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        def lines():
+            for payment_id, user_id, payment_date, amount, plan_name, transaction_id, fail_reason in rows:
+                yield [payment_id, user_id, timezone.localtime(payment_date).strftime('%Y-%m-%d %H:%M:%S'),
+                       amount, plan_name, transaction_id, fail_reason or '']
+
+        header = ['결제 ID', '회원 ID', '결제일시', '결제 금액', '플랜', '거래 ID', '실패 사유']
+        response = StreamingHttpResponse(iter_csv(header, lines()), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="payment_history_{timezone.localdate():%Y%m%d}.csv"'
+        return response
+
+
+# [6] 회원/구독/청구/업로드 영상
+@admin.register(UserInfo)
+class UserInfoAdmin(LargeTableAdmin):
+    list_display = ('user_id', 'email', 'favorite_code', 'storage_usage', 'free_use_yn', 'closed_yn')
+    list_select_related = ('favorite_code',)
+    list_filter = ('closed_yn', 'free_use_yn')
+    search_fields = ('=user_id', '^email')
+    ordering = ('email',)
+    raw_id_fields = ('favorite_code',)
+
+
+@admin.register(SubscribeHistory)
+class SubscribeHistoryAdmin(LargeTableAdmin):
+    list_display = ('subscription_id', 'user_id', 'plan', 'subscribe_start_dt', 'subscribe_end_dt', 'cancel_dt')
+    list_select_related = ('plan',)
+    list_filter = ('plan',)
+    search_fields = ('=user__user_id',)
+    ordering = ('-subscription_id',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(InvoiceInfo)
+class InvoiceInfoAdmin(LargeTableAdmin):
+    list_display = ('invoice_id', 'subscription_id', 'invoice_amount', 'issue_date', 'order_key')
+    search_fields = ('=order_key',)
+    ordering = ('-invoice_id',)
+    raw_id_fields = ('subscription',)
+
+
+@admin.register(UserUploadVideo)
+class UserUploadVideoAdmin(LargeTableAdmin):
+    list_display = ('upload_file', 'user_id', 'upload_title', 'upload_status_code', 'job_status', 'upload_date', 'use_yn')
+    list_select_related = ('upload_file', 'upload_status_code')
+    list_filter = (UploadStatusFilter, 'use_yn')
+    search_fields = ('=user__user_id', '^upload_title')
+    ordering = ('-upload_file',)
+    raw_id_fields = ('upload_file', 'user')
+    action_form = ReprocessActionForm
+    actions = ['reprocess_failed']
+
+    @admin.action(description="선택한 실패 영상 다시 분석 (저장된 원본 사용)")
+    def reprocess_failed(self, request, queryset):
+        failed_ids = list(queryset.filter(upload_status_code_id=STATUS_FAILED).values_list('pk', flat=True))
+        skipped = queryset.count() - len(failed_ids)
+        if not failed_ids:
+            self.message_user(request, "선택한 영상 중 분석 실패(23) 상태인 영상이 없습니다.", messages.WARNING)
+            return
+
+        # action 선택지는 response_action이 넣어 주므로 같은 선택지로 검증해야 해설위원 선택이 살아남는다.
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid():
+            self.message_user(request, f"해설위원 선택이 올바르지 않습니다: {form.errors.as_text()}", messages.ERROR)
+            return
+        start_reprocess(failed_ids, form.cleaned_data.get('commentator'))
+        self.message_user(
+            request,
+            f"{len(failed_ids)}건 재분석을 시작했습니다. (분당 제출 수 제한, 진행 상황은 업로드 상태로 확인)"
+            + (f" 실패 상태가 아닌 {skipped}건은 제외했습니다." if skipped else "")
+        )
+
+
+@admin.register(PipelineSpan)
+class PipelineSpanAdmin(LargeTableAdmin):
+    list_display = ('started_dt', 'stage', 'duration_ms', 'video_duration', 'upload_file_id', 'runpod_job_id', 'success_yn')
+    list_filter = ('stage', 'success_yn')
+    search_fields = ('=runpod_job_id',)
+    ordering = ('-started_dt',)
+    change_list_template = 'admin/videos/pipelinespan/change_list.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        custom_urls = [
+            path('stats/', self.admin_site.admin_view(self.stats_view), name='videos_pipelinespan_stats'),
+        ]
+        return custom_urls + super().get_urls()
+
+    def stats_view(self, request):
+        days = request.GET.get('days', '14')
+        days = int(days) if days.isdigit() and 0 < int(days) <= 90 else 14
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': '분석 단계별 소요 시간',
+            **stage_stats(days),
+        }
+        return render(request, 'admin/videos/pipelinespan/stats.html', context)
+
+
+@admin.register(CommonCode)
+class CommonCodeAdmin(admin.ModelAdmin):
+    list_display = ('common_code', 'common_code_grp', 'common_code_value')
+    list_filter = ('common_code_grp',)
+
+
+# [7] 나머지 모델들은 반복문으로 등록
+models_to_register = [PlanInfo, AccountErasureJob, DailyTeamStat]
 
 for model in models_to_register:
     try:
@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from SKN17_FINAL_3TEAM import cache as shared_cache
+from payments.models import SubscribeHistory
+from .models import UserInfo
+
+USER_CONTEXT_TTL = 60   # 초: 무효화 누락 시에도 이 시간 뒤에는 DB 기준으로 다시 읽는다.
+
+TEAM_META_DATA = {
+    'LG': {'full': 'LG 트윈스', 'mascot': '수타'},
+    'HANWHA': {'full': '한화 이글스', 'mascot': '술이'},
+    'SSG': {'full': 'SSG 랜더스', 'mascot': '란디'},
+    'SAMSUNG': {'full': '삼성 라이온즈', 'mascot': '볼래요'},
+    'NC': {'full': 'NC 다이노스', 'mascot': '반비'},
+    'KT': {'full': 'KT 위즈', 'mascot': '똘이'},
+    'LOTTE': {'full': '롯데 자이언츠', 'mascot': '눌이'},
+    'KIA': {'full': 'KIA 타이거즈', 'mascot': '호거리'},
+    'DOOSAN': {'full': '두산 베어스', 'mascot': '철'},
+    'KIWOOM': {'full': '키움 히어로즈', 'mascot': '턱도리'},
+}
+
+
+def _cache_key(user_id):
+    return f"user_ctx:{user_id}"
+
+
+def team_code_from_value(raw_code):
+    """응원 구단 공통코드 값 -> 팀 코드 ('FAVORITE - LG' -> 'LG')"""
+    return raw_code.replace('FAVORITE - ', '').replace('FAVORITE-', '').strip().upper()
+
+
+def team_code_of(user):
+    """회원의 응원 구단 팀 코드, 없으면 None"""
+    if not user or not user.favorite_code:
+        return None
+    return team_code_from_value(user.favorite_code.common_code_value)
+
+
+def build_team_meta(team_code):
+    """헤더 툴팁용 구단 정보"""
+    meta = TEAM_META_DATA.get(team_code)
+    return {
+        'team_full_name': meta['full'] if meta else "KBO 리그",
+        'team_mascot': meta['mascot'] if meta else "마스코트",
+    }
+
+
+def load_user_context(user_id):
+    """
+    회원 + 응원 구단 + 구독 이력 여부를 한 번에 조회 (캐시 미스 시)
+    회원이 없거나 탈퇴 처리 중이면 UserInfo.DoesNotExist 발생
+    """
+    user = UserInfo.objects.select_related('favorite_code').get(user_id=user_id, closed_yn=False)
+    team_code = team_code_of(user)
+    return {
+        'user': user,
+        'has_history': SubscribeHistory.objects.filter(user_id=user_id).exists(),
+        'team_code': team_code,
+        **build_team_meta(team_code),
+    }
+
+
+def get_user_context(user_id):
+    """요청 공통 회원 컨텍스트 (짧은 TTL 캐시)"""
+    return shared_cache.get_or_set('user_ctx', _cache_key(user_id), lambda: load_user_context(user_id), USER_CONTEXT_TTL)
+
+
+def invalidate_user_context(user_id):
+    """결제/플랜/구단/용량 등 컨텍스트에 영향을 주는 변경 후 호출"""
+    if user_id:
+        cache.delete(_cache_key(user_id))
+
@@ -0,0 +1,177 @@
+import logging
+import threading
+from datetime import timedelta
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+from payments.models import SubscribeHistory, InvoiceInfo, PaymentHistory, SubscriptionState
+from videos.models import FileInfo, UserUploadVideo, SubtitleInfo, SubtitleCue, SubtitleTerm, AnalysisArtifact, PipelineSpan
+from .models import UserInfo, AccountErasureJob, EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500            # 한 번에 지우는 행 수 (잠금 시간/메모리 상한)
+UPLOAD_CHUNK_SIZE = 100     # 업로드 영상은 S3 삭제와 함께 처리하므로 더 작게
+S3_BATCH_SIZE = 1000        # S3 DeleteObjects 최대 키 수
+STALE_SECONDS = 600         # 진행 중 갱신이 이 시간 이상 없으면 중단된 작업으로 보고 다시 가져감
+MAX_ATTEMPTS = 5
+
+
+def _progress(job, stage, rows=0, objects=0):
+    AccountErasureJob.objects.filter(pk=job.pk).update(
+        stage=stage,
+        deleted_rows=F('deleted_rows') + rows,
+        deleted_objects=F('deleted_objects') + objects,
+        heartbeat_dt=timezone.now(),
+    )
+    if rows or objects:
+        logger.info(f"회원 데이터 삭제 [{job.user_id}] {stage}: 행 {rows}개, S3 객체 {objects}개")
+
+
+def _delete_in_chunks(job, stage, queryset, fields=('pk',)):
+    """
+    PK를 CHUNK_SIZE개씩 읽어 삭제 (Collector가 관련 행 전체를 한 번에 메모리에 올리지 않도록)
+    only()로 자막 blob 같은 큰 컬럼은 읽지 않는다. (삭제 시그널에서 쓰는 컬럼은 fields에 포함)
+    """
+    model = queryset.model
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:CHUNK_SIZE])
+        if not pks:
+            return
+        deleted, _ = model.objects.filter(pk__in=pks).only(*fields).delete()
+        _progress(job, stage, rows=deleted)
+
+
+def _upload_object_keys(pk, file_name, source_key, input_key, output_key):
+    """
+    업로드 영상 하나가 S3에 남기는 객체 키 (현재 FILE_PATH, 업로드 원본, 분석 입력 사본, 결과 영상)
+    분석 입력 키는 이 업로드 소유(업로드별 사본 또는 원본)일 때만 지운다.
+    이전에 쓰던 inputs/<파일명> 공용 키는 같은 이름의 다른 회원 영상일 수 있어 남긴다.
+    """
+    keys = [file_name, source_key, output_key]
+    if input_key and (input_key.startswith(f"inputs/{pk}_") or input_key == source_key):
+        keys.append(input_key)
+    return [key for key in keys if key]
+
+
+def delete_storage_objects(keys):
+    """S3 객체를 최대 1000개씩 묶어 삭제 (없는 키는 성공으로 처리되므로 재시도해도 안전)"""
+    if not keys:
+        return 0
+
+    bucket = getattr(default_storage, 'bucket', None)
+    if bucket is None:  # 로컬 파일 저장소
+        for key in keys:
+            default_storage.delete(key)
+        return len(keys)
+
+    for i in range(0, len(keys), S3_BATCH_SIZE):
+        batch = keys[i:i + S3_BATCH_SIZE]
+        response = bucket.delete_objects(Delete={'Objects': [{'Key': k} for k in batch], 'Quiet': True})
+        errors = response.get('Errors') or []
+        if errors:
+            raise RuntimeError(f"S3 삭제 실패 {len(errors)}건 (예: {errors[0].get('Key')} {errors[0].get('Message')})")
+    return len(keys)
+
+
+def _erase_uploads(job):
+    """
+    업로드 영상: S3 객체 삭제 후 자막/영상/파일 행 삭제 (S3 먼저 지워야 재시도 시 키를 잃지 않음)
+    해설 재생성 결과(영상/음성)와 이 회원 영상에서 만든 분석 중간 결과도 함께 지운다.
+    """
+    while True:
+        rows = list(
+            UserUploadVideo.objects.filter(user_id=job.user_id).values_list(
+                'pk', 'upload_file__file_path', 'source_key', 'input_key', 'output_key'
+            )[:UPLOAD_CHUNK_SIZE]
+        )
+        if not rows:
+            return
+
+        pks = [row[0] for row in rows]
+        keys = {key for row in rows for key in _upload_object_keys(*row)}
+        for video_key, audio_key in SubtitleInfo.objects.filter(upload_file_id__in=pks).values_list('video_key', 'audio_key'):
+            keys.update(key for key in (video_key, audio_key) if key)
+        artifacts = list(AnalysisArtifact.objects.filter(source_upload_id__in=pks).values_list('pk', 'artifact_key'))
+        keys.update(key for _, key in artifacts)
+        objects = delete_storage_objects(sorted(keys))
+
+        artifact_deleted, _ = AnalysisArtifact.objects.filter(pk__in=[pk for pk, _ in artifacts]).delete()
+        deleted, _ = SubtitleInfo.objects.filter(upload_file_id__in=pks).only('pk').delete()
+        file_deleted, _ = FileInfo.objects.filter(pk__in=pks).only('pk').delete()
+        _progress(job, 'uploads', rows=artifact_deleted + deleted + file_deleted, objects=objects)
+
+
+def _run_stages(job):
+    user_id = job.user_id
+    upload_subtitles = Q(subtitle__upload_file__user_id=user_id)
+
+    _delete_in_chunks(job, 'subtitle_terms', SubtitleTerm.objects.filter(upload_subtitles))
+    _delete_in_chunks(job, 'subtitle_cues', SubtitleCue.objects.filter(upload_subtitles))
+    # 업로드 행이 지워지면 SET_NULL로 회원과의 연결만 끊긴 채 남으므로 먼저 지운다.
+    _delete_in_chunks(job, 'pipeline_spans', PipelineSpan.objects.filter(upload_file__user_id=user_id))
+    _erase_uploads(job)
+    _delete_in_chunks(job, 'payments', PaymentHistory.objects.filter(invoice__subscription__user_id=user_id))
+    _delete_in_chunks(job, 'invoices', InvoiceInfo.objects.filter(subscription__user_id=user_id))
+    _delete_in_chunks(job, 'subscription_state', SubscriptionState.objects.filter(user_id=user_id))
+    _delete_in_chunks(job, 'subscriptions', SubscribeHistory.objects.filter(user_id=user_id), fields=('pk', 'user_id'))
+    _delete_in_chunks(job, 'email_outbox', EmailOutbox.objects.filter(to_email=job.email))
+
+    # 남은 관련 행이 없으므로 회원 행 삭제는 가볍다.
+    deleted, _ = UserInfo.objects.filter(user_id=user_id, closed_yn=True).delete()
+    _progress(job, 'user', rows=deleted)
+
+
+def claim_job(job_id):
+    """대기 중이거나 중단된(갱신이 끊긴) 작업을 점유. 이미 다른 곳에서 실행 중이면 False"""
+    stale_before = timezone.now() - timedelta(seconds=STALE_SECONDS)
+    return bool(AccountErasureJob.objects.filter(pk=job_id).filter(
+        Q(status=AccountErasureJob.STATUS_PENDING) |
+        Q(status=AccountErasureJob.STATUS_RUNNING, heartbeat_dt__lt=stale_before)
+    ).update(status=AccountErasureJob.STATUS_RUNNING, heartbeat_dt=timezone.now(), attempts=F('attempts') + 1))
+
+
+def claimable_jobs():
+    stale_before = timezone.now() - timedelta(seconds=STALE_SECONDS)
+    return AccountErasureJob.objects.filter(
+        Q(status=AccountErasureJob.STATUS_PENDING) |
+        Q(status=AccountErasureJob.STATUS_RUNNING, heartbeat_dt__lt=stale_before)
+    ).order_by('job_id')
+
+
+def run_erasure_job(job_id):
+    """삭제 작업 실행 (중간에 멈춰도 같은 작업을 다시 실행하면 남은 부분부터 이어서 삭제)"""
+    if not claim_job(job_id):
+        return False
+
+    job = AccountErasureJob.objects.get(pk=job_id)
+    try:
+        _run_stages(job)
+        AccountErasureJob.objects.filter(pk=job_id).update(
+            status=AccountErasureJob.STATUS_DONE, stage='done', last_error=None, finished_dt=timezone.now()
+        )
+        logger.info(f"회원 데이터 삭제 완료 [{job.user_id}]")
+        return True
+    except Exception as e:
+        logger.error(f"회원 데이터 삭제 실패 [{job.user_id}]: {e}")
+        give_up = job.attempts >= MAX_ATTEMPTS
+        AccountErasureJob.objects.filter(pk=job_id).update(
+            status=AccountErasureJob.STATUS_FAILED if give_up else AccountErasureJob.STATUS_PENDING,
+            last_error=str(e)[:255],
+        )
+        return False
+
+
+def start_account_erasure(user_id, email):
+    """삭제 작업을 등록하고 백그라운드 스레드에서 바로 시작 (서버 재시작 등으로 끊기면 run_account_eraser가 이어서 처리)"""
+    job = AccountErasureJob.objects.create(user_id=user_id, email=email)
+
+    def run():
+        try:
+            run_erasure_job(job.pk)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, daemon=True).start()
+    return job
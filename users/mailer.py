@@ -0,0 +1,150 @@
+import time
+import logging
+import smtplib
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+LEASE_SECONDS = 120         # 발송 중 상태 점유 시간 (워커가 죽으면 이후 다른 워커가 다시 가져감)
+RETRY_BASE_SECONDS = 5      # 재시도 간격: 5, 10, 20, 40초 ...
+IDLE_CLOSE_SECONDS = 30     # 이 시간 동안 보낼 메일이 없으면 SMTP 연결을 닫는다.
+
+
+def enqueue_email(to_email, subject, body, expire_after=None):
+    """메일을 발송 대기열에 넣고 바로 반환 (실제 발송은 run_email_worker)"""
+    now = timezone.now()
+    return EmailOutbox.objects.create(
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        next_attempt_dt=now,
+        expire_dt=now + timedelta(seconds=expire_after) if expire_after else None,
+    )
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """
+    발송할 메일을 최대 batch_size개 점유한다.
+    SKIP LOCKED로 여러 워커가 같은 행을 가져가지 않으며, 점유 만료된 SENDING 행도 다시 대상이 된다.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                status__in=[EmailOutbox.STATUS_PENDING, EmailOutbox.STATUS_SENDING],
+                next_attempt_dt__lte=now,
+            ).order_by('next_attempt_dt')[:batch_size]
+        )
+        if rows:
+            EmailOutbox.objects.filter(outbox_id__in=[r.outbox_id for r in rows]).update(
+                status=EmailOutbox.STATUS_SENDING,
+                next_attempt_dt=now + timedelta(seconds=LEASE_SECONDS),
+            )
+    return rows
+
+
+def _is_permanent(exc):
+    """수신자 거부 등 5xx 응답은 재시도해도 실패하므로 즉시 실패 처리"""
+    if isinstance(exc, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+class EmailSender:
+    """
+    SMTP 연결 하나를 유지하며 대기열 메일을 묶음 발송한다.
+    (기존: 인증번호 1건마다 TLS 연결을 새로 열고 닫음)
+    """
+
+    def __init__(self, connection=None, from_email=None):
+        self.connection = connection or get_connection(fail_silently=False)
+        self.from_email = from_email or settings.DEFAULT_FROM_EMAIL
+        self.is_open = False
+        self.last_used = 0.0
+
+    def _open(self):
+        if not self.is_open:
+            self.connection.open()
+            self.is_open = True
+
+    def close(self):
+        if self.is_open:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.is_open = False
+
+    def close_if_idle(self):
+        if self.is_open and time.monotonic() - self.last_used > IDLE_CLOSE_SECONDS:
+            self.close()
+
+    def _send_one(self, row):
+        message = EmailMessage(row.subject, row.body, self.from_email, [row.to_email], connection=self.connection)
+        try:
+            self._open()
+            message.send()
+        except smtplib.SMTPServerDisconnected:
+            # 서버가 유휴 연결을 끊은 경우: 한 번만 다시 연결해서 재발송
+            self.close()
+            self._open()
+            message.send()
+
+    def send_batch(self, rows):
+        """점유한 메일 발송 후 결과 반영. Returns: (성공 수, 재시도 수, 실패 수)"""
+        now = timezone.now()
+        sent_ids = []
+        retried = failed = 0
+
+        for row in rows:
+            if row.expire_dt and row.expire_dt <= now:
+                EmailOutbox.objects.filter(pk=row.pk).update(status=EmailOutbox.STATUS_FAILED, last_error='EXPIRED')
+                failed += 1
+                continue
+
+            try:
+                self._send_one(row)
+                sent_ids.append(row.pk)
+            except OSError as e:    # smtplib.SMTPException 포함
+                if isinstance(e, smtplib.SMTPServerDisconnected) or not isinstance(e, smtplib.SMTPException):
+                    self.close()    # 연결 자체의 문제면 다음 메일에서 새로 연결
+
+                attempts = row.attempts + 1
+                error = str(e)[:255]
+                if _is_permanent(e) or attempts >= MAX_ATTEMPTS:
+                    EmailOutbox.objects.filter(pk=row.pk).update(
+                        status=EmailOutbox.STATUS_FAILED, attempts=attempts, last_error=error
+                    )
+                    failed += 1
+                    logger.warning(f"메일 발송 실패 ({row.to_email}): {e}")
+                else:
+                    EmailOutbox.objects.filter(pk=row.pk).update(
+                        status=EmailOutbox.STATUS_PENDING, attempts=attempts, last_error=error,
+                        next_attempt_dt=timezone.now() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1)),
+                    )
+                    retried += 1
+
+        if sent_ids:
+            EmailOutbox.objects.filter(pk__in=sent_ids).update(
+                status=EmailOutbox.STATUS_SENT, attempts=F('attempts') + 1, sent_dt=timezone.now(), last_error=None
+            )
+        self.last_used = time.monotonic()
+        return len(sent_ids), retried, failed
+
+    def drain(self, batch_size=BATCH_SIZE):
+        """지금 보낼 수 있는 메일을 모두 발송 (관리 명령/벤치마크용)"""
+        totals = [0, 0, 0]
+        while True:
+            rows = claim_batch(batch_size)
+            if not rows:
+                return tuple(totals)
+            for i, n in enumerate(self.send_batch(rows)):
+                totals[i] += n
@@ -0,0 +1,63 @@
+import time
+from django.conf import settings
+from django.core.mail import get_connection, send_mail
+from django.core.management.base import BaseCommand
+from users.mailer import EmailSender, enqueue_email
+from users.models import EmailOutbox
+from users.services import generate_code
+
+BENCH_SUBJECT = '[BAIS-BENCH] 인증번호 발송 벤치마크'
+
+
+class Command(BaseCommand):
+    help = '인증번호 메일 발송 처리량(건/초)을 측정합니다. (요청 내 동기 발송 vs 대기열 + 연결 재사용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200)
+        parser.add_argument('--host', help='SMTP 호스트 (예: smtp_sink 실행 주소). 생략 시 settings의 메일 설정 사용')
+        parser.add_argument('--port', type=int, default=2525)
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--skip-sync', action='store_true', help='기존 방식(매번 새 연결) 측정을 생략합니다.')
+
+    def _connection(self, options):
+        if not options['host']:
+            return get_connection(fail_silently=False)
+        return get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=options['host'], port=options['port'], username='', password='',
+            use_tls=False, use_ssl=False, fail_silently=False,
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        recipients = [f'bench{i}@example.com' for i in range(count)]
+        from_email = settings.DEFAULT_FROM_EMAIL or 'bench@localhost'
+        self.stdout.write('※ 실행 중인 run_email_worker가 있으면 대기열 측정 결과가 섞이므로 중지 후 실행하세요.')
+
+        if not options['skip_sync']:
+            started = time.perf_counter()
+            for to_email in recipients:
+                send_mail(BENCH_SUBJECT, f'인증번호: {generate_code()}', from_email, [to_email],
+                          connection=self._connection(options))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'[동기 발송] {count}건 {elapsed:.2f}s -> {count / elapsed:.1f}건/s, 요청당 {elapsed / count * 1000:.1f}ms')
+
+        try:
+            started = time.perf_counter()
+            for to_email in recipients:
+                enqueue_email(to_email, BENCH_SUBJECT, f'인증번호: {generate_code()}', expire_after=300)
+            enqueue_elapsed = time.perf_counter() - started
+            self.stdout.write(f'[대기열 등록] 요청당 {enqueue_elapsed / count * 1000:.2f}ms')
+
+            sender = EmailSender(self._connection(options), from_email)
+            started = time.perf_counter()
+            try:
+                sent, retried, failed = sender.drain(options['batch_size'])
+            finally:
+                sender.close()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f'[워커 발송] 발송 {sent}건 {elapsed:.2f}s -> {sent / elapsed:.1f}건/s (재시도 예정 {retried}건, 실패 {failed}건)'
+            ))
+        finally:
+            EmailOutbox.objects.filter(subject=BENCH_SUBJECT).delete()
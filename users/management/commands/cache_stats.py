@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from SKN17_FINAL_3TEAM.cache import flush_metrics, metrics_snapshot, reset_metrics
+
+
+class Command(BaseCommand):
+    help = '공유 캐시 백엔드와 캐시별 히트/미스 지표를 출력합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='집계된 지표를 초기화합니다.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset_metrics()
+            self.stdout.write(self.style.SUCCESS('캐시 지표를 초기화했습니다.'))
+            return
+
+        flush_metrics()
+        self.stdout.write(f'백엔드: {cache.__class__.__name__}')
+
+        snapshot = metrics_snapshot()
+        if not snapshot:
+            self.stdout.write('집계된 지표가 없습니다. (워커는 10초 주기로 반영)')
+            return
+
+        for name, counts in snapshot.items():
+            total = counts['hit'] + counts['miss']
+            ratio = counts['hit'] / total * 100 if total else 0
+            self.stdout.write(f"{name:<20} hit {counts['hit']:>8}  miss {counts['miss']:>8}  ({ratio:.1f}%)")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from users.eraser import claimable_jobs, run_erasure_job
+from users.models import AccountErasureJob
+
+
+class Command(BaseCommand):
+    help = '대기 중이거나 중단된 회원 데이터 삭제 작업을 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, dest='job_id', help='특정 작업만 실행합니다. (실패한 작업 재시도 포함)')
+
+    def handle(self, *args, **options):
+        if options['job_id']:
+            AccountErasureJob.objects.filter(pk=options['job_id'], status=AccountErasureJob.STATUS_FAILED).update(
+                status=AccountErasureJob.STATUS_PENDING, attempts=0
+            )
+            job_ids = [options['job_id']]
+        else:
+            job_ids = list(claimable_jobs().values_list('job_id', flat=True))
+
+        for job_id in job_ids:
+            ok = run_erasure_job(job_id)
+            job = AccountErasureJob.objects.get(pk=job_id)
+            line = f'[{job.job_id}] {job.user_id} {job.status} / 행 {job.deleted_rows}개, S3 객체 {job.deleted_objects}개'
+            if ok:
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                self.stdout.write(self.style.WARNING(f'{line} {job.last_error or "(다른 곳에서 실행 중)"}'))
+
+        self.stdout.write(f'총 {len(job_ids)}개 작업을 처리했습니다.')
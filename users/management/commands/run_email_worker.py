@@ -0,0 +1,50 @@
+import time
+import signal
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from users.mailer import BATCH_SIZE, EmailSender, claim_batch
+
+
+class Command(BaseCommand):
+    help = '메일 발송 대기열을 처리합니다. (SMTP 연결 유지, 묶음 발송, 일시 오류 재시도)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=0.5, help='대기열이 비었을 때 확인 주기(초)')
+        parser.add_argument('--once', action='store_true', help='현재 대기 중인 메일만 보내고 종료합니다.')
+
+    def handle(self, *args, **options):
+        sender = EmailSender()
+
+        if options['once']:
+            try:
+                sent, retried, failed = sender.drain(options['batch_size'])
+            finally:
+                sender.close()
+            self.stdout.write(self.style.SUCCESS(f'발송 {sent}건, 재시도 예정 {retried}건, 실패 {failed}건'))
+            return
+
+        running = True
+
+        def stop(signum, frame):
+            nonlocal running
+            running = False
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(self.style.SUCCESS('메일 발송 워커를 시작합니다.'))
+
+        try:
+            while running:
+                close_old_connections()
+                rows = claim_batch(options['batch_size'])
+                if rows:
+                    sent, retried, failed = sender.send_batch(rows)
+                    self.stdout.write(f'발송 {sent}건, 재시도 예정 {retried}건, 실패 {failed}건')
+                    continue
+
+                sender.close_if_idle()
+                time.sleep(options['poll_interval'])
+        finally:
+            sender.close()
+            self.stdout.write('메일 발송 워커를 종료합니다.')
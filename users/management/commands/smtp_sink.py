@@ -0,0 +1,93 @@
+import time
+import random
+import threading
+import socketserver
+from django.core.management.base import BaseCommand
+
+
+class SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, fail_rate, latency, log=None):
+        super().__init__(address, SinkHandler)
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.log = log      # 수신 건마다 호출 (None이면 출력하지 않음)
+        self.lock = threading.Lock()
+        self.received = 0
+        self.rejected = 0
+        self.connections = 0
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """메시지를 저장하지 않고 받기만 하는 최소 SMTP 서버 (STARTTLS/AUTH 미지원)"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode('ascii'))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply('220 smtp-sink ready')
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb == 'EHLO':
+                self.reply('250-smtp-sink')
+                self.reply('250 8BITMIME')
+            elif verb in ('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b'.\n', b''):
+                    pass
+                if server.latency:
+                    time.sleep(server.latency)
+                if random.random() < server.fail_rate:
+                    with server.lock:
+                        server.rejected += 1
+                    self.reply('451 Temporary failure, try again')
+                    continue
+                with server.lock:
+                    server.received += 1
+                    received = server.received
+                self.reply('250 Queued')
+                if server.log:
+                    server.log(f'수신 {received}건')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class Command(BaseCommand):
+    help = '테스트/벤치마크용 로컬 SMTP 수신 서버를 실행합니다. (메일은 저장하지 않음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=2525)
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='일시 오류(451) 응답 비율 0~1')
+        parser.add_argument('--latency', type=float, default=0.0, help='메시지당 응답 지연(초)')
+        parser.add_argument('--quiet', action='store_true')
+
+    def handle(self, *args, **options):
+        server = SinkServer(
+            (options['host'], options['port']), options['fail_rate'], options['latency'],
+            log=None if options['quiet'] else self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"SMTP sink 실행 중: {options['host']}:{options['port']}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'연결 {server.connections}회, 수신 {server.received}건, 일시 오류 {server.rejected}건')
@@ -0,0 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+from .context import get_user_context
+
+
+class UserContextMiddleware:
+    """
+    세션의 user_id로 request.user_ctx를 준비한다.
+    실제 조회는 처음 접근할 때 한 번만 수행 (비로그인 요청은 None)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user_id = request.session.get('user_id')
+        request.user_ctx = SimpleLazyObject(lambda: get_user_context(user_id)) if user_id else None
+        return self.get_response(request)
@@ -29,11 +29,81 @@ class UserInfo(models.Model):
     password = models.CharField(max_length=64, db_column='PASSWORD', help_text="영소문자와 숫자 포함 10~16자, 암호화")
     storage_usage = models.IntegerField(default=0, db_column='STORAGE_USAGE', help_text="단위: KB")
     free_use_yn = models.BooleanField(default=False, db_column='FREE_USE_YN')
+    closed_yn = models.BooleanField(default=False, db_column='CLOSED_YN', help_text="탈퇴 처리 중 (데이터 삭제 대기)")
+    closed_dt = models.DateTimeField(null=True, blank=True, db_column='CLOSED_DT')
 
     class Meta:
         db_table = 'USER_INFO'
+        indexes = [
+            models.Index(fields=['email'], name='IDX_USER_INFO_EMAIL'),
+        ]
         verbose_name = '회원 정보'
         verbose_name_plural = '회원 정보 목록'
 
     def __str__(self):
-        return self.user_id
\ No newline at end of file
+        return self.user_id
+
+class EmailOutbox(models.Model):
+    """
+    16) 메일 발송 대기열
+    인증번호 등 발신 메일을 저장해 두고 run_email_worker가 SMTP 연결을 재사용하며 묶음 발송한다.
+    """
+    STATUS_PENDING = 'PENDING'
+    STATUS_SENDING = 'SENDING'
+    STATUS_SENT = 'SENT'
+    STATUS_FAILED = 'FAILED'
+
+    outbox_id = models.BigAutoField(primary_key=True, db_column='OUTBOX_ID')
+    to_email = models.CharField(max_length=254, db_column='TO_EMAIL')
+    subject = models.CharField(max_length=255, db_column='SUBJECT')
+    body = models.TextField(db_column='BODY')
+    status = models.CharField(max_length=10, default=STATUS_PENDING, db_column='STATUS')
+    attempts = models.SmallIntegerField(default=0, db_column='ATTEMPTS')
+    next_attempt_dt = models.DateTimeField(db_column='NEXT_ATTEMPT_DT', help_text="발송 예정 시각 (발송 중에는 점유 만료 시각)")
+    expire_dt = models.DateTimeField(null=True, blank=True, db_column='EXPIRE_DT', help_text="이 시각 이후에는 발송하지 않음 (인증번호 유효시간)")
+    last_error = models.CharField(max_length=255, null=True, blank=True, db_column='LAST_ERROR')
+    created_dt = models.DateTimeField(auto_now_add=True, db_column='CREATED_DT')
+    sent_dt = models.DateTimeField(null=True, blank=True, db_column='SENT_DT')
+
+    class Meta:
+        db_table = 'EMAIL_OUTBOX'
+        verbose_name = '메일 발송 대기열'
+        verbose_name_plural = '메일 발송 대기열 목록'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_dt'], name='IDX_EMAIL_OUTBOX_DUE'),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email} - {self.status}"
+
+
+class AccountErasureJob(models.Model):
+    """
+    17) 회원 데이터 삭제 작업
+    탈퇴한 회원의 관련 데이터와 S3 파일을 백그라운드에서 나누어 삭제하는 작업의 진행 상황을 기록한다.
+    """
+    STATUS_PENDING = 'PENDING'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_DONE = 'DONE'
+    STATUS_FAILED = 'FAILED'
+
+    job_id = models.BigAutoField(primary_key=True, db_column='JOB_ID')
+    user_id = models.CharField(max_length=40, db_column='USER_ID', help_text="회원 행 삭제 후에도 남도록 FK가 아닌 값으로 저장")
+    email = models.CharField(max_length=254, db_column='EMAIL')
+    status = models.CharField(max_length=10, default=STATUS_PENDING, db_column='STATUS')
+    stage = models.CharField(max_length=30, blank=True, default='', db_column='STAGE')
+    deleted_rows = models.IntegerField(default=0, db_column='DELETED_ROWS')
+    deleted_objects = models.IntegerField(default=0, db_column='DELETED_OBJECTS', help_text="삭제한 S3 객체 수")
+    attempts = models.SmallIntegerField(default=0, db_column='ATTEMPTS')
+    last_error = models.CharField(max_length=255, null=True, blank=True, db_column='LAST_ERROR')
+    created_dt = models.DateTimeField(auto_now_add=True, db_column='CREATED_DT')
+    heartbeat_dt = models.DateTimeField(null=True, blank=True, db_column='HEARTBEAT_DT', help_text="진행 중 마지막 갱신 시각")
+    finished_dt = models.DateTimeField(null=True, blank=True, db_column='FINISHED_DT')
+
+    class Meta:
+        db_table = 'ACCOUNT_ERASURE_JOB'
+        verbose_name = '회원 데이터 삭제 작업'
+        verbose_name_plural = '회원 데이터 삭제 작업 목록'
+
+    def __str__(self):
+        return f"{self.user_id} - {self.status} ({self.stage})"
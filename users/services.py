@@ -4,26 +4,16 @@ import random
 import string
 import re
 from datetime import timedelta
-from django.conf import settings
-from django.core.mail import send_mail
 from django.utils import timezone
-from django.db.models import Q
 from django.core.cache import cache
+from SKN17_FINAL_3TEAM.cache import sliding_window_hit
 from .models import UserInfo, CommonCode
-from payments.models import SubscribeHistory, PaymentHistory
-
-TEAM_META_DATA = {
-    'LG': {'full': 'LG 트윈스', 'mascot': '수타'},
-    'HANWHA': {'full': '한화 이글스', 'mascot': '술이'},
-    'SSG': {'full': 'SSG 랜더스', 'mascot': '란디'},
-    'SAMSUNG': {'full': '삼성 라이온즈', 'mascot': '볼래요'},
-    'NC': {'full': 'NC 다이노스', 'mascot': '반비'},
-    'KT': {'full': 'KT 위즈', 'mascot': '똘이'},
-    'LOTTE': {'full': '롯데 자이언츠', 'mascot': '눌이'},
-    'KIA': {'full': 'KIA 타이거즈', 'mascot': '호거리'},
-    'DOOSAN': {'full': '두산 베어스', 'mascot': '철'},
-    'KIWOOM': {'full': '키움 히어로즈', 'mascot': '턱도리'},
-}
+from payments.services import get_subscription_state, get_payment_history_page
+from .context import invalidate_user_context
+from .mailer import enqueue_email
+from .eraser import start_account_erasure
+
+CODE_EXPIRE_SECONDS = 300   # 인증번호 유효시간 (세션 만료와 동일)
 
 
 def generate_code(length: int = 6) -> str:
@@ -32,8 +22,11 @@ def generate_code(length: int = 6) -> str:
 
 
 def send_code_email_logic(email: str) -> str:
-    """인증번호 생성 및 이메일 발송 로직"""
-    if UserInfo.objects.filter(email=email).exists():
+    """인증번호 생성 및 발송 대기열 등록 로직 (요청은 SMTP 응답을 기다리지 않음)"""
+    existing = UserInfo.objects.filter(email=email).values_list('closed_yn', flat=True).first()
+    if existing is not None:
+        if existing:
+            raise ValueError("탈퇴 처리 중인 이메일입니다. 잠시 후 다시 시도해주세요.")
         raise ValueError("DUPLICATE")
 
     code = generate_code()
@@ -44,7 +37,7 @@ def send_code_email_logic(email: str) -> str:
         f"유효시간: 5분\n\n"
         f"본인이 요청하지 않았다면 이 메일을 무시하셔도 됩니다."
     )
-    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email], fail_silently=False)
+    enqueue_email(email, subject, message, expire_after=CODE_EXPIRE_SECONDS)
     return code
 
 
@@ -99,7 +92,7 @@ def login_user_logic(email, password):
         raise PermissionError("LOCKED")
 
     try:
-        user = UserInfo.objects.get(email=email)
+        user = UserInfo.objects.get(email=email, closed_yn=False)
     except UserInfo.DoesNotExist:
         raise ValueError("존재하지 않는 이메일입니다.")
 
@@ -109,9 +102,9 @@ def login_user_logic(email, password):
         cache.delete(f"login_fail_{email}")
         return user.user_id
     else:
+        # 최근 10분간 실패 횟수 (모든 워커가 공유하는 캐시에서 원자적으로 집계)
         fail_key = f"login_fail_{email}"
-        current_fail = cache.get(fail_key, 0) + 1
-        cache.set(fail_key, current_fail, timeout=600)
+        current_fail = sliding_window_hit(fail_key, 600)
 
         if current_fail >= 5:
             cache.set(lock_key, 'LOCKED', timeout=600)
@@ -123,13 +116,13 @@ def login_user_logic(email, password):
 
 def send_reset_code_logic(email):
     """비밀번호 재설정 코드 발송"""
-    if not UserInfo.objects.filter(email=email).exists():
+    if not UserInfo.objects.filter(email=email, closed_yn=False).exists():
         raise ValueError("존재하지 않는 이메일입니다.")
 
     code = generate_code()
     subject = "[BAIS] 비밀번호 재설정 인증번호"
     message = f"인증번호: {code}\n유효시간: 5분"
-    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email], fail_silently=False)
+    enqueue_email(email, subject, message, expire_after=CODE_EXPIRE_SECONDS)
     return code
 
 
@@ -138,7 +131,7 @@ def reset_password_logic(email, new_password):
     hashed_new = validate_password_logic(new_password)
     
     try:
-        user = UserInfo.objects.get(email=email)
+        user = UserInfo.objects.get(email=email, closed_yn=False)
         if user.password == hashed_new:
             raise ValueError("기존에 사용하던 비밀번호입니다.")
         
@@ -148,32 +141,12 @@ def reset_password_logic(email, new_password):
         raise ValueError("사용자를 찾을 수 없습니다.")
 
 
-def get_setting_context(user_id):
-    """설정 페이지 데이터 조회 로직"""
-    user = UserInfo.objects.get(user_id=user_id)
-    
-    # 1. 팀 정보
-    team_full_name = "KBO 리그"
-    team_mascot = "마스코트"
-    if user.favorite_code and user.favorite_code.common_code_value in TEAM_META_DATA:
-        meta = TEAM_META_DATA[user.favorite_code.common_code_value]
-        team_full_name = meta['full']
-        team_mascot = meta['mascot']
-
-    # 2. 구독 정보
-    now = timezone.now()
-    current_sub = SubscribeHistory.objects.filter(
-        user=user, 
-        subscribe_start_dt__lte=now
-    ).filter(
-        Q(subscribe_end_dt__gte=now) | Q(subscribe_end_dt__isnull=True)
-    ).order_by('-subscribe_start_dt').first()
-
-    future_sub = SubscribeHistory.objects.filter(
-        user=user, subscribe_start_dt__gt=now 
-    ).order_by('subscribe_start_dt').first()
-
-    target_sub = future_sub if future_sub else current_sub
+def get_setting_context(user_ctx):
+    """설정 페이지 데이터 조회 로직 (user_ctx: users.context.get_user_context 결과)"""
+    user = user_ctx['user']
+
+    # 1. 구독 정보 (회원별 구독 상태 행 하나로 구성)
+    state = get_subscription_state(user.user_id)
 
     # 기본 컨텍스트 구조
     sub_context = {
@@ -182,9 +155,9 @@ def get_setting_context(user_id):
         'reserved_plan': '', 'reserved_start_date': '', 'reserved_next_pay': '', 'modal_expire_date': ''
     }
 
-    if current_sub:
+    if state.subscription_id:
         sub_context['has_sub'] = True
-        p_name = current_sub.plan.plan_name.upper()
+        p_name = state.plan.plan_name.upper()
         if 'PREMIUM' in p_name:
             sub_context['plan_code'] = 'PREMIUM'
             sub_context['plan_name'] = '프리미엄 플랜'
@@ -192,42 +165,37 @@ def get_setting_context(user_id):
             sub_context['plan_code'] = 'BASIC'
             sub_context['plan_name'] = '베이직 플랜'
         
-        last_pay = PaymentHistory.objects.filter(invoice__subscription=current_sub).order_by('-payment_date').first()
-        base_date = last_pay.payment_date if last_pay else current_sub.subscribe_start_dt
-        current_cycle_end = base_date + timedelta(days=30)
+        current_cycle_end = state.cycle_end_dt
         sub_context['expire_date'] = (current_cycle_end - timedelta(days=1)).strftime('%Y.%m.%d')
 
-        if future_sub:
+        if state.reserved_subscription_id:
             sub_context['has_reserved'] = True
-            f_plan = "프리미엄" if "PREMIUM" in future_sub.plan.plan_name.upper() else "베이직"
+            f_plan = "프리미엄" if "PREMIUM" in state.reserved_plan.plan_name.upper() else "베이직"
             sub_context['reserved_plan'] = f"{f_plan} 플랜"
-            sub_context['reserved_start_date'] = future_sub.subscribe_start_dt.strftime('%Y.%m.%d')
-            sub_context['reserved_next_pay'] = (future_sub.subscribe_start_dt + timedelta(days=30)).strftime('%Y.%m.%d')
-
-        if target_sub:
-            if target_sub.subscribe_end_dt:
-                sub_context['is_canceled'] = True
-                sub_context['modal_expire_date'] = target_sub.subscribe_end_dt.strftime('%Y.%m.%d')
-            else:
-                expected_end = target_sub.subscribe_start_dt + timedelta(days=30) if target_sub == future_sub else current_cycle_end
-                sub_context['modal_expire_date'] = (expected_end - timedelta(days=1)).strftime('%Y.%m.%d')
+            sub_context['reserved_start_date'] = state.reserved_start_dt.strftime('%Y.%m.%d')
+            sub_context['reserved_next_pay'] = (state.reserved_start_dt + timedelta(days=30)).strftime('%Y.%m.%d')
+
+        target_end_dt = state.reserved_expire_dt if state.reserved_subscription_id else state.expire_dt
+        if state.cancel_yn:
+            sub_context['is_canceled'] = True
+            sub_context['modal_expire_date'] = target_end_dt.strftime('%Y.%m.%d')
+        else:
+            expected_end = state.reserved_start_dt + timedelta(days=30) if state.reserved_subscription_id else current_cycle_end
+            sub_context['modal_expire_date'] = (expected_end - timedelta(days=1)).strftime('%Y.%m.%d')
         
         if not sub_context['is_canceled'] and not sub_context['has_reserved']:
             sub_context['next_pay_date'] = current_cycle_end.strftime('%Y.%m.%d')
 
-    # 3. 결제 내역
-    raw_payments = PaymentHistory.objects.filter(invoice__subscription__user=user).order_by('-payment_date')[:5]
-    payment_list = []
-    for pay in raw_payments:
-        pay.amount_str = f"{int(pay.payment_amount):,}"
-        payment_list.append(pay)
+    # 2. 결제 내역
+    payment_list, payment_cursor = get_payment_history_page(user.user_id)
 
     return {
         'user': user,
-        'team_full_name': team_full_name,
-        'team_mascot': team_mascot,
+        'team_full_name': user_ctx['team_full_name'],
+        'team_mascot': user_ctx['team_mascot'],
         'sub_info': sub_context,
-        'payment_list': payment_list
+        'payment_list': payment_list,
+        'payment_cursor': payment_cursor,
     }
 
 
@@ -238,9 +206,8 @@ def update_team_logic(user_id, new_team_code):
     except CommonCode.DoesNotExist:
         raise ValueError("존재하지 않는 구단 코드입니다.")
 
-    user = UserInfo.objects.get(user_id=user_id)
-    user.favorite_code_id = code_instance
-    user.save()
+    UserInfo.objects.filter(user_id=user_id).update(favorite_code=code_instance)
+    invalidate_user_context(user_id)
 
 
 def update_password_logic(user_id, current_pw, new_pw, confirm_pw):
@@ -263,11 +230,13 @@ def update_password_logic(user_id, current_pw, new_pw, confirm_pw):
 
 
 def delete_account_logic(user_id, password):
-    """회원 탈퇴 로직"""
-    user = UserInfo.objects.get(user_id=user_id)
+    """회원 탈퇴 로직 (즉시 탈퇴 상태로 바꾸고 데이터 삭제는 백그라운드에서 진행)"""
+    user = UserInfo.objects.get(user_id=user_id, closed_yn=False)
     input_hashed = hashlib.sha256(password.encode('utf-8')).hexdigest()
     
     if user.password != input_hashed:
         raise ValueError("비밀번호가 올바르지 않습니다.")
     
-    user.delete()
\ No newline at end of file
+    UserInfo.objects.filter(user_id=user_id).update(closed_yn=True, closed_dt=timezone.now())
+    invalidate_user_context(user_id)
+    start_account_erasure(user_id, user.email)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from payments.models import SubscribeHistory
+from .context import invalidate_user_context
+from .models import UserInfo
+
+
+@receiver(post_save, sender=UserInfo)
+@receiver(post_delete, sender=UserInfo)
+def invalidate_on_user_change(sender, instance, **kwargs):
+    """회원 정보(구단/용량/무료체험 등)가 바뀌면 요청 컨텍스트 캐시 삭제"""
+    invalidate_user_context(instance.user_id)
+
+
+@receiver(post_save, sender=SubscribeHistory)
+@receiver(post_delete, sender=SubscribeHistory)
+def invalidate_on_subscription_change(sender, instance, **kwargs):
+    """구독 생성/해지/갱신 시 요청 컨텍스트 캐시 삭제"""
+    invalidate_user_context(instance.user_id)
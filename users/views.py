@@ -192,7 +192,7 @@ def setting(request):
     if not user_id: return redirect('/')
     
     try:
-        context = services.get_setting_context(user_id)
+        context = services.get_setting_context(request.user_ctx)
         return render(request, 'setting.html', context)
     except UserInfo.DoesNotExist:
         request.session.flush()
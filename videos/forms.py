@@ -1,4 +1,5 @@
 from django import forms
+from users.models import CommonCode
 from .models import SubtitleInfo
 
 class SubtitleAdminForm(forms.ModelForm):
@@ -10,4 +11,15 @@ class SubtitleAdminForm(forms.ModelForm):
 
     class Meta:
         model = SubtitleInfo
-        exclude = ['subtitle']
\ No newline at end of file
+        exclude = ['subtitle']
+
+class SubtitleZipImportForm(forms.Form):
+    zip_file = forms.FileField(
+        label='자막 ZIP 파일',
+        help_text='* 타임라인 JSON 파일들을 묶은 ZIP. 파일명(확장자 제외)은 하이라이트 영상 ID 또는 영상 파일명과 같아야 합니다.'
+    )
+    commentator_code = forms.ModelChoiceField(
+        label='해설위원',
+        queryset=CommonCode.objects.filter(common_code_grp='COMMENTATOR'),
+        required=False
+    )
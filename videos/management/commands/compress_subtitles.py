@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from videos.models import SubtitleInfo
+from videos.subtitles import apply_subtitle_data, decode_subtitle, is_compressed
+
+
+class Command(BaseCommand):
+    help = '기존 자막 데이터를 gzip으로 압축하고 ETag/미리보기/큐 개수를 채웁니다.'
+
+    def handle(self, *args, **kwargs):
+        count = 0
+        rows = SubtitleInfo.objects.values_list('subtitle_id', 'subtitle', 'subtitle_etag', 'cue_count').iterator(chunk_size=100)
+
+        for subtitle_id, blob, etag, cue_count in rows:
+            blob = bytes(blob) if blob else b''
+            if is_compressed(blob) and etag and cue_count is not None:
+                continue
+
+            try:
+                cues = decode_subtitle(blob)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f'[{subtitle_id}] 자막 디코딩 실패: {e}'))
+                continue
+
+            sub = apply_subtitle_data(SubtitleInfo(pk=subtitle_id), cues)
+            SubtitleInfo.objects.filter(pk=subtitle_id).update(
+                subtitle=sub.subtitle,
+                subtitle_etag=sub.subtitle_etag,
+                preview_text=sub.preview_text,
+                cue_count=sub.cue_count,
+            )
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'총 {count}개의 자막을 갱신했습니다.'))
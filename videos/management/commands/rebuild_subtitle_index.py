@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from videos.search import rebuild_all
+
+
+class Command(BaseCommand):
+    help = '전체 자막의 검색 색인을 다시 생성합니다.'
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'총 {count}개의 자막 색인을 생성했습니다.'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from videos.reconcile import Reconciler, orphaned_jobs, unsubmitted_uploads, unsubmitted_variants
+
+
+class Command(BaseCommand):
+    help = '모니터링이 끊긴 RunPod 분석 작업을 복구합니다. (완료 결과 반영, 진행 중 작업 모니터링 재개, 유실 작업 실패 처리)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='대상만 출력합니다.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options['dry_run']:
+            for upload in orphaned_jobs(now):
+                self.stdout.write(f"[{upload.pk}] {upload.runpod_job_id} ({upload.job_status or '-'}, 마지막 확인 {upload.job_checked_dt})")
+            self.stdout.write(f"작업 제출 전 멈춘 업로드: {unsubmitted_uploads(now).count()}건")
+            self.stdout.write(f"작업 제출 전 멈춘 해설 재생성: {unsubmitted_variants(now).count()}건")
+            return
+
+        reconciler = Reconciler(log=self.stdout.write)
+        outcome = reconciler.run(now)
+        self.stdout.write(
+            f"결과 반영 {outcome['ingested']}건, 실패 {outcome['failed']}건, 유실 {outcome['lost']}건, "
+            f"모니터링 재개 {outcome['resumed']}건, 조회 실패 {outcome['unreachable']}건, "
+            f"제출 전 중단 {outcome['unsubmitted']}건"
+        )
+
+        if outcome['resumed']:
+            # 재개한 모니터링 스레드가 이 프로세스 안에서 돌기 때문에 끝날 때까지 기다린다.
+            reconciler.wait()
+        self.stdout.write(self.style.SUCCESS('복구 완료'))
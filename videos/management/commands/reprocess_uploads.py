@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from videos.reprocess import MAX_IN_FLIGHT, RATE_PER_MINUTE, Reprocessor, failed_uploads, resolve_commentator
+
+
+class Command(BaseCommand):
+    help = '분석 실패(23) 업로드 영상을 저장된 S3 원본으로 다시 분석합니다. (재업로드 없음)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='업로드 영상 ID (생략 시 --all-failed 필요)')
+        parser.add_argument('--all-failed', action='store_true', help='실패 상태 영상 전체')
+        parser.add_argument('--since', help='--all-failed와 함께: 이 날짜(YYYY-MM-DD) 이후 업로드만')
+        parser.add_argument('--commentator', help='해설위원 코드 또는 이름 (생략 시 기존 해설위원)')
+        parser.add_argument('--rate', type=float, default=RATE_PER_MINUTE, help='분당 최대 제출 수')
+        parser.add_argument('--max-in-flight', type=int, default=MAX_IN_FLIGHT, help='동시 분석 작업 수 상한')
+        parser.add_argument('--dry-run', action='store_true', help='대상만 출력합니다.')
+
+    def handle(self, *args, **options):
+        if options['ids']:
+            upload_ids = options['ids']
+        elif options['all_failed']:
+            qs = failed_uploads()
+            if options['since']:
+                qs = qs.filter(upload_date__gte=options['since'])
+            upload_ids = list(qs.order_by('upload_file').values_list('pk', flat=True))
+        else:
+            raise CommandError('업로드 영상 ID 또는 --all-failed를 지정하세요.')
+
+        commentator = resolve_commentator(options['commentator'])
+        if options['commentator'] and commentator is None:
+            raise CommandError(f"해설위원을 찾을 수 없습니다: {options['commentator']}")
+
+        self.stdout.write(f"대상 {len(upload_ids)}건" + (f" (해설위원: {commentator.common_code_value})" if commentator else ''))
+        if options['dry_run'] or not upload_ids:
+            self.stdout.write(', '.join(map(str, upload_ids)))
+            return
+
+        reprocessor = Reprocessor(
+            commentator=commentator, rate_per_minute=options['rate'],
+            max_in_flight=options['max_in_flight'], log=self.stdout.write,
+        )
+        outcome = reprocessor.run(upload_ids)
+        self.stdout.write(
+            f"제출 {len(outcome['submitted'])}건, 건너뜀(실패 상태 아님) {len(outcome['skipped'])}건, "
+            f"S3 원본 없음 {len(outcome['missing'])}건"
+        )
+        if outcome['missing']:
+            self.stdout.write(self.style.WARNING(f"재업로드 필요: {', '.join(map(str, outcome['missing']))}"))
+
+        if not outcome['submitted']:
+            return
+        # 모니터링 스레드가 이 프로세스 안에서 돌기 때문에 분석이 끝날 때까지 기다린다.
+        result = reprocessor.wait()
+        self.stdout.write(self.style.SUCCESS(
+            f"분석 완료 {result['done']}건, 실패 {result['failed']}건, 진행 중 {result['pending']}건"
+        ))
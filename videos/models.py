@@ -12,6 +12,9 @@ class FileInfo(models.Model):
 
     class Meta:
         db_table = 'FILE_INFO'
+        indexes = [
+            models.Index(fields=['file_path'], name='IDX_FILE_INFO_PATH'),
+        ]
         verbose_name = '파일 정보'
         verbose_name_plural = '파일 정보 목록'
 
@@ -32,9 +35,23 @@ class UserUploadVideo(models.Model):
     download_count = models.IntegerField(default=0, db_column='DOWNLOAD_COUNT')
     upload_date = models.DateField(db_column='UPLOAD_DATE')
     use_yn = models.BooleanField(default=True, db_column='USE_YN')
+    duration_sec = models.FloatField(null=True, blank=True, db_column='DURATION_SEC', help_text="영상 길이(초), 업로드 시 mp4 헤더에서 읽음")
+    content_hash = models.CharField(max_length=64, null=True, blank=True, db_column='CONTENT_HASH', help_text="원본 영상 SHA-256 (분석 결과 재사용 키)")
+    source_key = models.CharField(max_length=500, null=True, blank=True, db_column='SOURCE_KEY', help_text="업로드 원본 S3 키 (분석 완료 후 FILE_PATH가 결과 영상으로 바뀌어도 유지)")
+    input_key = models.CharField(max_length=500, null=True, blank=True, db_column='INPUT_KEY', help_text="분석 입력 S3 키 (업로드별 사본 또는 원본, 해설 재생성 시 재사용)")
+    # RunPod 분석 작업 추적 (프로세스가 죽어도 재시작 후 이어서 확인)
+    runpod_job_id = models.CharField(max_length=64, null=True, blank=True, db_column='RUNPOD_JOB_ID')
+    output_key = models.CharField(max_length=500, null=True, blank=True, db_column='OUTPUT_KEY', help_text="분석 결과 영상 S3 키")
+    job_submit_dt = models.DateTimeField(null=True, blank=True, db_column='JOB_SUBMIT_DT')
+    job_status = models.CharField(max_length=20, blank=True, default='', db_column='JOB_STATUS', help_text="마지막으로 확인한 RunPod 작업 상태")
+    job_checked_dt = models.DateTimeField(null=True, blank=True, db_column='JOB_CHECKED_DT', help_text="모니터링 마지막 확인 시각")
 
     class Meta:
         db_table = 'USER_UPLOAD_VIDEO'
+        indexes = [
+            models.Index(fields=['content_hash'], name='IDX_UPLOAD_VIDEO_HASH'),
+            models.Index(fields=['upload_title'], name='IDX_UPLOAD_VIDEO_TITLE'),   # 관리자 제목 앞부분 검색
+        ]
         verbose_name = '유저 업로드 영상'
         verbose_name_plural = '유저 업로드 영상 목록'
 
@@ -52,6 +69,10 @@ class HighlightVideo(models.Model):
 
     class Meta:
         db_table = 'HIGHLIGHT_VIDEO'
+        indexes = [
+            models.Index(fields=['highlight_title'], name='IDX_HIGHLIGHT_TITLE'),
+            models.Index(fields=['match_date'], name='IDX_HIGHLIGHT_MATCH_DATE'),
+        ]
         verbose_name = '하이라이트 영상'
         verbose_name_plural = '하이라이트 영상 목록'
 
@@ -65,9 +86,105 @@ class SubtitleInfo(models.Model):
     upload_file = models.ForeignKey(UserUploadVideo, on_delete=models.CASCADE, null=True, blank=True, db_column='UPLOAD_FILE_ID')
     video_file = models.ForeignKey(HighlightVideo, on_delete=models.CASCADE, null=True, blank=True, db_column='VIDEO_FILE_ID')
     commentator_code = models.ForeignKey(CommonCode, on_delete=models.SET_NULL, null=True, db_column='COMMENTATOR_CODE')
-    subtitle = models.BinaryField(db_column='SUBTITLE')
+    subtitle = models.BinaryField(db_column='SUBTITLE', help_text="gzip 압축된 JSON")
+    subtitle_etag = models.CharField(max_length=64, blank=True, default='', db_column='SUBTITLE_ETAG')
+    preview_text = models.CharField(max_length=100, blank=True, default='', db_column='PREVIEW_TEXT', help_text="첫 자막 미리보기")
+    cue_count = models.IntegerField(null=True, blank=True, db_column='CUE_COUNT')
+    # 해설위원별 추가 해설 (유저 업로드 영상 재해설): 최초 업로드 자막은 상태/영상 키 없음
+    status_code = models.ForeignKey(CommonCode, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', db_column='STATUS_CODE')
+    video_key = models.CharField(max_length=500, null=True, blank=True, db_column='VIDEO_KEY', help_text="이 해설이 입혀진 결과 영상 S3 키")
+    audio_key = models.CharField(max_length=500, null=True, blank=True, db_column='AUDIO_KEY', help_text="해설 음성(m4a) S3 키, 있으면 원본 영상과 함께 재생")
+    runpod_job_id = models.CharField(max_length=64, null=True, blank=True, db_column='RUNPOD_JOB_ID')
+    job_submit_dt = models.DateTimeField(null=True, blank=True, db_column='JOB_SUBMIT_DT')
+    job_checked_dt = models.DateTimeField(null=True, blank=True, db_column='JOB_CHECKED_DT', help_text="해설 재생성 요청/상태 변경 시각")
 
     class Meta:
         db_table = 'SUBTITLE_INFO'
         verbose_name = '자막 정보'
-        verbose_name_plural = '자막 정보 목록'
\ No newline at end of file
+        verbose_name_plural = '자막 정보 목록'
+
+class SubtitleCue(models.Model):
+    """
+    12) 자막 큐
+    자막 검색을 위해 SUBTITLE_INFO의 자막을 큐 단위로 펼쳐 저장한다.
+    """
+    cue_id = models.BigAutoField(primary_key=True, db_column='CUE_ID')
+    subtitle = models.ForeignKey(SubtitleInfo, on_delete=models.CASCADE, related_name='cues', db_column='SUBTITLE_ID')
+    start_sec = models.FloatField(db_column='START_SEC')
+    end_sec = models.FloatField(db_column='END_SEC')
+    cue_text = models.TextField(db_column='CUE_TEXT')
+
+    class Meta:
+        db_table = 'SUBTITLE_CUE'
+        verbose_name = '자막 큐'
+        verbose_name_plural = '자막 큐 목록'
+
+
+class SubtitleTerm(models.Model):
+    """
+    13) 자막 검색 색인
+    자막 큐 텍스트의 역색인(단어/음절 bigram -> 큐)을 저장한다.
+    """
+    term_id = models.BigAutoField(primary_key=True, db_column='TERM_ID')
+    term = models.CharField(max_length=40, db_column='TERM')
+    cue = models.ForeignKey(SubtitleCue, on_delete=models.CASCADE, db_column='CUE_ID')
+    subtitle = models.ForeignKey(SubtitleInfo, on_delete=models.CASCADE, db_column='SUBTITLE_ID')
+    term_freq = models.SmallIntegerField(default=1, db_column='TERM_FREQ')
+
+    class Meta:
+        db_table = 'SUBTITLE_TERM'
+        verbose_name = '자막 검색 색인'
+        verbose_name_plural = '자막 검색 색인 목록'
+        indexes = [
+            models.Index(fields=['term', 'subtitle'], name='IDX_SUBTITLE_TERM'),
+        ]
+
+
+class PipelineSpan(models.Model):
+    """
+    21) 분석 단계 소요 시간
+    업로드 영상 분석 파이프라인의 단계별(S3 복사, 작업 제출, GPU 대기/분석, 결과 반영) 소요 시간을 기록한다.
+    """
+    STAGE_CHOICES = [
+        ('upload_s3', 'S3 복사'),
+        ('presign', 'URL 서명'),
+        ('submit', '작업 제출'),
+        ('queue', 'GPU 대기'),
+        ('gpu', 'GPU 분석'),
+        ('ingest', '결과 반영'),
+    ]
+
+    span_id = models.BigAutoField(primary_key=True, db_column='SPAN_ID')
+    upload_file = models.ForeignKey(UserUploadVideo, on_delete=models.SET_NULL, null=True, blank=True, db_column='UPLOAD_FILE_ID')
+    runpod_job_id = models.CharField(max_length=64, null=True, blank=True, db_column='RUNPOD_JOB_ID')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, db_column='STAGE')
+    started_dt = models.DateTimeField(db_column='STARTED_DT')
+    duration_ms = models.IntegerField(db_column='DURATION_MS')
+    video_duration = models.FloatField(null=True, blank=True, db_column='VIDEO_DURATION', help_text="영상 길이(초), 길이 구간별 통계용")
+    success_yn = models.BooleanField(default=True, db_column='SUCCESS_YN')
+
+    class Meta:
+        db_table = 'PIPELINE_SPAN'
+        indexes = [
+            models.Index(fields=['started_dt', 'stage'], name='IDX_PIPELINE_SPAN_STARTED'),
+        ]
+        verbose_name = '분석 단계 소요 시간'
+        verbose_name_plural = '분석 단계 소요 시간 목록'
+
+
+class AnalysisArtifact(models.Model):
+    """
+    22) 분석 중간 결과
+    같은 원본 영상(CONTENT_HASH)의 음성 인식/이벤트 검출 결과를 저장해 해설위원만 바꾼 재분석에서 재사용한다.
+    """
+    artifact_id = models.BigAutoField(primary_key=True, db_column='ARTIFACT_ID')
+    content_hash = models.CharField(max_length=64, unique=True, db_column='CONTENT_HASH')
+    artifact_key = models.CharField(max_length=500, db_column='ARTIFACT_KEY', help_text="분석 결과 JSON S3 키")
+    source_upload = models.ForeignKey(UserUploadVideo, on_delete=models.SET_NULL, null=True, blank=True, db_column='SOURCE_UPLOAD_FILE_ID')
+    reuse_count = models.IntegerField(default=0, db_column='REUSE_COUNT')
+    created_dt = models.DateTimeField(auto_now_add=True, db_column='CREATED_DT')
+
+    class Meta:
+        db_table = 'ANALYSIS_ARTIFACT'
+        verbose_name = '분석 중간 결과'
+        verbose_name_plural = '분석 중간 결과 목록'
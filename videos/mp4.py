@@ -0,0 +1,76 @@
+"""
+mp4 헤더에서 영상 길이 읽기
+moov/mvhd 박스의 timescale, duration만 읽으므로 영상 전체를 디코딩하지 않는다. (ffprobe 불필요)
+moov가 파일 끝에 있는 경우(faststart 미적용)도 박스 크기만큼 건너뛰며 찾는다.
+"""
+import struct
+
+MAX_BOXES = 64      # 손상된 파일에서 무한히 헤매지 않도록 박스 탐색 수 제한
+
+
+def _iter_boxes(f, start, end):
+    """(박스 타입, 본문 시작 위치, 박스 끝 위치) 반복 (end=None이면 파일 끝까지)"""
+    pos = start
+    for _ in range(MAX_BOXES):
+        if end is not None and pos + 8 > end:
+            return
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header)
+        body = pos + 8
+        if size == 1:       # 64비트 크기
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            size = struct.unpack('>Q', large)[0]
+            body = pos + 16
+        elif size == 0:     # 파일 끝까지
+            yield box_type, body, end
+            return
+        if size < body - pos:
+            return
+        yield box_type, body, pos + size
+        pos += size
+
+
+def _read_mvhd(f, body):
+    f.seek(body)
+    version = f.read(4)[:1]
+    if version == b'\x01':
+        data = f.read(28)
+        if len(data) < 28:
+            return None
+        _, _, timescale, duration = struct.unpack('>QQIQ', data)
+    else:
+        data = f.read(16)
+        if len(data) < 16:
+            return None
+        _, _, timescale, duration = struct.unpack('>IIII', data)
+    if not timescale:
+        return None
+    return duration / timescale
+
+
+def probe_duration(fileobj):
+    """영상 길이(초), 읽을 수 없으면 None (파일 위치는 원래대로 되돌림)"""
+    try:
+        origin = fileobj.tell()
+    except Exception:
+        origin = None
+
+    try:
+        for box_type, body, box_end in _iter_boxes(fileobj, 0, None):
+            if box_type != b'moov':
+                continue
+            for child_type, child_body, _ in _iter_boxes(fileobj, body, box_end):
+                if child_type == b'mvhd':
+                    return _read_mvhd(fileobj, child_body)
+            return None
+        return None
+    except (OSError, struct.error, ValueError):
+        return None
+    finally:
+        if origin is not None:
+            fileobj.seek(origin)
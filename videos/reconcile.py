@@ -0,0 +1,188 @@
+"""
+RunPod 작업 복구 (reconcile)
+모니터링 스레드는 웹 워커 안에서 돌기 때문에 워커가 재시작되면 GPU 작업은 끝나도 업로드가 처리중(21)에 남는다.
+업로드 행에 기록된 작업 ID/결과 키로 아래를 처리한다.
+- 이미 끝난 작업: 결과 영상/자막 반영 (완료 22) 또는 실패(23) 처리
+- 아직 도는 작업: 원래 제출 시각 기준 제한 시간으로 모니터링 재개
+- 제한 시간을 넘긴 작업: 결과 영상이 S3에 있으면 반영, 없으면 실패 처리
+- 작업 제출 전에 멈춘 업로드: 실패(23) 처리 (관리자 재분석 대상)
+- 해설 재생성(자막 변형): 끝난 작업 결과 반영, 찾을 수 없거나 제한 시간을 넘긴 작업과 제출 전에 멈춘 요청은 실패 처리
+"""
+import time
+import logging
+import threading
+from datetime import timedelta
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from SKN17_FINAL_3TEAM.cache import try_lock
+from .models import SubtitleInfo, UserUploadVideo
+from .reprocess import STATUS_WAITING, STATUS_PROCESSING, STATUS_FAILED
+from .runpod import (
+    runpod_client, COMPLETED_STATUSES, FAILED_STATUSES, JOB_TIMEOUT, LOST_STATUS, TERMINAL_STATUSES,
+)
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER = 180           # 초: 이 시간 동안 모니터링 기록이 없으면 모니터가 죽은 것으로 본다 (기록 주기 30초)
+SUBMIT_GRACE = 15 * 60      # 초: 작업 제출 전(S3 업로드 중) 단계로 허용하는 시간
+RECONCILE_INTERVAL = 60
+LOCK_KEY = 'runpod:reconcile'
+
+
+def orphaned_jobs(now=None):
+    """제출은 됐지만 모니터링이 끊긴 업로드"""
+    now = now or timezone.now()
+    return UserUploadVideo.objects.filter(
+        upload_status_code_id=STATUS_PROCESSING, runpod_job_id__isnull=False,
+    ).exclude(job_status__in=TERMINAL_STATUSES).filter(
+        Q(job_checked_dt__lt=now - timedelta(seconds=STALE_AFTER)) | Q(job_checked_dt__isnull=True)
+    )
+
+
+def unsubmitted_uploads(now=None):
+    """작업 제출 전에 멈춘 업로드 (기록이 없는 이전 업로드는 업로드 일자로 판단)"""
+    now = now or timezone.now()
+    return UserUploadVideo.objects.filter(
+        upload_status_code_id__in=(STATUS_WAITING, STATUS_PROCESSING), runpod_job_id__isnull=True,
+    ).filter(
+        Q(job_checked_dt__lt=now - timedelta(seconds=SUBMIT_GRACE))
+        | Q(job_checked_dt__isnull=True, upload_date__lt=timezone.localdate(now))
+    )
+
+
+def pending_variants():
+    """제출된 해설 재생성 작업 (모니터 스레드가 살아 있어도 결과 반영은 한 번만 일어남)"""
+    return SubtitleInfo.objects.filter(
+        status_code_id=STATUS_PROCESSING, runpod_job_id__isnull=False,
+    ).select_related('upload_file').defer('subtitle')
+
+
+def unsubmitted_variants(now=None):
+    """작업 제출 전에 멈춘 해설 재생성 요청 (요청 직후 워커가 죽은 경우 등, 기록이 없는 이전 요청 포함)"""
+    now = now or timezone.now()
+    return SubtitleInfo.objects.filter(
+        status_code_id__in=(STATUS_WAITING, STATUS_PROCESSING), runpod_job_id__isnull=True,
+    ).filter(
+        Q(job_checked_dt__lt=now - timedelta(seconds=SUBMIT_GRACE)) | Q(job_checked_dt__isnull=True)
+    )
+
+
+class Reconciler:
+
+    def __init__(self, client=runpod_client, log=None):
+        self.client = client
+        self.log = log or logger.info
+        self.threads = []
+
+    def _claim(self, upload, now):
+        """확인 시각 조건부 갱신: 동시에 도는 다른 reconcile과 같은 작업을 겹쳐 처리하지 않는다."""
+        return bool(UserUploadVideo.objects.filter(
+            pk=upload.pk, runpod_job_id=upload.runpod_job_id, job_checked_dt=upload.job_checked_dt,
+        ).update(job_checked_dt=now))
+
+    def _resume(self, upload, started_at):
+        def run():
+            try:
+                self.client.resume_job(upload, started_at)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def reconcile_job(self, upload, now):
+        """작업 하나 처리 후 결과 ('ingested', 'failed', 'lost', 'resumed', 'unreachable', 'skipped')"""
+        if not self._claim(upload, now):
+            return 'skipped'
+
+        job_id = upload.runpod_job_id
+        started_at = upload.job_submit_dt.timestamp() if upload.job_submit_dt else time.time()
+        try:
+            status_data = self.client.fetch_job_status(job_id)
+        except Exception as e:
+            self.log(f"[{upload.pk}] RunPod 상태 조회 실패 ({job_id}): {e}")
+            return 'unreachable'
+
+        raw_status = (status_data or {}).get('status', '').upper()
+        if raw_status in COMPLETED_STATUSES:
+            return 'ingested' if self.client.complete_job(upload, job_id, upload.output_key, status_data) else 'skipped'
+        if raw_status in FAILED_STATUSES:
+            self.client.fail_job(upload, job_id, raw_status)
+            return 'failed'
+        if time.time() - started_at > JOB_TIMEOUT:
+            return 'ingested' if self.client.expire_job(upload, job_id, upload.output_key) else 'lost'
+
+        self._resume(upload, started_at)
+        return 'resumed'
+
+    def reconcile_variant(self, variant, now):
+        try:
+            status_data = self.client.fetch_job_status(variant.runpod_job_id)
+        except Exception as e:
+            self.log(f"[자막 {variant.pk}] RunPod 상태 조회 실패 ({variant.runpod_job_id}): {e}")
+            return 'unreachable'
+
+        raw_status = (status_data or {}).get('status', '').upper()
+        if raw_status in COMPLETED_STATUSES:
+            return 'ingested' if self.client.ingest_variant(variant.upload_file, variant, status_data) else 'skipped'
+        if status_data is None or raw_status in FAILED_STATUSES:
+            self.client.fail_variant(variant)
+            return 'failed'
+
+        if variant.job_submit_dt is None:
+            # 제출 시각 기록이 없는 이전 작업은 지금부터 제한 시간을 적용한다.
+            SubtitleInfo.objects.filter(pk=variant.pk, job_submit_dt__isnull=True).update(job_submit_dt=now)
+        elif (now - variant.job_submit_dt).total_seconds() > JOB_TIMEOUT:
+            self.client.fail_variant(variant)
+            return 'lost'
+        return None     # 진행 중
+
+    def run(self, now=None):
+        now = now or timezone.now()
+        outcome = {'ingested': 0, 'failed': 0, 'lost': 0, 'resumed': 0, 'unreachable': 0, 'skipped': 0}
+
+        for upload in orphaned_jobs(now).select_related('upload_file'):
+            result = self.reconcile_job(upload, now)
+            outcome[result] += 1
+            self.log(f"[{upload.pk}] {upload.runpod_job_id}: {result}")
+
+        for variant in pending_variants():
+            result = self.reconcile_variant(variant, now)
+            if result:
+                outcome[result] += 1
+                self.log(f"[자막 {variant.pk}] {variant.runpod_job_id}: {result}")
+
+        outcome['unsubmitted'] = unsubmitted_uploads(now).update(
+            upload_status_code_id=STATUS_FAILED, job_status=LOST_STATUS, job_checked_dt=now,
+        ) + unsubmitted_variants(now).update(status_code_id=STATUS_FAILED, job_checked_dt=now)
+        return outcome
+
+    def wait(self):
+        for thread in self.threads:
+            thread.join()
+
+
+def reconcile_once(log=None):
+    """여러 워커 중 한 곳에서만 실행 (잠금을 못 얻으면 None)"""
+    if not try_lock(LOCK_KEY, RECONCILE_INTERVAL - 1):
+        return None
+    return Reconciler(log=log).run()
+
+
+def start_reconciler(interval=RECONCILE_INTERVAL):
+    """gunicorn 워커 시작 시 호출: 시작 직후 한 번, 이후 interval초마다 복구 (실행은 잠금을 얻은 워커 하나만)"""
+    def loop():
+        while True:
+            try:
+                outcome = reconcile_once()
+                if outcome and any(outcome.values()):
+                    logger.info(f"RunPod 작업 복구: {outcome}")
+            except Exception as e:
+                logger.error(f"RunPod 작업 복구 실패: {e}")
+            finally:
+                connection.close()
+            time.sleep(interval)
+
+    threading.Thread(target=loop, daemon=True, name='runpod-reconciler').start()
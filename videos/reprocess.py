@@ -0,0 +1,124 @@
+import time
+import logging
+import threading
+from django.db import connection
+from users.models import CommonCode
+from .models import UserUploadVideo, SubtitleInfo
+from .runpod import runpod_client
+
+logger = logging.getLogger(__name__)
+
+STATUS_WAITING, STATUS_PROCESSING, STATUS_DONE, STATUS_FAILED = 20, 21, 22, 23
+DEFAULT_COMMENTATOR = 17
+RATE_PER_MINUTE = 6     # 분당 최대 제출 수 (장애 복구 직후 GPU 대기열을 한꺼번에 채우지 않도록)
+MAX_IN_FLIGHT = 4       # 동시에 분석 중인 재분석 작업 수 상한
+
+
+def failed_uploads():
+    return UserUploadVideo.objects.filter(upload_status_code_id=STATUS_FAILED, use_yn=True)
+
+
+def resolve_commentator(value):
+    """해설위원 공통코드 (코드 번호 또는 이름), 없으면 None"""
+    if value in (None, ''):
+        return None
+    qs = CommonCode.objects.filter(common_code_grp='COMMENTATOR')
+    if str(value).isdigit():
+        return qs.filter(common_code=int(value)).first()
+    return qs.filter(common_code_value=value).first()
+
+
+class Reprocessor:
+    """
+    실패(23) 영상을 이미 저장된 S3 객체로 다시 분석한다. (영상 재전송 없음)
+    - 상태 23 -> 20 조건부 변경으로 점유해 같은 영상이 두 번 제출되지 않는다.
+    - 분당 제출 수와 동시 분석 수를 제한한다.
+    """
+
+    def __init__(self, commentator=None, rate_per_minute=RATE_PER_MINUTE, max_in_flight=MAX_IN_FLIGHT, log=None):
+        self.commentator = commentator
+        self.interval = 60.0 / rate_per_minute if rate_per_minute else 0
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.log = log or logger.info
+        self.threads = []
+        self.outcome = {'submitted': [], 'skipped': [], 'missing': []}
+
+    def _claim(self, upload_id):
+        return bool(UserUploadVideo.objects.filter(
+            pk=upload_id, upload_status_code_id=STATUS_FAILED
+        ).update(upload_status_code_id=STATUS_WAITING))
+
+    def _analyst_id(self, upload):
+        """
+        선택한 해설위원으로 최초 업로드 자막 행을 바꾸고 RunPod 해설위원 번호 반환 (미선택 시 기존 자막 해설위원)
+        해설 재생성 변형(상태 코드가 있는 자막 행)은 각자의 해설위원을 유지한다.
+        """
+        base = SubtitleInfo.objects.filter(upload_file=upload, status_code__isnull=True)
+        if self.commentator:
+            base.update(commentator_code=self.commentator)
+            return self.commentator.common_code
+        current = base.values_list('commentator_code_id', flat=True).first()
+        return current or DEFAULT_COMMENTATOR
+
+    def _run_job(self, upload, analyst_id, input_key):
+        try:
+            runpod_client.process_and_monitor(upload, None, analyst_id, s3_input_key=input_key)
+        finally:
+            self.slots.release()
+            connection.close()
+
+    def run(self, upload_ids):
+        last_submit = 0.0
+        for upload_id in upload_ids:
+            upload = UserUploadVideo.objects.select_related('upload_file').filter(pk=upload_id).first()
+            if upload is None or upload.upload_status_code_id != STATUS_FAILED:
+                self.outcome['skipped'].append(upload_id)
+                continue
+
+            input_key = runpod_client.find_input_key(upload)
+            if input_key is None:
+                self.outcome['missing'].append(upload_id)
+                self.log(f"[{upload_id}] S3 원본 없음: 재업로드 필요")
+                continue
+
+            self.slots.acquire()
+            wait = self.interval - (time.monotonic() - last_submit)
+            if wait > 0:
+                time.sleep(wait)
+
+            if not self._claim(upload_id):     # 그 사이 다른 곳에서 재분석 시작
+                self.slots.release()
+                self.outcome['skipped'].append(upload_id)
+                continue
+
+            last_submit = time.monotonic()
+            thread = threading.Thread(target=self._run_job, args=(upload, self._analyst_id(upload), input_key), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+            self.outcome['submitted'].append(upload_id)
+            self.log(f"[{upload_id}] 재분석 제출 ({input_key})")
+        return self.outcome
+
+    def wait(self):
+        """제출한 작업이 모두 끝날 때까지 대기 후 최종 상태별 건수 반환"""
+        for thread in self.threads:
+            thread.join()
+        statuses = dict(UserUploadVideo.objects.filter(pk__in=self.outcome['submitted']).values_list('pk', 'upload_status_code_id'))
+        return {
+            'done': sum(1 for s in statuses.values() if s == STATUS_DONE),
+            'failed': sum(1 for s in statuses.values() if s == STATUS_FAILED),
+            'pending': sum(1 for s in statuses.values() if s not in (STATUS_DONE, STATUS_FAILED)),
+        }
+
+
+def start_reprocess(upload_ids, commentator=None):
+    """관리자 화면용: 백그라운드 스레드에서 제출 속도를 지키며 재분석 (요청은 바로 반환)"""
+    def run():
+        try:
+            outcome = Reprocessor(commentator=commentator).run(upload_ids)
+            logger.info(f"재분석 제출 {len(outcome['submitted'])}건, 건너뜀 {len(outcome['skipped'])}건, "
+                        f"원본 없음 {len(outcome['missing'])}건")
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, daemon=True).start()
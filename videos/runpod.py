@@ -1,17 +1,24 @@
 import boto3
 import requests
 import time
-import json
 import logging
 import os
 import tempfile
+import uuid
 import sys
 from botocore.config import Config
+from botocore.exceptions import ClientError
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
 from users.models import CommonCode
-from .models import SubtitleInfo
+from .models import AnalysisArtifact, SubtitleInfo, UserUploadVideo
+from .subtitles import apply_subtitle_data
+from .search import index_subtitle
+from .timing import record_interval, span
 
 logger = logging.getLogger(__name__)
 handler = logging.StreamHandler(sys.stdout)
@@ -21,6 +28,16 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+JOB_TIMEOUT = 20 * 60           # 제출 후 이 시간이 지나도 끝나지 않으면 실패 처리
+HEARTBEAT_INTERVAL = 30         # 모니터링 중 JOB_CHECKED_DT 갱신 주기(초), 상태가 바뀌면 바로 기록
+QUEUED_STATUSES = ('IN_QUEUE', 'QUEUED', 'PENDING')
+COMPLETED_STATUSES = ('COMPLETED', 'SUCCESS')
+FAILED_STATUSES = ('FAILED', 'CANCELLED', 'TIMED_OUT')
+LOST_STATUS = 'LOST'            # 결과 없이 제한 시간 초과
+TERMINAL_STATUSES = COMPLETED_STATUSES + FAILED_STATUSES + (LOST_STATUS,)
+ARTIFACT_PREFIX = 'artifacts'   # 원본 영상 해시별 음성 인식/이벤트 검출 결과 (artifacts/<hash>.json)
+AUDIO_CONTENT_TYPE = 'audio/mp4'    # 해설 재생성 결과: 해설 음성만 담은 m4a
+
 class RunPodClient:
     def __init__(self):
         s3_config = Config(
@@ -66,17 +83,35 @@ class RunPodClient:
         code_obj = self._get_common_code(code_val, 'STATUS')
         if code_obj:
             user_upload_instance.upload_status_code = code_obj
-            user_upload_instance.save()
+            user_upload_instance.save(update_fields=['upload_status_code'])
             logger.info(f"💾 DB 상태 업데이트: {code_val} (ID: {user_upload_instance.pk})")
 
-    def upload_video_to_s3(self, django_file_field):
+    def _record_job(self, user_upload_instance, **fields):
+        for name, value in fields.items():
+            setattr(user_upload_instance, name, value)
+        user_upload_instance.save(update_fields=list(fields))
+
+    def _heartbeat(self, user_upload_instance, job_id, raw_status):
+        UserUploadVideo.objects.filter(
+            pk=user_upload_instance.pk, runpod_job_id=job_id
+        ).exclude(job_status__in=TERMINAL_STATUSES).update(job_status=raw_status[:20], job_checked_dt=timezone.now())
+
+    def _claim_finish(self, user_upload_instance, job_id, final_status):
+        """작업 종료 처리 권한 획득 (모니터 스레드와 복구 작업이 겹쳐도 한 곳만 결과를 반영)"""
+        return bool(UserUploadVideo.objects.filter(
+            pk=user_upload_instance.pk, runpod_job_id=job_id
+        ).exclude(job_status__in=TERMINAL_STATUSES).update(job_status=final_status, job_checked_dt=timezone.now()))
+
+    def object_exists(self, s3_key):
         try:
-            filename = os.path.basename(django_file_field.name)
-        except Exception:
-            filename = f"video_{int(time.time())}.mp4"
-            
-        s3_key = f"inputs/{filename}"
-        
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                raise
+            return False
+
+    def upload_video_to_s3(self, django_file_field, s3_key):
         logger.info(f"📤 S3 업로드 시작 (Key: {s3_key})...")
 
         with tempfile.NamedTemporaryFile(delete=True) as tmp:
@@ -95,6 +130,74 @@ class RunPodClient:
         logger.info(f"✅ S3 업로드 완료: s3://{self.bucket_name}/{s3_key}")
         return s3_key
 
+    def _source_key(self, user_upload_instance):
+        """업로드 원본 객체 키 (기록이 없는 이전 업로드는 분석 완료 전의 FILE_PATH)"""
+        if user_upload_instance.source_key:
+            return user_upload_instance.source_key
+        name = user_upload_instance.upload_file.file_path.name
+        return name if name and not name.startswith('outputs/') else None
+
+    def input_copy_key(self, user_upload_instance):
+        """업로드별 분석 입력 사본 키 (inputs/<파일ID>_<파일명>): 파일명이 같은 다른 업로드와 겹치지 않는다."""
+        name = self._source_key(user_upload_instance) or user_upload_instance.upload_file.file_path.name
+        return f"inputs/{user_upload_instance.pk}_{os.path.basename(name)}"
+
+    def owned_input_key(self, user_upload_instance):
+        """
+        기록된 분석 입력 키가 이 업로드 소유(원본 객체 또는 업로드별 사본)일 때만 반환
+        이전에 기록된 inputs/<파일명> 공용 키는 다른 회원의 같은 이름 영상으로 덮어써질 수 있어 제외한다.
+        """
+        key = user_upload_instance.input_key
+        if key and key in (self._source_key(user_upload_instance), self.input_copy_key(user_upload_instance)):
+            return key
+        return None
+
+    def find_input_key(self, user_upload_instance):
+        """
+        이미 S3에 있는 이 업로드의 분석 입력 객체 키 (재분석/재해설 시 재업로드 없이 사용), 없으면 None
+        업로드 원본 객체를 먼저 확인하고, 없으면 업로드별 입력 사본을 사용한다.
+        """
+        candidates = [self._source_key(user_upload_instance), self.input_copy_key(user_upload_instance)]
+        return next((key for key in candidates if key and self.object_exists(key)), None)
+
+    def artifact_fields(self, content_hash):
+        """
+        작업 제출 payload에 붙일 분석 결과 URL
+        - 같은 원본의 결과가 있으면 읽기 URL: 워커가 음성 인식/이벤트 검출을 건너뛰고 해설 생성만 수행
+        - 없으면 쓰기 URL: 이번 분석 결과를 저장해 다음 재해설에서 사용
+        """
+        if not content_hash:
+            return {}
+
+        artifact = AnalysisArtifact.objects.filter(content_hash=content_hash).first()
+        if artifact:
+            AnalysisArtifact.objects.filter(pk=artifact.pk).update(reuse_count=F('reuse_count') + 1)
+            return {'s3_artifacts_url': self.s3_client.generate_presigned_url(
+                'get_object', Params={'Bucket': self.bucket_name, 'Key': artifact.artifact_key}, ExpiresIn=3600,
+            )}
+        return {'s3_artifacts_upload_url': self.s3_client.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': self.bucket_name, 'Key': f"{ARTIFACT_PREFIX}/{content_hash}.json", 'ContentType': 'application/json'},
+            ExpiresIn=3600,
+        )}
+
+    def register_artifact(self, user_upload_instance):
+        """작업 완료 후 워커가 분석 결과를 올렸으면 기록 (실패해도 분석 결과 반영에는 영향 없음)"""
+        content_hash = user_upload_instance.content_hash
+        if not content_hash or AnalysisArtifact.objects.filter(content_hash=content_hash).exists():
+            return
+        artifact_key = f"{ARTIFACT_PREFIX}/{content_hash}.json"
+        try:
+            if self.object_exists(artifact_key):
+                AnalysisArtifact.objects.create(
+                    content_hash=content_hash, artifact_key=artifact_key, source_upload=user_upload_instance,
+                )
+                logger.info(f"🗂️ 분석 결과 저장: {artifact_key}")
+        except IntegrityError:
+            pass    # 동시에 끝난 다른 작업이 먼저 기록
+        except Exception as e:
+            logger.warning(f"⚠️ 분석 결과 기록 실패: {e}")
+
     def generate_public_urls(self, input_s3_key):
         download_url = self.s3_client.generate_presigned_url(
             'get_object',
@@ -102,8 +205,9 @@ class RunPodClient:
             ExpiresIn=3600
         )
         
+        # 같은 초에 제출된 작업끼리 결과 키가 겹치지 않도록 임의 문자열을 붙인다.
         timestamp = int(time.time())
-        output_key = f"outputs/result_{timestamp}.mp4"
+        output_key = f"outputs/result_{timestamp}_{uuid.uuid4().hex[:12]}.mp4"
         
         upload_url = self.s3_client.generate_presigned_url(
             'put_object',
@@ -121,11 +225,22 @@ class RunPodClient:
             'output_key': output_key
         }
 
-    def submit_job(self, download_url, upload_url, analyst_id):
+    def generate_audio_urls(self, variant):
+        """해설 음성(m4a) 업로드 URL: 영상은 원본 스트림을 그대로 쓰고 해설위원별로 음성만 저장"""
+        audio_key = f"outputs/audio_{variant.pk}_{uuid.uuid4().hex}.m4a"
+        audio_upload_url = self.s3_client.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': self.bucket_name, 'Key': audio_key, 'ContentType': AUDIO_CONTENT_TYPE},
+            ExpiresIn=3600
+        )
+        return {'audio_upload_url': audio_upload_url, 'audio_key': audio_key}
+
+    def submit_job(self, download_url, upload_url, analyst_id, extra=None):
         payload = {
             's3_video_url': download_url,
             's3_upload_url': upload_url,
-            'analyst_select': int(analyst_id)
+            'analyst_select': int(analyst_id),
+            **(extra or {}),
         }
         endpoint = f"{self.runpod_url}/process_video"
         
@@ -138,35 +253,68 @@ class RunPodClient:
         logger.info(f"✅ 작업 제출 완료 (Job ID: {job_id})")
         return job_id
 
-    def process_and_monitor(self, user_upload_instance, _, db_analyst_id):
+    def fetch_job_status(self, job_id):
+        """RunPod 작업 상태 조회 (작업을 찾을 수 없으면 None)"""
+        response = self.session.get(f"{self.runpod_url}/status/{job_id}", timeout=15)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def process_and_monitor(self, user_upload_instance, _, db_analyst_id, s3_input_key=None):
+        """s3_input_key가 있으면(재분석) 영상 업로드를 건너뛰고 해당 객체로 바로 작업 제출"""
         try:
             self._update_status(user_upload_instance, 21)
+            # 입력 키는 업로드 전에 기록: 중간에 멈춰도 회원 삭제 시 사본 키를 잃지 않는다.
+            input_key = s3_input_key or self.input_copy_key(user_upload_instance)
+            self._record_job(
+                user_upload_instance, runpod_job_id=None, output_key=None, input_key=input_key, job_submit_dt=None,
+                job_status='', job_checked_dt=timezone.now(),
+            )
             runpod_analyst_id = self.ANALYST_MAPPING.get(db_analyst_id, 1)
 
-            s3_input_key = self.upload_video_to_s3(user_upload_instance.upload_file.file_path)
-            urls = self.generate_public_urls(s3_input_key)
-            job_id = self.submit_job(urls['download_url'], urls['upload_url'], runpod_analyst_id)
+            if s3_input_key is None:
+                with span(user_upload_instance, 'upload_s3'):
+                    s3_input_key = self.upload_video_to_s3(user_upload_instance.upload_file.file_path, input_key)
+            with span(user_upload_instance, 'presign'):
+                urls = self.generate_public_urls(s3_input_key)
+            with span(user_upload_instance, 'submit'):
+                job_id = self.submit_job(
+                    urls['download_url'], urls['upload_url'], runpod_analyst_id,
+                    extra=self.artifact_fields(user_upload_instance.content_hash),
+                )
+            # 제출 즉시 기록: 이 프로세스가 죽어도 reconcile 작업이 이어서 확인한다.
+            now = timezone.now()
+            self._record_job(
+                user_upload_instance, runpod_job_id=job_id, output_key=urls['output_key'],
+                job_submit_dt=now, job_status='IN_QUEUE', job_checked_dt=now,
+            )
             self._monitor_loop(user_upload_instance, job_id, db_analyst_id, urls['output_key'])
 
         except Exception as e:
             logger.error(f"❌ 프로세스 실패: {e}")
             self._update_status(user_upload_instance, 23)
 
-    def _monitor_loop(self, user_upload_instance, job_id, db_analyst_id, output_s3_key):
+    def _monitor_loop(self, user_upload_instance, job_id, db_analyst_id, output_s3_key, started_at=None):
+        """
+        started_at: 작업 제출 시각(time.time() 기준), 복구 후 이어서 확인할 때 원래 제한 시간을 지키기 위해 사용
+        GPU 대기/분석 구간은 대기 상태를 직접 본 경우에만 기록한다. (복구 후 이미 분석 중이면 시작 시점을 알 수 없음)
+        """
         poll_interval = 5
-        max_wait_time = 20 * 60 
-        start_time = time.time()
+        max_wait_time = JOB_TIMEOUT
+        start_time = started_at or time.time()
+        last_status, last_beat = None, 0
+        saw_queue, queue_end = started_at is None, None
 
         while True:
             elapsed_time = time.time() - start_time
             if elapsed_time > max_wait_time:
                 logger.error(f"⏰ 타임아웃 발생! ({max_wait_time}초 초과)")
-                self._update_status(user_upload_instance, 23)
+                self.expire_job(user_upload_instance, job_id, output_s3_key)
                 break
 
             try:
-                response = self.session.get(f"{self.runpod_url}/status/{job_id}", timeout=15)
-                status_data = response.json()
+                status_data = self.fetch_job_status(job_id) or {}
                 raw_status = status_data.get('status', '').upper()
                 
                 step = status_data.get('step', '')
@@ -174,38 +322,29 @@ class RunPodClient:
                      progress = status_data.get('progress', 0)
                      logger.info(f"Job Status: {raw_status} | Progress: {progress}% | Step: {step}")
 
-                if raw_status in ['COMPLETED', 'SUCCESS']:
-                    logger.info("✅ RunPod 작업 완료! DB 업데이트 시작...")
-                    
-                    try:
-                        file_info = user_upload_instance.upload_file
-                        file_info.file_path.name = output_s3_key 
-                        file_info.save()
-                        logger.info(f"💾 영상 경로 연결 완료: {output_s3_key}")
-                        
-                        output_data = status_data.get('output', {})
-                        script_data = output_data.get('script') if isinstance(output_data, dict) else None
-
-                        if script_data:
-                            script_bytes = json.dumps(script_data, ensure_ascii=False).encode('utf-8')
-                            
-                            subtitle_info = SubtitleInfo.objects.get(upload_file=user_upload_instance)
-                            subtitle_info.subtitle = script_bytes
-                            subtitle_info.save()
-                            logger.info("💾 자막 데이터 업데이트 완료")
-
-                        self._update_status(user_upload_instance, 22)
-                        
-                    except Exception as e:
-                        logger.error(f"❌ DB 저장 중 오류 발생: {e}")
-                        self._update_status(user_upload_instance, 23)
-                    
+                if raw_status in QUEUED_STATUSES:
+                    saw_queue = True
+                elif raw_status and queue_end is None:
+                    queue_end = time.time()
+                    if saw_queue:
+                        record_interval(user_upload_instance, 'queue', start_time, queue_end, job_id=job_id)
+
+                if raw_status in COMPLETED_STATUSES:
+                    if saw_queue:
+                        record_interval(user_upload_instance, 'gpu', queue_end, time.time(), job_id=job_id)
+                    self.complete_job(user_upload_instance, job_id, output_s3_key, status_data)
                     break 
                 
-                elif raw_status == 'FAILED':
+                elif raw_status in FAILED_STATUSES:
                     logger.error(f"❌ RunPod 작업 실패: {status_data.get('error')}")
-                    self._update_status(user_upload_instance, 23)
+                    if saw_queue:
+                        record_interval(user_upload_instance, 'gpu', queue_end, time.time(), success=False, job_id=job_id)
+                    self.fail_job(user_upload_instance, job_id, raw_status)
                     break
+
+                if raw_status != last_status or time.time() - last_beat >= HEARTBEAT_INTERVAL:
+                    self._heartbeat(user_upload_instance, job_id, raw_status)
+                    last_status, last_beat = raw_status, time.time()
                 
                 time.sleep(poll_interval)
             
@@ -213,4 +352,170 @@ class RunPodClient:
                 logger.error(f"⚠️ 모니터링 중 에러 발생: {e}")
                 time.sleep(poll_interval)
 
+    def resume_job(self, user_upload_instance, started_at):
+        """기록된 작업 ID/결과 키로 모니터링 재개 (reconcile)"""
+        self._monitor_loop(
+            user_upload_instance, user_upload_instance.runpod_job_id, None,
+            user_upload_instance.output_key, started_at=started_at,
+        )
+
+    def complete_job(self, user_upload_instance, job_id, output_s3_key, status_data):
+        """결과 영상/자막 반영 후 완료(22) 처리, 이미 다른 곳에서 처리했으면 False"""
+        if not self._claim_finish(user_upload_instance, job_id, 'COMPLETED'):
+            logger.info(f"↩️ 이미 처리된 작업 (Job ID: {job_id})")
+            return False
+
+        logger.info("✅ RunPod 작업 완료! DB 업데이트 시작...")
+        try:
+            with span(user_upload_instance, 'ingest', job_id):
+                file_info = user_upload_instance.upload_file
+                file_info.file_path.name = output_s3_key 
+                file_info.save()
+                logger.info(f"💾 영상 경로 연결 완료: {output_s3_key}")
+                
+                output_data = status_data.get('output', {})
+                script_data = output_data.get('script') if isinstance(output_data, dict) else None
+
+                if script_data:
+                    # 최초 업로드 자막 (해설 재생성 변형은 상태 코드가 있음)
+                    subtitle_info = SubtitleInfo.objects.get(upload_file=user_upload_instance, status_code__isnull=True)
+                    apply_subtitle_data(subtitle_info, script_data)
+                    subtitle_info.save()
+                    index_subtitle(subtitle_info, script_data)
+                    logger.info("💾 자막 데이터 업데이트 완료")
+
+            self._update_status(user_upload_instance, 22)
+            
+        except Exception as e:
+            logger.error(f"❌ DB 저장 중 오류 발생: {e}")
+            self._update_status(user_upload_instance, 23)
+        self.register_artifact(user_upload_instance)
+        return True
+
+    def fail_job(self, user_upload_instance, job_id, final_status):
+        if self._claim_finish(user_upload_instance, job_id, final_status[:20]):
+            self._update_status(user_upload_instance, 23)
+
+    def expire_job(self, user_upload_instance, job_id, output_s3_key):
+        """
+        제한 시간 초과: 결과 영상이 이미 S3에 올라와 있고 (상태 응답을 놓친 경우) 다시 조회한 상태에 자막이 있으면 반영하고,
+        아니면 실패(23) 처리한다. (자막 없는 영상을 완료로 보여주지 않고 재분석 대상으로 남김) 결과를 반영했으면 True
+        S3 확인이나 상태 재조회 자체가 실패하면 상태를 그대로 두어 다음 reconcile 때 다시 확인한다.
+        """
+        try:
+            found = bool(output_s3_key) and self.object_exists(output_s3_key)
+            status_data = (self.fetch_job_status(job_id) or {}) if found else {}
+        except Exception as e:
+            logger.error(f"⚠️ 결과 영상/작업 상태 확인 실패: {e}")
+            return False
+
+        output_data = status_data.get('output', {})
+        script_data = output_data.get('script') if isinstance(output_data, dict) else None
+        if found and script_data:
+            logger.info(f"📦 제한 시간 초과 후 결과 영상/자막 발견: {output_s3_key}")
+            return self.complete_job(user_upload_instance, job_id, output_s3_key, status_data)
+        if found:
+            logger.error(f"❌ 결과 영상은 있지만 자막이 없어 실패 처리: {output_s3_key}")
+        self.fail_job(user_upload_instance, job_id, LOST_STATUS)
+        return False
+
+    # --- [해설 재생성: 업로드 상태는 그대로 두고 자막 변형(variant)에만 결과 반영] ---
+    def _set_variant_status(self, variant, code_val, **fields):
+        SubtitleInfo.objects.filter(pk=variant.pk).update(status_code_id=code_val, **fields)
+        variant.status_code_id = code_val
+
+    def process_variant(self, user_upload_instance, variant, db_analyst_id, s3_input_key):
+        """
+        저장된 원본 객체와 분석 결과(있으면)로 다른 해설위원의 해설 생성
+        워커에는 해설 음성(m4a) 업로드 URL을 함께 보낸다. 음성만 올리면 영상 재인코딩/저장 없이 원본 영상 위에 재생하고,
+        음성 업로드를 지원하지 않는 워커는 기존처럼 결과 영상을 올린다. (결과 반영 시 어느 쪽인지 확인)
+        """
+        try:
+            self._set_variant_status(variant, 21, job_checked_dt=timezone.now())
+            urls = self.generate_public_urls(s3_input_key)
+            audio = self.generate_audio_urls(variant)
+            job_id = self.submit_job(
+                urls['download_url'], urls['upload_url'], self.ANALYST_MAPPING.get(db_analyst_id, 1),
+                extra={'s3_audio_upload_url': audio['audio_upload_url'], **self.artifact_fields(user_upload_instance.content_hash)},
+            )
+            # 제출 즉시 기록: 모니터가 죽어도 reconcile 작업이 결과를 반영한다.
+            now = timezone.now()
+            SubtitleInfo.objects.filter(pk=variant.pk).update(
+                runpod_job_id=job_id, video_key=urls['output_key'], audio_key=audio['audio_key'],
+                job_submit_dt=now, job_checked_dt=now,
+            )
+            variant.runpod_job_id, variant.video_key, variant.audio_key = job_id, urls['output_key'], audio['audio_key']
+            variant.job_submit_dt = now
+            self._monitor_variant(user_upload_instance, variant, job_id)
+
+        except Exception as e:
+            logger.error(f"❌ 해설 재생성 실패: {e}")
+            self.fail_variant(variant)
+
+    def _monitor_variant(self, user_upload_instance, variant, job_id):
+        poll_interval = 5
+        start_time = time.time()
+
+        while time.time() - start_time <= JOB_TIMEOUT:
+            try:
+                status_data = self.fetch_job_status(job_id) or {}
+                raw_status = status_data.get('status', '').upper()
+                if raw_status in COMPLETED_STATUSES:
+                    self.ingest_variant(user_upload_instance, variant, status_data)
+                    return
+                if raw_status in FAILED_STATUSES:
+                    logger.error(f"❌ 해설 재생성 작업 실패: {status_data.get('error')}")
+                    self.fail_variant(variant)
+                    return
+            except Exception as e:
+                logger.error(f"⚠️ 해설 재생성 모니터링 중 에러 발생: {e}")
+            time.sleep(poll_interval)
+
+        logger.error(f"⏰ 해설 재생성 타임아웃 (Job ID: {job_id})")
+        self.fail_variant(variant)
+
+    def fail_variant(self, variant):
+        SubtitleInfo.objects.filter(pk=variant.pk, status_code_id__in=(20, 21)).update(status_code_id=23)
+        variant.status_code_id = 23
+
+    def _variant_rendition(self, variant):
+        """워커가 올린 결과 종류에 맞춰 남길 키: 음성이 있으면 영상 키를, 없으면 음성 키를 비운다."""
+        if variant.audio_key and self.object_exists(variant.audio_key):
+            return {'audio_key': variant.audio_key, 'video_key': None}
+        return {'audio_key': None, 'video_key': variant.video_key}
+
+    def ingest_variant(self, user_upload_instance, variant, status_data):
+        """
+        결과 자막/음성(또는 영상) 반영 (처리 중(21)인 경우에만 한 번의 UPDATE로 저장해 모니터와 reconcile이 겹쳐도 한 번만 반영)
+        반영했으면 True, S3 확인이 실패하면 상태를 그대로 두어 다음 reconcile 때 다시 반영한다.
+        """
+        output_data = status_data.get('output', {})
+        script_data = output_data.get('script') if isinstance(output_data, dict) else None
+        if not script_data:
+            logger.error("❌ 해설 재생성 결과에 자막이 없습니다.")
+            self.fail_variant(variant)
+            return False
+
+        try:
+            rendition = self._variant_rendition(variant)
+        except Exception as e:
+            logger.error(f"⚠️ 해설 음성 확인 실패: {e}")
+            return False
+
+        apply_subtitle_data(variant, script_data)
+        updated = SubtitleInfo.objects.filter(pk=variant.pk, status_code_id=21).update(
+            subtitle=variant.subtitle, subtitle_etag=variant.subtitle_etag, cue_count=variant.cue_count,
+            preview_text=variant.preview_text, status_code_id=22, **rendition,
+        )
+        if not updated:
+            return False
+
+        variant.status_code_id = 22
+        variant.audio_key, variant.video_key = rendition['audio_key'], rendition['video_key']
+        index_subtitle(variant, script_data)
+        self.register_artifact(user_upload_instance)
+        logger.info(f"💾 해설 재생성 완료 (자막 ID: {variant.pk})")
+        return True
+
+
 runpod_client = RunPodClient()
\ No newline at end of file
@@ -0,0 +1,155 @@
+import re
+import math
+from collections import Counter, defaultdict
+from SKN17_FINAL_3TEAM import cache as shared_cache
+from django.db import transaction
+from django.db.models import Q
+from .models import SubtitleInfo, SubtitleCue, SubtitleTerm
+from .subtitles import decode_subtitle
+
+WORD_RE = re.compile(r'[0-9A-Za-z가-힣]+')
+HANGUL_RE = re.compile(r'[가-힣]')
+
+# 질문에만 등장하고 자막 내용과는 무관한 표현 (검색어에서 제외)
+QUERY_STOPWORDS = {
+    '언제', '어디', '어디서', '몇', '분', '초', '장면', '순간', '나왔어', '나왔나', '나온',
+    '있었어', '했어', '했나', '보여줘', '알려줘', '찾아줘', '누가', '어떻게',
+}
+
+MAX_TERM_LENGTH = 40
+BM25_K1 = 1.2
+SNIPPET_LENGTH = 60
+
+
+def tokenize(text, stopwords=()):
+    """
+    텍스트 -> 색인어 목록
+    한글은 형태소 분석 없이 조사/어미 변화에 강하도록 음절 bigram, 영문/숫자는 단어 단위로 쪼갠다.
+    """
+    terms = []
+    for word in WORD_RE.findall(str(text).lower()):
+        if word in stopwords:
+            continue
+        if len(word) <= 2 or not HANGUL_RE.search(word):
+            terms.append(word[:MAX_TERM_LENGTH])
+        else:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def index_subtitle(subtitle_info, cues):
+    """
+    자막 하나의 색인을 새로 만든다 (해당 자막의 기존 색인만 교체하는 증분 방식)
+    MySQL은 bulk_create 후 PK를 돌려주지 않으므로 큐는 순서대로 다시 읽어 매핑한다.
+    """
+    with transaction.atomic():
+        SubtitleTerm.objects.filter(subtitle=subtitle_info).delete()
+        SubtitleCue.objects.filter(subtitle=subtitle_info).delete()
+
+        SubtitleCue.objects.bulk_create([
+            SubtitleCue(
+                subtitle=subtitle_info,
+                start_sec=float(c.get('start', 0)),
+                end_sec=float(c.get('end', 0)),
+                cue_text=str(c.get('text', '')),
+            )
+            for c in cues if str(c.get('text', '')).strip()
+        ], batch_size=1000)
+
+        terms = []
+        for cue_id, cue_text in SubtitleCue.objects.filter(subtitle=subtitle_info).order_by('cue_id').values_list('cue_id', 'cue_text'):
+            for term, freq in Counter(tokenize(cue_text)).items():
+                terms.append(SubtitleTerm(term=term, cue_id=cue_id, subtitle=subtitle_info, term_freq=min(freq, 32767)))
+
+        SubtitleTerm.objects.bulk_create(terms, batch_size=2000)
+
+
+def _visible_subtitles_q(user_id, prefix=''):
+    """하이라이트 전체 + 본인 업로드 영상 자막만 검색 대상"""
+    return (
+        Q(**{f'{prefix}video_file__isnull': False}) |
+        Q(**{f'{prefix}upload_file__user_id': user_id, f'{prefix}upload_file__use_yn': True})
+    )
+
+
+def _make_snippet(text, terms):
+    positions = [text.lower().find(t) for t in terms]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - SNIPPET_LENGTH // 3) if positions else 0
+    snippet = text[start:start + SNIPPET_LENGTH]
+    if start > 0:
+        snippet = '…' + snippet
+    if start + SNIPPET_LENGTH < len(text):
+        snippet += '…'
+    return snippet
+
+
+def search_subtitles(user_id, query, subtitle_id=None, limit=10):
+    """
+    자막 전문 검색 (BM25 점수 순)
+    Returns: [{'subtitle_id', 'video_id', 'is_user_upload', 'start', 'end', 'snippet', 'score'}, ...]
+    """
+    terms = list(dict.fromkeys(tokenize(query, QUERY_STOPWORDS)))
+    if not terms:
+        return []
+
+    postings = SubtitleTerm.objects.filter(term__in=terms)
+    if subtitle_id:
+        postings = postings.filter(subtitle_id=subtitle_id)
+    postings = postings.filter(_visible_subtitles_q(user_id, 'subtitle__'))
+
+    by_cue = defaultdict(dict)
+    doc_freq = Counter()
+    for cue_id, term, freq in postings.values_list('cue_id', 'term', 'term_freq'):
+        by_cue[cue_id][term] = freq
+        doc_freq[term] += 1
+
+    if not by_cue:
+        return []
+
+    if subtitle_id:
+        cue_total = SubtitleCue.objects.filter(subtitle_id=subtitle_id).count()
+    else:
+        cue_total = shared_cache.get_or_set('subtitle_search', 'subtitle_search:cue_total', SubtitleCue.objects.count, 600)
+    cue_total = max(cue_total, len(by_cue))
+    idf = {t: math.log(1 + (cue_total - df + 0.5) / (df + 0.5)) for t, df in doc_freq.items()}
+
+    scored = sorted(
+        ((sum(idf[t] * f * (BM25_K1 + 1) / (f + BM25_K1) for t, f in cue_terms.items()), cue_id)
+         for cue_id, cue_terms in by_cue.items()),
+        reverse=True
+    )[:limit]
+
+    scores = {cue_id: score for score, cue_id in scored}
+    cues = SubtitleCue.objects.filter(cue_id__in=scores).values(
+        'cue_id', 'subtitle_id', 'start_sec', 'end_sec', 'cue_text',
+        'subtitle__video_file_id', 'subtitle__upload_file_id'
+    )
+
+    hits = []
+    for c in cues:
+        is_user_upload = c['subtitle__upload_file_id'] is not None
+        hits.append({
+            'subtitle_id': c['subtitle_id'],
+            'video_id': c['subtitle__upload_file_id'] if is_user_upload else c['subtitle__video_file_id'],
+            'is_user_upload': is_user_upload,
+            'start': round(c['start_sec'], 2),
+            'end': round(c['end_sec'], 2),
+            'snippet': _make_snippet(c['cue_text'], terms),
+            'score': round(scores[c['cue_id']], 4),
+        })
+    hits.sort(key=lambda h: (-h['score'], h['start']))
+    return hits
+
+
+def rebuild_all():
+    """전체 자막 색인 재생성 (관리 명령용)"""
+    count = 0
+    for sub_info in SubtitleInfo.objects.only('subtitle_id', 'subtitle').iterator(chunk_size=20):
+        try:
+            cues = decode_subtitle(sub_info.subtitle)
+        except Exception:
+            continue
+        index_subtitle(sub_info, cues)
+        count += 1
+    return count
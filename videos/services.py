@@ -1,44 +1,41 @@
+import io
+import os
 import math
-import json
+import hashlib
 import logging
+import zipfile
 import threading
+from functools import lru_cache
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F, Q
 from django.core.paginator import Paginator
+from django.core.files.storage import default_storage
 from django.shortcuts import get_object_or_404
-from django.core.serializers.json import DjangoJSONEncoder
 from django.http import JsonResponse
+from django.urls import reverse
 from .runpod import runpod_client
-from payments.models import SubscribeHistory
+from .mp4 import probe_duration
+from .timing import estimate_eta, get_eta_table
+from .search import index_subtitle, search_subtitles
+from .subtitles import (
+    SubtitleIndex, apply_subtitle_data, compress_blob, compute_etag, decode_subtitle,
+    is_compressed, iter_json_array, timeline_to_cues,
+)
+from payments.services import get_subscription_state
+from users.context import invalidate_user_context
 from .models import UserInfo, HighlightVideo, UserUploadVideo, FileInfo, CommonCode, SubtitleInfo
 
 logger = logging.getLogger(__name__)
 
-# --- [상수 데이터] ---
-TEAM_META_DATA = {
-    'LG': {'full': 'LG 트윈스', 'mascot': '수타'},
-    'HANWHA': {'full': '한화 이글스', 'mascot': '술이'},
-    'SSG': {'full': 'SSG 랜더스', 'mascot': '란디'},
-    'SAMSUNG': {'full': '삼성 라이온즈', 'mascot': '볼래요'},
-    'NC': {'full': 'NC 다이노스', 'mascot': '반비'},
-    'KT': {'full': 'KT 위즈', 'mascot': '똘이'},
-    'LOTTE': {'full': '롯데 자이언츠', 'mascot': '눌이'},
-    'KIA': {'full': 'KIA 타이거즈', 'mascot': '호거리'},
-    'DOOSAN': {'full': '두산 베어스', 'mascot': '철'},
-    'KIWOOM': {'full': '키움 히어로즈', 'mascot': '턱도리'},
-}
-
 # --- [Helper Functions] ---
-def get_team_meta(user):
-    """헤더 툴팁용 구단 정보 반환"""
-    context = {'team_full_name': "KBO 리그", 'team_mascot': "마스코트"}
-    if user and user.favorite_code:
-        raw_code = user.favorite_code.common_code_value
-        code_key = raw_code.replace('FAVORITE - ', '').replace('FAVORITE-', '').strip().upper()
-        if code_key in TEAM_META_DATA:
-            context['team_full_name'] = TEAM_META_DATA[code_key]['full']
-            context['team_mascot'] = TEAM_META_DATA[code_key]['mascot']
-    return context
+def file_sha256(uploaded_file):
+    """업로드 파일 SHA-256 (분석 결과 재사용 키)"""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
 
 def format_bytes(size):
     """바이트 단위 변환"""
@@ -105,18 +102,18 @@ def _get_video_querysets(target_code, search_query='', sort_option='latest'):
 
 
 # --- [Business Logics] ---
-def get_home_context(user_id, search_query, req_team, sort_option='latest'):
-    """홈 화면 데이터 구성 로직"""
-    user = UserInfo.objects.get(user_id=user_id)
-    has_history = SubscribeHistory.objects.filter(user=user).exists()
-    meta_context = get_team_meta(user)
+def get_home_context(user_ctx, search_query, req_team, sort_option='latest'):
+    """홈 화면 데이터 구성 로직 (user_ctx: users.context.get_user_context 결과)"""
+    user = user_ctx['user']
+    has_history = user_ctx['has_history']
     
     context = {
         'user': user,
         'has_history': has_history,
         'show_plan_modal': not has_history,
         'sort_option': sort_option,
-        **meta_context
+        'team_full_name': user_ctx['team_full_name'],
+        'team_mascot': user_ctx['team_mascot'],
     }
 
     # 1. 검색 모드
@@ -139,9 +136,7 @@ def get_home_context(user_id, search_query, req_team, sort_option='latest'):
     
     # 2. 일반 모드
     else:
-        if not req_team and user.favorite_code:
-            req_team = user.favorite_code.common_code_value.replace('FAVORITE - ', '').replace('FAVORITE-', '').strip().upper()
-        target_code = req_team if req_team else 'LG'
+        target_code = req_team or user_ctx['team_code'] or 'LG'
 
         my_team_qs, other_qs, is_team_korea, current_display_name = _get_video_querysets(target_code, '', sort_option)
 
@@ -187,60 +182,45 @@ def get_video_list_api_logic(section_type, page, target_code, search_query, sort
     return data, videos_page.has_next()
 
 
-def get_play_context(user_id, video_id):
+def get_play_context(user_ctx, video_id):
     """하이라이트 영상 재생 컨텍스트 (무료체험 로직 포함)"""
-    user = UserInfo.objects.get(user_id=user_id)
-    has_history = SubscribeHistory.objects.filter(user=user).exists()
+    user = user_ctx['user']
+    has_history = user_ctx['has_history']
 
     if not has_history: 
         if not user.free_use_yn:
-            user.free_use_yn = True
-            user.save()
+            # 캐시된 회원 정보 대신 DB 조건부 갱신으로 무료체험 1회를 보장
+            if not UserInfo.objects.filter(user_id=user.user_id, free_use_yn=False).update(free_use_yn=True):
+                raise PermissionError("TRIAL_EXPIRED")
+            invalidate_user_context(user.user_id)
         else:
             raise PermissionError("TRIAL_EXPIRED") 
 
     video = get_object_or_404(HighlightVideo, video_file_id=video_id)
-    meta_context = get_team_meta(user)
     
-    subtitle_data = "[]"
-    try:
-        sub_info = SubtitleInfo.objects.filter(video_file_id=video_id).first()
-        if sub_info and sub_info.subtitle:
-            subtitle_list = json.loads(sub_info.subtitle.decode('utf-8'))
-            subtitle_data = json.dumps(subtitle_list, ensure_ascii=False)
-    except Exception:
-        pass 
-
-    current_team_code = 'LG'
-    if user.favorite_code:
-        current_team_code = user.favorite_code.common_code_value.replace('FAVORITE - ', '').replace('FAVORITE-', '').strip().upper()
+    sub_info = SubtitleInfo.objects.filter(video_file_id=video_id).only('subtitle_id', 'subtitle_etag').first()
 
     return {
         'user': user,
         'video': video,
-        'subtitle_data': subtitle_data,
-        'current_team_code': current_team_code,
+        'subtitle': sub_info,
+        'current_team_code': user_ctx['team_code'] or 'LG',
         'has_history': has_history,
-        **meta_context
+        'team_full_name': user_ctx['team_full_name'],
+        'team_mascot': user_ctx['team_mascot'],
     }
 
 
-def get_my_videos_context(user_id):
+def get_my_videos_context(user_ctx):
     """내 보관함 데이터 구성"""
-    user = UserInfo.objects.get(user_id=user_id)
+    user = user_ctx['user']
     
-    if not SubscribeHistory.objects.filter(user=user).exists():
+    if not user_ctx['has_history']:
         raise PermissionError("NO_SUBSCRIPTION")
 
-    meta_context = get_team_meta(user)
-    
-    active_sub = SubscribeHistory.objects.select_related('plan').filter(
-        user=user
-    ).filter(
-        Q(subscribe_end_dt__gte=timezone.now()) | Q(subscribe_end_dt__isnull=True)
-    ).order_by('-subscribe_start_dt').first()
+    state = get_subscription_state(user.user_id)
 
-    limit_bytes = active_sub.plan.storage_limit * 1024 if active_sub else 0
+    limit_bytes = state.storage_limit * 1024
     used_bytes = user.storage_usage * 1024
     remaining_bytes = max(0, limit_bytes - used_bytes)
     
@@ -251,6 +231,15 @@ def get_my_videos_context(user_id):
         user=user, use_yn=True
     ).select_related('upload_file', 'upload_status_code').order_by('-upload_date', '-pk')
 
+    # 처리 중인 영상: 최근 단계별 소요 시간 통계로 남은 시간(분) 표시
+    user_videos = list(user_videos)
+    processing = [v for v in user_videos if v.upload_status_code_id in (20, 21)]
+    if processing:
+        eta_table = get_eta_table()
+        for video in processing:
+            eta = estimate_eta(video, eta_table)
+            video.eta_minutes = math.ceil(eta / 60) if eta is not None else None
+
     return {
         'user': user,
         'has_history': True,
@@ -259,7 +248,8 @@ def get_my_videos_context(user_id):
         'storage_display': storage_display,
         'used_percentage': used_percentage,
         'video_list': user_videos,
-        **meta_context
+        'team_full_name': user_ctx['team_full_name'],
+        'team_mascot': user_ctx['team_mascot'],
     }
 
 
@@ -272,6 +262,8 @@ def process_upload_video(user_id, uploaded_file, title, commentator_name):
     if not uploaded_file.name.lower().endswith('.mp4'):
         raise ValueError('MP4 형식의 파일만 업로드 가능합니다.')
 
+    duration_sec = probe_duration(uploaded_file)
+    content_hash = file_sha256(uploaded_file)
     new_file_info = FileInfo.objects.create(file_path=uploaded_file)
     
     status_code_20 = CommonCode.objects.get(common_code=20, common_code_grp='STATUS')
@@ -285,7 +277,10 @@ def process_upload_video(user_id, uploaded_file, title, commentator_name):
         upload_title=title,
         upload_date=timezone.now(),
         download_count=0,
-        use_yn=True
+        use_yn=True,
+        duration_sec=duration_sec,
+        content_hash=content_hash,
+        source_key=new_file_info.file_path.name,
     )
     
     SubtitleInfo.objects.create(
@@ -296,8 +291,8 @@ def process_upload_video(user_id, uploaded_file, title, commentator_name):
     )
 
     file_size_kb = math.ceil(uploaded_file.size / 1024)
-    user.storage_usage += file_size_kb
-    user.save()
+    UserInfo.objects.filter(user_id=user_id).update(storage_usage=F('storage_usage') + file_size_kb)
+    invalidate_user_context(user_id)
 
     thread = threading.Thread(
         target=runpod_client.process_and_monitor,
@@ -313,10 +308,9 @@ def process_upload_video(user_id, uploaded_file, title, commentator_name):
 
 def process_download_logic(user_id, video_id):
     """다운로드 처리 로직 (카운트 증가)"""
-    user = UserInfo.objects.get(user_id=user_id)
     video = UserUploadVideo.objects.select_related('upload_file').get(
         upload_file__file_id=video_id, 
-        user=user, 
+        user_id=user_id, 
         use_yn=True
     )
 
@@ -335,36 +329,121 @@ def process_download_logic(user_id, video_id):
 
 def delete_video_logic(user_id, video_id):
     """영상 삭제 (Soft Delete)"""
-    user = UserInfo.objects.get(user_id=user_id)
     video = UserUploadVideo.objects.get(
         upload_file__file_id=video_id, 
-        user=user,
+        user_id=user_id,
         use_yn=True
     )
     video.use_yn = False
     video.save()
 
 
-def get_user_play_context(user_id, video_id):
+def _variant_state(subtitle_info, video_obj):
+    """
+    최초 업로드 자막(상태 없음)은 영상 분석 완료와 함께 준비된 것으로 본다.
+    이 업로드 소유의 원본이 없는 음성 해설(이전의 공용 inputs/<파일명> 키 기준)은 다시 요청하도록 실패로 본다.
+    """
+    if subtitle_info.status_code_id in (None, 22):
+        if subtitle_info.audio_key and not runpod_client.owned_input_key(video_obj):
+            return 'failed'
+        return 'ready'
+    return 'failed' if subtitle_info.status_code_id == 23 else 'pending'
+
+
+def _variant_media(subtitle_info, video_obj):
+    """
+    (영상 URL, 해설 음성 URL)
+    음성 해설은 이 업로드 소유의 원본 영상(분석 입력 객체)과 함께 재생하고, 영상 해설은 해설이 입혀진 결과 영상을 그대로 재생한다.
+    """
+    if subtitle_info.audio_key:
+        base_key = runpod_client.owned_input_key(video_obj)
+        return default_storage.url(base_key), default_storage.url(subtitle_info.audio_key)
+    if subtitle_info.video_key:
+        return default_storage.url(subtitle_info.video_key), None
+    return video_obj.upload_file.file_path.url, None
+
+
+def get_commentary_variants(video_obj):
+    """유저 업로드 영상의 해설위원별 자막/영상 목록 (최초 업로드 해설이 첫 번째)"""
+    variants = []
+    subtitles = SubtitleInfo.objects.filter(upload_file=video_obj).select_related('commentator_code').defer('subtitle').order_by('pk')
+    for subtitle_info in subtitles:
+        state = _variant_state(subtitle_info, video_obj)
+        video_url = audio_url = None
+        if state == 'ready':
+            video_url, audio_url = _variant_media(subtitle_info, video_obj)
+        variants.append({
+            'subtitle_id': subtitle_info.subtitle_id,
+            'commentator': subtitle_info.commentator_code.common_code_value if subtitle_info.commentator_code else None,
+            'state': state,
+            'video_url': video_url,
+            'audio_url': audio_url,
+            'track_url': f"{reverse('videos:subtitle_vtt', args=[subtitle_info.subtitle_id])}?v={subtitle_info.subtitle_etag}" if state == 'ready' else None,
+        })
+    return variants
+
+
+def request_commentary_variant(user_id, video_id, commentator_name):
+    """
+    분석이 끝난 업로드 영상에 다른 해설위원 해설 생성 요청 (영상 재업로드 없음)
+    이미 있거나 생성 중이면 그대로 반환, 실패한 해설은 다시 요청한다.
+    """
+    video_obj = UserUploadVideo.objects.select_related('upload_file').get(
+        upload_file__file_id=video_id, user_id=user_id, use_yn=True
+    )
+    if video_obj.upload_status_code_id != 22:
+        raise ValueError('분석이 완료된 영상만 해설위원을 바꿀 수 있습니다.')
+
+    commentator = CommonCode.objects.filter(common_code_value=commentator_name, common_code_grp='COMMENTATOR').first()
+    if not commentator:
+        raise ValueError('해설위원을 찾을 수 없습니다.')
+
+    existing = SubtitleInfo.objects.filter(upload_file=video_obj, commentator_code=commentator).defer('subtitle').first()
+    if existing and _variant_state(existing, video_obj) != 'failed':
+        return existing, False
+
+    input_key = runpod_client.find_input_key(video_obj)
+    if not input_key:
+        raise ValueError('원본 영상이 없어 해설을 다시 만들 수 없습니다.')
+    with transaction.atomic():
+        # 같은 영상에 동시에 요청이 들어와도 해설위원별 자막은 하나만 만든다.
+        UserUploadVideo.objects.select_for_update().filter(pk=video_obj.pk).first()
+        variant = SubtitleInfo.objects.filter(upload_file=video_obj, commentator_code=commentator).first()
+        if variant and _variant_state(variant, video_obj) != 'failed':
+            return variant, False
+        if video_obj.input_key != input_key:
+            # 음성 해설은 이 원본 영상 위에서 재생하므로 기록이 없는 이전 업로드도 키를 남긴다.
+            UserUploadVideo.objects.filter(pk=video_obj.pk).update(input_key=input_key)
+            video_obj.input_key = input_key
+        if variant is None:
+            variant = SubtitleInfo.objects.create(
+                upload_file=video_obj, commentator_code=commentator, subtitle=b'', status_code_id=20,
+                job_checked_dt=timezone.now(),
+            )
+        else:
+            SubtitleInfo.objects.filter(pk=variant.pk).update(
+                status_code_id=20, runpod_job_id=None, job_submit_dt=None, job_checked_dt=timezone.now(),
+            )
+            variant.status_code_id, variant.runpod_job_id, variant.job_submit_dt = 20, None, None
+
+    transaction.on_commit(lambda: threading.Thread(
+        target=runpod_client.process_variant,
+        args=(video_obj, variant, commentator.common_code, input_key),
+    ).start())
+    return variant, True
+
+
+def get_user_play_context(user_ctx, video_id):
     """유저 업로드 영상 재생 컨텍스트"""
-    user = UserInfo.objects.get(user_id=user_id)
-    meta_context = get_team_meta(user)
+    user = user_ctx['user']
     
     video_obj = get_object_or_404(UserUploadVideo, upload_file__file_id=video_id, user=user, use_yn=True)
     
-    subtitle_info = SubtitleInfo.objects.filter(upload_file=video_obj).select_related('commentator_code').first()
+    subtitle_info = SubtitleInfo.objects.filter(upload_file=video_obj).select_related('commentator_code').defer('subtitle').order_by('pk').first()
     
     commentator_name = "미지정"
-    subtitle_data = []
-    
-    if subtitle_info:
-        if subtitle_info.commentator_code:
-            commentator_name = subtitle_info.commentator_code.common_code_value
-        if subtitle_info.subtitle:
-            try:
-                subtitle_data = json.loads(subtitle_info.subtitle.decode('utf-8'))
-            except:
-                pass
+    if subtitle_info and subtitle_info.commentator_code:
+        commentator_name = subtitle_info.commentator_code.common_code_value
 
     mapped_video = {
         'video_file_id': video_obj.upload_file.file_id,
@@ -377,8 +456,119 @@ def get_user_play_context(user_id, video_id):
     return {
         'user': user,
         'video': mapped_video,        
-        'subtitle_data': json.dumps(subtitle_data, cls=DjangoJSONEncoder),
+        'subtitle': subtitle_info,
         'current_commentator': commentator_name,
+        'variants': get_commentary_variants(video_obj),
         'is_user_upload': True,  
-        **meta_context
-    }
\ No newline at end of file
+        'team_full_name': user_ctx['team_full_name'],
+        'team_mascot': user_ctx['team_mascot'],
+    }
+
+
+def get_subtitle_meta(user_id, subtitle_id):
+    """자막 접근 권한 확인 + ETag 조회 (자막 본문은 읽지 않음)"""
+    sub_info = SubtitleInfo.objects.filter(subtitle_id=subtitle_id).filter(
+        Q(video_file__isnull=False) |
+        Q(upload_file__user_id=user_id, upload_file__use_yn=True)
+    ).only('subtitle_id', 'subtitle_etag').first()
+
+    if not sub_info:
+        raise SubtitleInfo.DoesNotExist
+    return sub_info
+
+
+def get_subtitle_blob(sub_info):
+    """
+    자막 응답용 gzip 바이트와 ETag 반환
+    예전(비압축) 데이터는 이 시점에 한 번 압축해 저장하고, 이후 요청부터는 저장된 바이트를 그대로 보낸다.
+    """
+    blob = SubtitleInfo.objects.filter(pk=sub_info.pk).values_list('subtitle', flat=True).first()
+    blob = bytes(blob) if blob else b''
+
+    if not is_compressed(blob) or not sub_info.subtitle_etag:
+        blob = compress_blob(blob)
+        sub_info.subtitle_etag = compute_etag(blob)
+        SubtitleInfo.objects.filter(pk=sub_info.pk).update(subtitle=blob, subtitle_etag=sub_info.subtitle_etag)
+
+    return blob, sub_info.subtitle_etag
+
+
+def get_subtitle_index(sub_info):
+    """자막 구간 인덱스 반환 (ETag가 바뀌면 새로 생성)"""
+    if not sub_info.subtitle_etag:
+        get_subtitle_blob(sub_info)
+    return _load_subtitle_index(sub_info.pk, sub_info.subtitle_etag)
+
+
+@lru_cache(maxsize=32)
+def _load_subtitle_index(subtitle_id, etag):
+    blob = SubtitleInfo.objects.filter(pk=subtitle_id).values_list('subtitle', flat=True).first()
+    return SubtitleIndex(decode_subtitle(blob))
+
+
+def search_subtitles_logic(user_id, query, subtitle_id=None, limit=10):
+    """자막 검색 결과에 해당 시점으로 이동하는 재생 URL을 붙여 반환"""
+    hits = search_subtitles(user_id, query, subtitle_id=subtitle_id, limit=limit)
+    for hit in hits:
+        url_name = 'videos:play_user_video' if hit['is_user_upload'] else 'videos:play'
+        hit['url'] = f"{reverse(url_name, args=[hit['video_id']])}?t={hit['start']}"
+    return hits
+
+
+def _timeline_stem(filename):
+    """'vocals_timeline_123.json' -> '123'"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    trimmed = stem.removeprefix('vocals_timeline').lstrip('_-')
+    return trimmed or stem
+
+
+def import_subtitle_zip_logic(zip_file, commentator_code=None, highlight_ids=None):
+    """
+    타임라인 JSON ZIP 일괄 등록
+    파일명으로 하이라이트를 찾아 자막을 생성/갱신하며, DB 반영은 하나의 트랜잭션으로 처리한다.
+    """
+    highlights = HighlightVideo.objects.select_related('video_file')
+    if highlight_ids:
+        highlights = highlights.filter(video_file_id__in=highlight_ids)
+
+    by_name = {}
+    for h in highlights:
+        by_name[str(h.video_file_id)] = h.video_file_id
+        by_name[os.path.splitext(os.path.basename(h.video_file.file_path.name))[0]] = h.video_file_id
+
+    parsed = {}
+    unmatched = []
+    with zipfile.ZipFile(zip_file) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not info.filename.lower().endswith('.json'):
+                continue
+
+            video_id = by_name.get(_timeline_stem(info.filename))
+            if not video_id:
+                unmatched.append(info.filename)
+                continue
+
+            with zf.open(info) as raw:
+                parsed[video_id] = timeline_to_cues(iter_json_array(io.TextIOWrapper(raw, encoding='utf-8-sig')))
+
+    with transaction.atomic():
+        existing = {
+            sub.video_file_id: sub
+            for sub in SubtitleInfo.objects.filter(video_file_id__in=parsed, commentator_code=commentator_code).defer('subtitle')
+        }
+
+        to_create, to_update = [], []
+        for video_id, cues in parsed.items():
+            sub = existing.get(video_id) or SubtitleInfo(video_file_id=video_id, commentator_code=commentator_code)
+            apply_subtitle_data(sub, cues)
+            (to_update if sub.pk else to_create).append(sub)
+
+        SubtitleInfo.objects.bulk_create(to_create, batch_size=100)
+        SubtitleInfo.objects.bulk_update(to_update, ['subtitle', 'subtitle_etag', 'preview_text', 'cue_count'], batch_size=100)
+
+        # MySQL bulk_create는 PK를 채우지 않으므로 다시 조회해서 색인
+        saved = SubtitleInfo.objects.filter(video_file_id__in=parsed, commentator_code=commentator_code).only('subtitle_id', 'video_file_id')
+        for sub in saved:
+            index_subtitle(sub, parsed[sub.video_file_id])
+
+    return {'created': len(to_create), 'updated': len(to_update), 'unmatched': unmatched}
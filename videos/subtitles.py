@@ -0,0 +1,201 @@
+import bisect
+import gzip
+import json
+import hashlib
+
+GZIP_MAGIC = b'\x1f\x8b'
+PREVIEW_LENGTH = 30
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def encode_subtitle(cues) -> bytes:
+    """자막 리스트 -> gzip 압축 JSON 바이트 (mtime 고정으로 항상 같은 결과)"""
+    raw = json.dumps(cues, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def is_compressed(blob) -> bool:
+    return bytes(blob[:2]) == GZIP_MAGIC
+
+
+def subtitle_raw_bytes(blob) -> bytes:
+    """저장된 자막 blob -> 압축 해제된 JSON 바이트 (기존 비압축 데이터 호환)"""
+    if not blob:
+        return b'[]'
+    blob = bytes(blob)
+    return gzip.decompress(blob) if is_compressed(blob) else blob
+
+
+def compress_blob(blob) -> bytes:
+    """비압축/빈 blob -> gzip 바이트 (이미 압축된 경우 그대로)"""
+    blob = bytes(blob) if blob else b''
+    if is_compressed(blob):
+        return blob
+    return gzip.compress(blob or b'[]', compresslevel=9, mtime=0)
+
+
+def decode_subtitle(blob):
+    """저장된 자막 blob -> 자막 리스트"""
+    return json.loads(subtitle_raw_bytes(blob).decode('utf-8'))
+
+
+def compute_etag(compressed_blob) -> str:
+    return hashlib.sha256(compressed_blob).hexdigest()[:32]
+
+
+def apply_subtitle_data(subtitle_info, cues):
+    """
+    SubtitleInfo 인스턴스에 자막 데이터를 압축 저장하고 ETag를 갱신한다.
+    (save는 호출한 쪽에서 수행)
+    """
+    blob = encode_subtitle(cues)
+    subtitle_info.subtitle = blob
+    subtitle_info.subtitle_etag = compute_etag(blob)
+    subtitle_info.cue_count = len(cues)
+    subtitle_info.preview_text = str(cues[0].get('text', ''))[:PREVIEW_LENGTH] if cues else ''
+    return subtitle_info
+
+
+def timeline_to_cues(items):
+    """분석 타임라인(vocals_timeline) 항목 -> 자막 리스트 {start, end, text}"""
+    cues = []
+    for item in items:
+        text_parts = []
+        if item.get('caster_text'):
+            text_parts.append(f"{item['caster_text']}")
+        if item.get('analyst_text'):
+            text_parts.append(f"{item['analyst_text']}")
+
+        full_text = " ".join(text_parts)
+        if full_text.strip():
+            cues.append({
+                "start": round(float(item.get('set_start_sec', 0)), 2),
+                "end": round(float(item.get('set_end_sec', 0)), 2),
+                "text": full_text
+            })
+    return cues
+
+
+def iter_json_array(text_stream):
+    """
+    최상위 JSON 배열을 원소 단위로 읽어 yield 한다.
+    파일 전체를 한 번에 올리지 않고 STREAM_CHUNK_SIZE씩 읽으며 raw_decode로 하나씩 파싱한다.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    started = False
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = text_stream.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError('JSON 배열이 닫히지 않았습니다.')
+            fill()
+            continue
+
+        if not started:
+            if buf[pos] != '[':
+                raise ValueError('최상위 JSON 배열이 아닙니다.')
+            started = True
+            pos += 1
+            continue
+
+        if buf[pos] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+
+        # 숫자는 청크 경계에서 잘려도("3." -> 3) 파싱되므로, 원소 뒤에 구분자가 보일 때까지 더 읽는다
+        nxt = end
+        while nxt < len(buf) and buf[nxt] in ' \t\r\n':
+            nxt += 1
+        if nxt >= len(buf) or buf[nxt] not in ',]':
+            if not eof:
+                fill()
+                continue
+            if nxt < len(buf):
+                raise ValueError('JSON 배열 형식이 올바르지 않습니다.')
+
+        pos = end
+        yield item
+
+
+def _vtt_timestamp(seconds) -> str:
+    millis = int(round(max(float(seconds), 0) * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def _vtt_text(text) -> str:
+    text = str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    # 빈 줄은 WebVTT에서 큐의 끝을 의미하므로 제거
+    return '\n'.join(line for line in text.splitlines() if line.strip())
+
+
+def render_webvtt(cues) -> str:
+    """자막 리스트 -> WebVTT 문자열"""
+    lines = ['WEBVTT', '']
+    for no, cue in enumerate(cues, start=1):
+        text = _vtt_text(cue.get('text', ''))
+        if not text:
+            continue
+        lines.append(str(no))
+        lines.append(f"{_vtt_timestamp(cue.get('start', 0))} --> {_vtt_timestamp(cue.get('end', 0))}")
+        lines.append(text)
+        lines.append('')
+    return '\n'.join(lines)
+
+
+class SubtitleIndex:
+    """
+    시작 시간 기준으로 정렬된 자막 구간 인덱스
+    ends_max[i] = cues[0..i] 중 가장 늦은 종료 시간 (단조 증가) 이므로
+    [from, to] 구간과 겹치는 자막을 이분 탐색 두 번으로 찾는다.
+    """
+
+    def __init__(self, cues):
+        self.cues = sorted(
+            ({'start': float(c.get('start', 0)), 'end': float(c.get('end', 0)), 'text': c.get('text', '')} for c in cues),
+            key=lambda c: c['start']
+        )
+        self.starts = [c['start'] for c in self.cues]
+        self.ends_max = []
+        running = float('-inf')
+        for c in self.cues:
+            running = max(running, c['end'])
+            self.ends_max.append(running)
+        self._vtt_blob = None
+
+    def __len__(self):
+        return len(self.cues)
+
+    def window(self, start, end):
+        """start <= cue.end 이고 cue.start <= end 인 자막 목록"""
+        lo = bisect.bisect_left(self.ends_max, start)
+        hi = bisect.bisect_right(self.starts, end)
+        return [c for c in self.cues[lo:hi] if c['end'] >= start]
+
+    def vtt_blob(self) -> bytes:
+        """gzip 압축된 WebVTT (인덱스 수명 동안 한 번만 생성)"""
+        if self._vtt_blob is None:
+            self._vtt_blob = gzip.compress(render_webvtt(self.cues).encode('utf-8'), compresslevel=9, mtime=0)
+        return self._vtt_blob
@@ -0,0 +1,193 @@
+"""
+분석 파이프라인 단계별 소요 시간
+- span(): 단계 하나를 감싸 PIPELINE_SPAN에 기록 (기록 실패는 분석에 영향을 주지 않음)
+- stage_stats(): 관리자 화면용 단계별 p50/p95/p99 (일별, 영상 길이 구간별)
+- estimate_eta(): 처리 중인 영상의 남은 시간 추정 (최근 통계의 영상 길이 구간별 중앙값)
+"""
+import math
+import time
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from SKN17_FINAL_3TEAM import cache as shared_cache
+from .models import PipelineSpan
+
+logger = logging.getLogger(__name__)
+
+STAGES = [stage for stage, _ in PipelineSpan.STAGE_CHOICES]
+STAGE_LABELS = dict(PipelineSpan.STAGE_CHOICES)
+SUBMIT_STAGES = ('upload_s3', 'presign', 'submit')     # 작업 제출 전 (웹 서버)
+RUN_STAGES = ('queue', 'gpu')                           # 제출 후 결과 반영 전 (RunPod)
+
+# 영상 길이 구간 (초 상한, 이름): 마지막 구간은 상한 없음
+DURATION_BUCKETS = [(60, '1분 이하'), (180, '1~3분'), (600, '3~10분'), (None, '10분 초과')]
+UNKNOWN_BUCKET = '길이 미상'
+
+ETA_WINDOW_DAYS = 14
+ETA_MIN_SAMPLES = 20        # 구간 표본이 이보다 적으면 전체 분포 사용
+ETA_CACHE_KEY = 'pipeline:eta_table'
+ETA_CACHE_TIMEOUT = 300
+
+
+def duration_bucket(seconds):
+    if seconds is None:
+        return UNKNOWN_BUCKET
+    for upper, label in DURATION_BUCKETS:
+        if upper is None or seconds <= upper:
+            return label
+
+
+def record_span(upload, stage, started_dt, seconds, success=True, job_id=None):
+    try:
+        PipelineSpan.objects.create(
+            upload_file_id=getattr(upload, 'pk', None),
+            runpod_job_id=job_id,
+            stage=stage,
+            started_dt=started_dt,
+            duration_ms=int(seconds * 1000),
+            video_duration=getattr(upload, 'duration_sec', None),
+            success_yn=success,
+        )
+    except Exception as e:
+        logger.warning(f"단계 소요 시간 기록 실패 ({stage}): {e}")
+
+
+def record_interval(upload, stage, start_ts, end_ts, success=True, job_id=None):
+    """time.time() 기준 구간 기록 (모니터링 루프처럼 상태 변화로 구간을 알게 되는 경우)"""
+    started_dt = datetime.fromtimestamp(start_ts, tz=dt_timezone.utc)
+    record_span(upload, stage, started_dt, end_ts - start_ts, success, job_id)
+
+
+@contextmanager
+def span(upload, stage, job_id=None):
+    started_dt = timezone.now()
+    started = time.perf_counter()
+    success = False
+    try:
+        yield
+        success = True
+    finally:
+        record_span(upload, stage, started_dt, time.perf_counter() - started, success, job_id)
+
+
+def percentile(sorted_values, pct):
+    """nearest-rank 백분위수 (정렬된 값 목록)"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summary(values):
+    values.sort()
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50) / 1000,
+        'p95': percentile(values, 95) / 1000,
+        'p99': percentile(values, 99) / 1000,
+    }
+
+
+def _load_spans(days):
+    since = timezone.now() - timedelta(days=days)
+    return PipelineSpan.objects.filter(started_dt__gte=since, success_yn=True).values_list(
+        'stage', 'started_dt', 'duration_ms', 'video_duration'
+    ).iterator(chunk_size=5000)
+
+
+def stage_stats(days=14):
+    """관리자 화면: 단계별 전체/영상 길이 구간별/일별 p50, p95, p99 (초)"""
+    by_stage = defaultdict(list)
+    by_bucket = defaultdict(list)
+    by_day = defaultdict(list)
+    for stage, started_dt, duration_ms, video_duration in _load_spans(days):
+        by_stage[stage].append(duration_ms)
+        by_bucket[(stage, duration_bucket(video_duration))].append(duration_ms)
+        by_day[(timezone.localdate(started_dt), stage)].append(duration_ms)
+
+    bucket_labels = [label for _, label in DURATION_BUCKETS] + [UNKNOWN_BUCKET]
+    stages = [
+        {
+            'stage': stage,
+            'label': STAGE_LABELS[stage],
+            'total': _summary(by_stage[stage]) if by_stage[stage] else None,
+            'buckets': [
+                {'label': label, **_summary(by_bucket[(stage, label)])}
+                for label in bucket_labels if by_bucket[(stage, label)]
+            ],
+        }
+        for stage in STAGES
+    ]
+
+    daily = [
+        {
+            'date': day,
+            'stages': [_summary(by_day[(day, stage)]) if by_day[(day, stage)] else None for stage in STAGES],
+        }
+        for day in sorted({day for day, _ in by_day}, reverse=True)
+    ]
+    return {'days': days, 'stages': stages, 'daily': daily, 'stage_labels': [STAGE_LABELS[s] for s in STAGES]}
+
+
+def _build_eta_table():
+    """{(단계, 구간 또는 None): (p50, p95)} 초 단위, None은 전체 분포"""
+    samples = defaultdict(list)
+    for stage, _, duration_ms, video_duration in _load_spans(ETA_WINDOW_DAYS):
+        samples[(stage, None)].append(duration_ms)
+        samples[(stage, duration_bucket(video_duration))].append(duration_ms)
+
+    table = {}
+    for key, values in samples.items():
+        if key[1] is None or len(values) >= ETA_MIN_SAMPLES:
+            values.sort()
+            table[key] = (percentile(values, 50) / 1000, percentile(values, 95) / 1000)
+    return table
+
+
+def get_eta_table():
+    return shared_cache.get_or_set('pipeline_eta', ETA_CACHE_KEY, _build_eta_table, ETA_CACHE_TIMEOUT)
+
+
+def _expected(table, stages, bucket):
+    """단계 목록의 (p50 합, p95 합), 통계가 없는 단계가 있으면 None"""
+    p50 = p95 = 0
+    for stage in stages:
+        stat = table.get((stage, bucket)) or table.get((stage, None))
+        if stat is None:
+            return None
+        p50 += stat[0]
+        p95 += stat[1]
+    return p50, p95
+
+
+def _remaining(expected, elapsed):
+    """진행 중인 구간의 남은 시간: 중앙값을 넘겼으면 p95 기준, 그것도 넘겼으면 0"""
+    p50, p95 = expected
+    if elapsed < p50:
+        return p50 - elapsed
+    return max(p95 - elapsed, 0)
+
+
+def estimate_eta(upload, table=None, now=None):
+    """처리 중(20/21) 영상의 남은 시간(초), 추정할 통계가 없으면 None"""
+    table = get_eta_table() if table is None else table
+    now = now or timezone.now()
+    bucket = duration_bucket(upload.duration_sec)
+
+    ingest = _expected(table, ('ingest',), bucket)
+    run = _expected(table, RUN_STAGES, bucket)
+    if ingest is None or run is None:
+        return None
+
+    if upload.runpod_job_id and upload.job_submit_dt:
+        elapsed = (now - upload.job_submit_dt).total_seconds()
+        return _remaining(run, elapsed) + ingest[0]
+
+    submit = _expected(table, SUBMIT_STAGES, bucket)
+    if submit is None:
+        return None
+    started = upload.job_checked_dt
+    elapsed = (now - started).total_seconds() if started else 0
+    return _remaining(submit, elapsed) + run[0] + ingest[0]
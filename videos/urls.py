@@ -15,4 +15,12 @@ urlpatterns = [
     path('myvideos/download/<int:video_id>/', views.process_download, name='download'),
     path('myvideos/delete/<int:video_id>/', views.delete_video, name='delete'),
     path('play/user/<int:video_id>/', views.play_user_video, name='play_user_video'),
+    path('myvideos/<int:video_id>/recommentate/', views.recommentate_video, name='recommentate'),
+    path('myvideos/<int:video_id>/variants/', views.video_variants, name='variants'),
+
+    # 자막
+    path('subtitles/search', views.subtitle_search, name='subtitle_search'),
+    path('subtitles/<int:subtitle_id>', views.subtitle_window, name='subtitle_window'),
+    path('subtitles/<int:subtitle_id>/data', views.subtitle_data, name='subtitle_data'),
+    path('subtitles/<int:subtitle_id>/vtt', views.subtitle_vtt, name='subtitle_vtt'),
 ]
\ No newline at end of file
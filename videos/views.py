@@ -1,9 +1,11 @@
 import json
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponse
-from django.views.decorators.http import require_POST
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified
+from django.views.decorators.http import require_POST, require_GET
+from django.utils.cache import patch_vary_headers
 from . import services
-from .models import UserInfo, UserUploadVideo 
+from .models import UserInfo, UserUploadVideo, SubtitleInfo
+from .subtitles import subtitle_raw_bytes
 
 def home(request):
     user_id = request.session.get('user_id')
@@ -14,7 +16,7 @@ def home(request):
         req_team = request.GET.get('team', '').strip().upper()
         
         sort_option = request.GET.get('sort', 'latest')
-        context = services.get_home_context(user_id, search_query, req_team, sort_option)
+        context = services.get_home_context(request.user_ctx, search_query, req_team, sort_option)
         
         return render(request, 'home.html', context)
 
@@ -43,7 +45,7 @@ def play(request, video_id):
     if not user_id: return redirect('/')
     
     try:
-        context = services.get_play_context(user_id, video_id)
+        context = services.get_play_context(request.user_ctx, video_id)
         return render(request, 'play.html', context)
 
     except PermissionError:
@@ -63,7 +65,7 @@ def my_videos(request):
     if not user_id: return redirect('/')
     
     try:
-        context = services.get_my_videos_context(user_id)
+        context = services.get_my_videos_context(request.user_ctx)
         return render(request, 'my_videos.html', context)
 
     except PermissionError:
@@ -141,14 +143,160 @@ def delete_video(request, video_id):
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
 
+@require_POST
+def recommentate_video(request, video_id):
+    """ [POST] 업로드 영상 해설위원 변경 (다른 해설위원 해설 생성 요청) """
+    user_id = request.session.get('user_id')
+    if not user_id:
+        return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
+
+    try:
+        data = json.loads(request.body or '{}')
+        variant, created = services.request_commentary_variant(user_id, video_id, data.get('commentator', ''))
+        return JsonResponse({
+            'status': 'success',
+            'message': '해설 생성을 시작했습니다. 완료되면 바로 선택할 수 있습니다.' if created else '이미 요청된 해설입니다.',
+            'subtitle_id': variant.subtitle_id,
+        })
+
+    except UserUploadVideo.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': '영상을 찾을 수 없습니다.'}, status=404)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+
+
+@require_GET
+def video_variants(request, video_id):
+    """ [GET] 업로드 영상 해설위원별 해설 상태 """
+    user_id = request.session.get('user_id')
+    if not user_id:
+        return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
+
+    try:
+        video = UserUploadVideo.objects.select_related('upload_file').get(upload_file__file_id=video_id, user_id=user_id, use_yn=True)
+    except UserUploadVideo.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': '영상을 찾을 수 없습니다.'}, status=404)
+    return JsonResponse({'status': 'success', 'variants': services.get_commentary_variants(video)})
+
+
 def play_user_video(request, video_id):
     user_id = request.session.get('user_id')
     if not user_id: return redirect('/')
     
     try:
-        context = services.get_user_play_context(user_id, video_id)
+        context = services.get_user_play_context(request.user_ctx, video_id)
         return render(request, 'play.html', context)
 
     except UserInfo.DoesNotExist:
         request.session.flush()
-        return redirect('/')
\ No newline at end of file
+        return redirect('/')
+
+def _get_subtitle_or_error(request, subtitle_id):
+    user_id = request.session.get('user_id')
+    if not user_id:
+        return None, JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
+    try:
+        return services.get_subtitle_meta(user_id, subtitle_id), None
+    except SubtitleInfo.DoesNotExist:
+        return None, JsonResponse({'status': 'error', 'message': '자막을 찾을 수 없습니다.'}, status=404)
+
+
+def _gzip_cached_response(request, blob, etag_value, content_type):
+    """gzip 바이트를 그대로 전송 (?v=<etag> URL은 장기 캐시)"""
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(blob, content_type=content_type)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(subtitle_raw_bytes(blob), content_type=content_type)
+
+    response['ETag'] = f'"{etag_value}"'
+    if request.GET.get('v') == etag_value:
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def _not_modified(request, sub_info):
+    etag = f'"{sub_info.subtitle_etag}"' if sub_info.subtitle_etag else None
+    if etag and request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    return None
+
+
+@require_GET
+def subtitle_data(request, subtitle_id):
+    """자막 JSON 전송 (gzip 저장본을 그대로 전송)"""
+    sub_info, error = _get_subtitle_or_error(request, subtitle_id)
+    if error:
+        return error
+
+    not_modified = _not_modified(request, sub_info)
+    if not_modified:
+        return not_modified
+
+    blob, etag_value = services.get_subtitle_blob(sub_info)
+    return _gzip_cached_response(request, blob, etag_value, 'application/json; charset=utf-8')
+
+
+@require_GET
+def subtitle_vtt(request, subtitle_id):
+    """자막 WebVTT 전송 (브라우저 TextTrack용)"""
+    sub_info, error = _get_subtitle_or_error(request, subtitle_id)
+    if error:
+        return error
+
+    not_modified = _not_modified(request, sub_info)
+    if not_modified:
+        return not_modified
+
+    index = services.get_subtitle_index(sub_info)
+    return _gzip_cached_response(request, index.vtt_blob(), sub_info.subtitle_etag, 'text/vtt; charset=utf-8')
+
+
+@require_GET
+def subtitle_window(request, subtitle_id):
+    """[from, to] 구간(초)에 걸친 자막만 반환"""
+    sub_info, error = _get_subtitle_or_error(request, subtitle_id)
+    if error:
+        return error
+
+    try:
+        start = float(request.GET.get('from', 0))
+        end = float(request.GET.get('to', start + 60))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': '잘못된 구간입니다.'}, status=400)
+    if end < start:
+        return JsonResponse({'status': 'error', 'message': '잘못된 구간입니다.'}, status=400)
+
+    index = services.get_subtitle_index(sub_info)
+    return JsonResponse({
+        'from': start,
+        'to': end,
+        'etag': sub_info.subtitle_etag,
+        'cues': index.window(start, end),
+    })
+
+
+@require_GET
+def subtitle_search(request):
+    """자막 전문 검색 (?q=검색어&subtitle=자막ID)"""
+    user_id = request.session.get('user_id')
+    if not user_id:
+        return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
+
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'hits': []})
+
+    subtitle_id = request.GET.get('subtitle')
+    hits = services.search_subtitles_logic(
+        user_id, query,
+        subtitle_id=int(subtitle_id) if subtitle_id and subtitle_id.isdigit() else None
+    )
+    return JsonResponse({'hits': hits})